@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Auto-Role State Benchmark
+Run this to compare the memory and CPU cost of the auto-role member state held as
+slotted records (ActiveMember, RoleHistory) against the old dicts of ISO strings.
+
+Usage: python auto_role_state_benchmark.py [members]
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from main import AMSTERDAM_TZ, ActiveMember, RoleHistory, localize_amsterdam
+
+GUILD_ID = 1234567890
+ROLE_ID = 1384489575187091466
+
+
+def legacy_expiry_time(data):
+    """The previous expiry lookup: parse the ISO strings on every call"""
+    if data.get("weekend_delayed", False) and "expiry_time" in data:
+        return localize_amsterdam(datetime.fromisoformat(data["expiry_time"]))
+    return localize_amsterdam(datetime.fromisoformat(
+        data["role_added_time"])) + timedelta(hours=72)
+
+
+def join_times(count):
+    started = datetime.now(AMSTERDAM_TZ) - timedelta(hours=72)
+    return [started + timedelta(seconds=i * 5) for i in range(count)]
+
+
+def build_legacy(times):
+    active_members, role_history = {}, {}
+    for i, join_time in enumerate(times):
+        member_id = str(900000000000000000 + i)
+        weekend = i % 7 >= 5
+        active_members[member_id] = {
+            "role_added_time": join_time.isoformat(),
+            "role_id": ROLE_ID,
+            "guild_id": GUILD_ID,
+            "weekend_delayed": weekend,
+            "expiry_time": (join_time + timedelta(hours=120)).isoformat()
+        }
+        role_history[member_id] = {
+            "first_granted": join_time.isoformat(),
+            "times_granted": 1,
+            "last_expired": None,
+            "guild_id": GUILD_ID
+        }
+    return active_members, role_history
+
+
+def build_records(times):
+    active_members, role_history = {}, {}
+    for i, join_time in enumerate(times):
+        member_id = str(900000000000000000 + i)
+        weekend = i % 7 >= 5
+        # Fresh datetimes per field, as loading from the database produces
+        active_members[member_id] = ActiveMember(
+            join_time + timedelta(), ROLE_ID, GUILD_ID, weekend_delayed=weekend,
+            expiry_time=join_time + timedelta(hours=120))
+        role_history[member_id] = RoleHistory(join_time + timedelta(), GUILD_ID)
+    return active_members, role_history
+
+
+def measure_build(builder, times):
+    tracemalloc.start()
+    started = time.perf_counter()
+    state = builder(times)
+    elapsed = time.perf_counter() - started
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return state, size, elapsed
+
+
+def measure_scan(active_members, expiry_of, rounds=5):
+    """Expiry of every member, as rebuild_role_expiries and /timedautorole list do"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        expiries = {member_id: expiry_of(data) for member_id, data in active_members.items()}
+    elapsed = (time.perf_counter() - started) / rounds
+    return expiries, elapsed
+
+
+def run_benchmark(count):
+    times = join_times(count)
+    print("🧮 Auto-Role State Benchmark")
+    print("=" * 50)
+    print(f"Members: {count:,} (active_members + role_history)")
+
+    legacy, legacy_bytes, legacy_build = measure_build(build_legacy, times)
+    records, record_bytes, record_build = measure_build(build_records, times)
+    legacy_expiries, legacy_scan = measure_scan(legacy[0], legacy_expiry_time)
+    record_expiries, record_scan = measure_scan(records[0], ActiveMember.expires_at)
+
+    # Both layouts must produce the same expiry for every member
+    agree = legacy_expiries == record_expiries
+    print(f"{'✅' if agree else '❌'} Expiry agreement: "
+          f"{sum(1 for key in legacy_expiries if legacy_expiries[key] == record_expiries.get(key)):,}/{count:,}")
+
+    for name, size, build, scan in [("ISO-string dicts (old)", legacy_bytes, legacy_build, legacy_scan),
+                                    ("slotted records (new)", record_bytes, record_build, record_scan)]:
+        print(f"   {name:<24} {size / 1024 / 1024:>7.1f} MiB  ({size / count:,.0f} B/member) • "
+              f"build {build * 1000:>7.1f}ms • expiry scan {scan * 1000:>7.1f}ms")
+
+    return agree
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50000) else 1)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Leaderboard Benchmark
+Run this to compare the incrementally ranked GuildLevels store against the old per-command
+sort of every member's level data, for the top 10 and a member's own rank.
+
+Usage: python leaderboard_benchmark.py [users] [messages]
+"""
+
+import random
+import sys
+import time
+
+from main import GuildLevels
+
+GUILD_ID = 1234567890
+
+
+def build_user_data(users):
+    """Level data shaped like LEVEL_SYSTEM["user_data"], with a long tail of quiet members"""
+    random.seed(7)
+    return {
+        str(900000000000000000 + i): {
+            "message_count": int(random.paretovariate(1.2)) - 1,
+            "current_level": 0,
+            "guild_id": GUILD_ID
+        }
+        for i in range(users)
+    }
+
+
+def legacy_leaderboard(user_data, user_id):
+    """The previous command: filter the guild, sort everyone, scan for the member's rank"""
+    guild_users = [(key, data) for key, data in user_data.items()
+                   if data.get("guild_id") == GUILD_ID]
+    guild_users.sort(key=lambda x: (x[1]["current_level"], x[1]["message_count"]),
+                     reverse=True)
+    rank = next(i for i, (key, _) in enumerate(guild_users, 1) if key == user_id)
+    return guild_users[:10], rank
+
+
+def timed(function, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = function()
+    return result, (time.perf_counter() - started) / rounds
+
+
+def run_benchmark(users, messages):
+    user_data = build_user_data(users)
+    user_ids = [int(user_id) for user_id in user_data]
+    print("🏆 Leaderboard Benchmark")
+    print("=" * 50)
+    print(f"Users: {users:,} • messages counted: {messages:,}")
+
+    started = time.perf_counter()
+    leaderboard = GuildLevels()
+    for key, data in user_data.items():
+        leaderboard.set(int(key), data["message_count"], data["current_level"])
+    leaderboard.ensure_order()
+    build = time.perf_counter() - started
+
+    # Count messages from random members through both structures
+    random.seed(11)
+    authors = [random.choice(user_ids) for _ in range(messages)]
+    started = time.perf_counter()
+    for user_id in authors:
+        leaderboard.increment(user_id)
+    increment = (time.perf_counter() - started) / messages
+    for user_id in authors:
+        user_data[str(user_id)]["message_count"] += 1
+
+    member = authors[-1]
+    (legacy_top, legacy_rank), legacy_time = timed(
+        lambda: legacy_leaderboard(user_data, str(member)), 5)
+    (top, rank), query_time = timed(
+        lambda: (leaderboard.top(10), leaderboard.rank(member)), 1000)
+
+    # Ties may be listed in any order, so compare the counts and the competition rank
+    expected_rank = 1 + sum(1 for data in user_data.values()
+                            if data["message_count"] > user_data[str(member)]["message_count"])
+    agree = ([count for _, count, _ in top] == [data["message_count"] for _, data in legacy_top]
+             and rank == expected_rank and legacy_rank >= rank)
+    print(f"{'✅' if agree else '❌'} Top 10 and rank agree (member rank #{rank:,})")
+    print(f"   {'sort per command (old)':<26} {legacy_time * 1000:>10.2f}ms per /level leaderboard")
+    print(f"   {'incremental (new)':<26} {query_time * 1e6:>10.2f}µs per /level leaderboard")
+    print(f"   {'increment':<26} {increment * 1e6:>10.2f}µs per message • build {build * 1000:.1f}ms")
+    return agree
+
+
+if __name__ == "__main__":
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    sys.exit(0 if run_benchmark(users, messages) else 1)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Level Store Benchmark
+Run this to compare the memory held by the array-backed LevelStore (int64 IDs, parallel
+count/level arrays and the leaderboard order, per guild) against the old dict of
+per-user dicts keyed by stringified user ID, and the bisect level lookup against the
+old loop over every requirement.
+
+Usage: python level_store_benchmark.py [users]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from main import LEVEL_SYSTEM, LevelStore, calculate_level
+
+GUILD_ID = 1234567890
+
+
+def build_rows(users):
+    """(user_id, message_count, current_level, guild_id) as load_level_system reads them"""
+    random.seed(7)
+    rows = []
+    for i in range(users):
+        message_count = int(random.paretovariate(1.2)) - 1
+        rows.append((900000000000000000 + i, message_count,
+                     calculate_level(message_count), GUILD_ID))
+    return rows
+
+
+def build_legacy(rows):
+    # int(str()) gives every row its own int objects, as asyncpg records do
+    return {
+        str(user_id): {
+            "message_count": message_count,
+            "current_level": current_level,
+            "guild_id": int(str(guild_id))
+        }
+        for user_id, message_count, current_level, guild_id in rows
+    }
+
+
+def build_store(rows):
+    store = LevelStore()
+    for user_id, message_count, current_level, guild_id in rows:
+        store.guild(guild_id).set(int(str(user_id)), message_count, current_level)
+    for partition in store.guilds.values():
+        partition.ensure_order()
+    return store
+
+
+def measure(builder, rows):
+    tracemalloc.start()
+    state = builder(rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return state, size
+
+
+def legacy_calculate_level(message_count):
+    """The previous lookup: sort the levels and walk down from the highest"""
+    for level in sorted(LEVEL_SYSTEM["level_requirements"].keys(), reverse=True):
+        if message_count >= LEVEL_SYSTEM["level_requirements"][level]:
+            return level
+    return 0
+
+
+def run_benchmark(users):
+    rows = build_rows(users)
+    print("🗄️ Level Store Benchmark")
+    print("=" * 50)
+    print(f"Users: {users:,} in one guild")
+
+    legacy, legacy_bytes = measure(build_legacy, rows)
+    store, store_bytes = measure(build_store, rows)
+    agree = all(store.get(f"{GUILD_ID}:{key}").message_count == data["message_count"]
+                for key, data in legacy.items())
+    print(f"{'✅' if agree else '❌'} Counters agree for {len(store):,} users")
+    for name, size in [("dict per user (old)", legacy_bytes),
+                       ("array-backed store (new)", store_bytes)]:
+        print(f"   {name:<26} {size / 1024 / 1024:>7.1f} MiB  ({size / users:,.0f} B/user)")
+    print(f"   saving per 100k users      {(legacy_bytes - store_bytes) / users * 100000 / 1024 / 1024:>7.1f} MiB")
+
+    counts = [row[1] for row in rows]
+    levels_match = all(calculate_level(count) == legacy_calculate_level(count)
+                       for count in range(0, 5000))
+    print(f"{'✅' if levels_match else '❌'} Level lookup agrees for 0-4,999 messages")
+    for name, lookup in [("loop over levels (old)", legacy_calculate_level),
+                         ("bisect (new)", calculate_level)]:
+        started = time.perf_counter()
+        for count in counts:
+            lookup(count)
+        elapsed = time.perf_counter() - started
+        print(f"   {name:<26} {elapsed * 1e9 / len(counts):>7.0f} ns/lookup")
+
+    return agree and levels_match
+
+
+if __name__ == "__main__":
+    sys.exit(0 if run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000) else 1)
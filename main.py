@@ -24,11 +24,19 @@ from dotenv import load_dotenv
 import asyncio
 import aiohttp
 from aiohttp import web
+import bisect
+import heapq
+import hmac
 import json
 import math
+import sys
 from datetime import datetime, timedelta, timezone
 import asyncpg
 import logging
+from array import array
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from typing import Optional, Dict
 import re
 
@@ -80,14 +88,10 @@ AUTO_ROLE_CONFIG = {
     "duration_hours": 72,  # Fixed at 72 hours (3 days)
     "custom_message":
     "Hey! Your **3-day free access** to the <#1350929852299214999> channel has unfortunately **ran out**. We truly hope you were able to benefit with us & we hope to see you back soon! For now, feel free to continue following our trade signals in ⁠<#1350929790148022324>",
-    "active_members":
-    {},  # member_id: {"role_added_time": datetime, "role_id": role_id, "weekend_delayed": bool, "guild_id": guild_id, "expiry_time": datetime}
-    "weekend_pending":
-    {},  # member_id: {"join_time": datetime, "guild_id": guild_id} for weekend joiners
-    "role_history":
-    {},  # member_id: {"first_granted": datetime, "times_granted": int, "last_expired": datetime, "guild_id": guild_id}
-    "dm_schedule": {
-    }  # member_id: {"role_expired": datetime, "guild_id": guild_id, "dm_3_sent": bool, "dm_7_sent": bool, "dm_14_sent": bool}
+    "active_members": {},  # member_id (str): ActiveMember
+    "weekend_pending": {},  # member_id (str): WeekendPending for weekend joiners
+    "role_history": {},  # member_id (str): RoleHistory
+    "dm_schedule": {}  # member_id (str): DmSchedule
 }
 
 # Log channel ID for Discord logging
@@ -96,6 +100,23 @@ LOG_CHANNEL_ID = 1350888185487429642
 # Gold Pioneer role ID for checking membership before sending follow-up DMs
 GOLD_PIONEER_ROLE_ID = 1384489575187091466
 
+# Sent to weekend joiners when the markets open and their trial starts
+MONDAY_ACTIVATION_MESSAGE = (
+    "Hey! The weekend is over, so the trading markets have been opened again. "
+    "That means your 3-day welcome gift has officially started. "
+    "You now have full access to the premium channel. "
+    "Let's make the most of it by securing some wins together!")
+
+# Follow-up DMs by days since the auto-role expired
+FOLLOWUP_DM_MESSAGES = {
+    3:
+    "Hey! It's been 3 days since your **3-day free access to the Premium Signals channel** ended. We hope you were able to catch good trades with us during that time.\n\nAs you've probably seen, the **free signals channel only gets about 1 signal a day**, while inside **Gold Pioneers**, members receive **8–10 high-quality signals every single day in <#1350929852299214999>**. That means way more chances to profit and grow consistently.\n\nWe'd love to **invite you back to Premium Signals** so you don't miss out on more solid opportunities.\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer>",
+    7:
+    "It's been a week since your Premium Signals trial ended. Since then, our **Gold Pioneers  have been catching trade setups daily in <#1350929852299214999>**.\n\nIf you found value in just 3 days, imagine the results you could be seeing by now with full access. It's all about **consistency and staying plugged into the right information**.\n\nWe'd like to **personally invite you to rejoin Premium Signals** and get back into the rhythm.\n\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer>",
+    14:
+    "Hey! It's been two weeks since your access to Premium Signals ended. We hope you've stayed active. \n\nIf you've been trading solo or passively following the free channel, you might be feeling the difference. in <#1350929852299214999>, it's not just about more signals. It's about the **structure, support, and smarter decision-making**. That edge can make all the difference over time.\n\nWe'd love to **officially invite you back into Premium Signals** and help you start compounding results again.\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer>"
+}
+
 # Giveaway channel ID (always post giveaways here)
 GIVEAWAY_CHANNEL_ID = 1405490561963786271
 
@@ -122,6 +143,12 @@ PRICE_TRACKING_CONFIG = {
     "462707111365836801",
     "signal_keyword":
     "Trade Signal For:",
+    # Channels signals are posted in (free, premium); scanned for missed signals on startup
+    "signal_channel_ids": [
+        int(channel_id) for channel_id in os.getenv(
+            "SIGNAL_CHANNEL_IDS", "1350929790148022324,1384668129036075109").split(",")
+        if channel_id.strip()
+    ],
     "active_trades": {},  # message_id: {trade_data}
     "api_keys": {
         # Priority order: currencybeacon -> exchangerate_api -> currencylayer -> abstractapi
@@ -148,8 +175,7 @@ PRICE_TRACKING_CONFIG = {
 # Level system configuration
 LEVEL_SYSTEM = {
     "enabled": True,
-    "user_data":
-    {},  # user_id: {"message_count": int, "current_level": int, "guild_id": guild_id}
+    "user_data": None,  # LevelStore of per-guild counters, created below with the class
     "level_requirements": {
         1: 5,  # Level 1: 5 messages (very easy start)
         2: 20,  # Level 2: 20 messages (easy)
@@ -172,6 +198,120 @@ LEVEL_SYSTEM = {
     }
 }
 
+# Database pool configuration (override via environment to size against Render's connection limit)
+DB_POOL_CONFIG = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "5")),  # Lower for Render's limits
+    "command_timeout": float(os.getenv("DB_COMMAND_TIMEOUT", "30")),  # seconds, client side
+    "statement_timeout_ms": int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "-1")),  # server side, 0 = disabled, -1 = from command_timeout
+    "acquire_timeout": float(os.getenv("DB_ACQUIRE_TIMEOUT", "10")),  # seconds to wait for a free connection
+    "max_inactive_connection_lifetime": float(os.getenv("DB_MAX_INACTIVE_LIFETIME", "300")),
+    "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+}
+
+# By default the server cancels a statement just before the client-side command_timeout
+# fires, so slow statements arrive as QueryCanceledError and are counted as statement timeouts
+if DB_POOL_CONFIG["statement_timeout_ms"] < 0:
+    DB_POOL_CONFIG["statement_timeout_ms"] = int(
+        DB_POOL_CONFIG["command_timeout"] * 1000 * 0.95)
+
+# Acquire-wait histogram bucket upper bounds in milliseconds (last bucket is open-ended)
+DB_ACQUIRE_WAIT_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000]
+
+# State store flush pipeline for auto-role, level and invite state
+STATE_STORE_CONFIG = {
+    "flush_interval_seconds": int(os.getenv("STATE_FLUSH_INTERVAL", "5")),
+    "snapshot_interval_minutes": int(os.getenv("STATE_SNAPSHOT_INTERVAL", "30"))
+}
+
+# Local append-only journal used as a durable fallback while PostgreSQL is unavailable
+LOCAL_JOURNAL_CONFIG = {
+    "path": os.getenv("LOCAL_JOURNAL_PATH", "offline_journal.jsonl"),
+    "replay_batch_size": int(os.getenv("LOCAL_JOURNAL_REPLAY_BATCH", "200")),
+    "reconnect_interval_minutes": 2
+}
+
+# Startup recovery of signals posted while the bot was offline
+SIGNAL_RECOVERY_CONFIG = {
+    "concurrency": int(os.getenv("SIGNAL_RECOVERY_CONCURRENCY", "3")),  # channels scanned at once
+    "history_limit": 100  # messages read per channel
+}
+
+# Pair-to-provider capability matrix used to assign price APIs without live probes
+PROVIDER_MATRIX_CONFIG = {
+    "refresh_interval_hours": float(os.getenv("PROVIDER_MATRIX_REFRESH_HOURS", "6")),
+    "probe_spacing_seconds": 2,  # pause between background probes to stay low priority
+    "ewma_alpha": 0.2,  # weight of the newest result in latency / error rate
+    "max_error_rate": 0.5  # providers failing more often than this are not assigned
+}
+
+# Detected signals are queued by on_message and processed by one ingestion worker
+SIGNAL_INGESTION_CONFIG = {
+    "queue_size": int(os.getenv("SIGNAL_QUEUE_SIZE", "100")),
+    "latency_history": 50  # most recent signals kept for /metrics/signals
+}
+
+# Log sink that batches log/debug channel lines into periodic embeds
+LOG_SINK_CONFIG = {
+    "queue_size": int(os.getenv("LOG_SINK_QUEUE_SIZE", "500")),  # lines across all channels
+    "flush_interval_seconds": float(os.getenv("LOG_SINK_FLUSH_SECONDS", "3")),
+    "embed_char_limit": 4000,  # Discord allows 4096 per embed description
+    "max_embeds_per_flush": 3  # per channel, anything left waits for the next flush
+}
+
+# Persistent DM outbox: every DM goes through one paced, retried queue in PostgreSQL
+DM_OUTBOX_CONFIG = {
+    "workers": int(os.getenv("DM_OUTBOX_WORKERS", "2")),
+    "rate_per_second": float(os.getenv("DM_RATE_PER_SECOND", "1")),  # global pace across workers
+    "batch_size": 50,  # DMs claimed per worker cycle
+    "poll_seconds": 5,
+    "max_attempts": 5,
+    "backoff_base_seconds": 30,  # doubled per failed attempt
+    "backoff_max_seconds": 3600,
+    "retention_days": 7  # finished rows kept for dedupe and metrics
+}
+
+# Due-time jobs (role expiry, welcome/activation/follow-up DMs) in one scheduled_jobs table
+JOB_SCHEDULER_CONFIG = {
+    "batch_size": 100,  # due jobs claimed per wake-up
+    "max_sleep_seconds": 300,  # re-check the table at least this often
+    "max_attempts": 5,
+    "backoff_base_seconds": 60,  # doubled per failed attempt
+    "backoff_max_seconds": 3600,
+    "paused_retry_seconds": 300,  # auto-role jobs wait this long while the system is disabled
+    "followup_batch_size": 100,  # due follow-up DMs handled per run
+    "followup_recheck_seconds": 3600,  # picks up schedules added after the last run
+    "retention_days": 14,  # finished jobs kept for lateness metrics
+    "lateness_history": 500  # most recent runs kept for /metrics/jobs
+}
+
+# Auto-role expiry bursts: claimed role_expiry jobs are removed together, paced for
+# Discord's per-guild member-role rate limit, and committed once per batch
+ROLE_EXPIRY_CONFIG = {
+    "concurrency": int(os.getenv("ROLE_EXPIRY_CONCURRENCY", "4")),  # role edits in flight
+    "edits_per_second": float(os.getenv("ROLE_EDITS_PER_SECOND", "4")),  # global pace across workers
+    "rate_limit_backoff_seconds": 5  # used when a 429 carries no retry_after
+}
+
+# Notification dispatcher: per-channel send queues, trade alerts ahead of log traffic
+NOTIFICATION_CONFIG = {
+    "max_attempts": 3,  # sends retried after a 429 before giving up
+    "latency_history": 100  # most recent alerts kept for /metrics/notifications
+}
+
+# Structured logging: per-subsystem levels, sampled hot-path debug lines and a ring buffer for GET /logs
+LOGGING_CONFIG = {
+    "default_level": os.getenv("LOG_LEVEL", "INFO").upper(),
+    "subsystem_levels": os.getenv("LOG_LEVELS", ""),  # e.g. "pricing=DEBUG,levels=WARNING"
+    "ring_buffer_size": int(os.getenv("LOG_RING_BUFFER_SIZE", "2000")),
+    "debug_sample_rate": int(os.getenv("LOG_DEBUG_SAMPLE_RATE", "20")),  # log 1 in N hot-path debug lines
+    "api_token": os.getenv("LOG_API_TOKEN", "")  # shared secret for /logs, /stats/trades, /metrics/notifications; unset = localhost only
+}
+
+LOG_SUBSYSTEMS = [
+    "core", "pricing", "tracking", "autorole", "invites", "giveaways", "levels"
+]
+
 # Amsterdam timezone handling with fallback
 if PYTZ_AVAILABLE:
     AMSTERDAM_TZ = pytz.timezone(
@@ -182,6 +322,1527 @@ else:
         timedelta(hours=1))  # Basic Amsterdam timezone without DST
 
 
+class MeteredPool:
+    """Wraps an asyncpg pool and records acquire waits, usage peaks and timeouts"""
+
+    def __init__(self, pool, acquire_timeout=None):
+        self._pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.wait_buckets = [0] * (len(DB_ACQUIRE_WAIT_BUCKETS_MS) + 1)
+        self.acquire_count = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquire_timeouts = 0
+        self.statement_timeouts = 0
+
+    def __getattr__(self, name):
+        # Everything else (get_size, get_idle_size, close, execute, ...) goes to the real pool
+        return getattr(self._pool, name)
+
+    def acquire(self):
+        return _MeteredAcquire(self)
+
+    def record_wait(self, wait_ms):
+        self.acquire_count += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        for i, bound in enumerate(DB_ACQUIRE_WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                self.wait_buckets[i] += 1
+                return
+        self.wait_buckets[-1] += 1
+
+    def get_metrics(self):
+        """Return a JSON-serialisable snapshot of pool usage"""
+        histogram = {
+            f"<={bound}ms": count
+            for bound, count in zip(DB_ACQUIRE_WAIT_BUCKETS_MS,
+                                    self.wait_buckets)
+        }
+        histogram[f">{DB_ACQUIRE_WAIT_BUCKETS_MS[-1]}ms"] = self.wait_buckets[-1]
+        return {
+            "size": self._pool.get_size(),
+            "idle": self._pool.get_idle_size(),
+            "min_size": self._pool.get_min_size(),
+            "max_size": self._pool.get_max_size(),
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "acquires": self.acquire_count,
+            "avg_wait_ms": round(self.total_wait_ms / self.acquire_count, 2)
+            if self.acquire_count else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "acquire_timeouts": self.acquire_timeouts,
+            "statement_timeouts": self.statement_timeouts,
+            "acquire_wait_histogram": histogram
+        }
+
+
+class _MeteredAcquire:
+    """Async context manager returned by MeteredPool.acquire()"""
+
+    def __init__(self, metered):
+        self.metered = metered
+        self.conn = None
+
+    async def __aenter__(self):
+        started = asyncio.get_running_loop().time()
+        try:
+            self.conn = await self.metered._pool.acquire(
+                timeout=self.metered.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.metered.acquire_timeouts += 1
+            raise
+        self.metered.record_wait(
+            (asyncio.get_running_loop().time() - started) * 1000)
+        self.metered.in_use += 1
+        self.metered.peak_in_use = max(self.metered.peak_in_use,
+                                       self.metered.in_use)
+        return self.conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Only the server cancelling a statement (SQLSTATE 57014) counts; a timeout
+        # in the caller's own code while holding the connection is not the database's
+        if exc_type is not None and issubclass(exc_type,
+                                               asyncpg.QueryCanceledError):
+            self.metered.statement_timeouts += 1
+        self.metered.in_use -= 1
+        await self.metered._pool.release(self.conn)
+        return False
+
+
+class LocalJournal:
+    """Append-only JSON-lines journal of state changes made while PostgreSQL is down.
+    Replay works on a rotated copy (path + ".replay") so new changes go to a fresh file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.replay_path = path + ".replay"
+        self.unsynced = False
+        # Terminate a torn final line so the next append starts on a fresh line
+        for journal_path in (self.replay_path, self.path):
+            if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+                with open(journal_path, "rb+") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+        self.pending = len(self.read())
+
+    def append(self, kind, op, key=None, data=None):
+        """Write one record through to the OS; sync() makes it durable"""
+        record = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "kind": kind,
+            "op": op,
+            "key": key,
+            "data": data
+        }
+        line = json.dumps(record, default=str)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        self.unsynced = True
+        self.pending += 1
+
+    def sync(self):
+        """fsync the records appended since the last sync (blocking - run it in a thread)"""
+        if not self.unsynced:
+            return
+        self.unsynced = False
+        if os.path.exists(self.path):
+            fd = os.open(self.path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def read_file(self, path):
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-write - everything before it is intact
+                    continue
+        return records
+
+    def read(self):
+        """Every pending record, including a rotated copy an interrupted replay left behind"""
+        return self.read_file(self.replay_path) + self.read_file(self.path)
+
+    def rotate(self):
+        """Move the journal aside for replay and return its records; new appends start
+        a fresh file. Records an interrupted replay left behind stay in front."""
+        self.sync()
+        if os.path.exists(self.path):
+            if os.path.exists(self.replay_path):
+                with open(self.path, "rb") as src, open(self.replay_path, "ab") as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.replay_path)
+        self.pending = 0
+        return self.read_file(self.replay_path)
+
+    def has_pending(self) -> bool:
+        return self.pending > 0 or os.path.exists(self.replay_path)
+
+    def discard_replay(self):
+        """Delete the rotated copy once everything in it is committed"""
+        if os.path.exists(self.replay_path):
+            os.remove(self.replay_path)
+
+
+def parse_iso_datetime(value):
+    """Parse an ISO timestamp string from the state dicts (None passes through)"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def localize_amsterdam(value: datetime) -> datetime:
+    """Treat naive timestamps as Amsterdam time, convert aware ones"""
+    if value.tzinfo is None:
+        if PYTZ_AVAILABLE:
+            return AMSTERDAM_TZ.localize(value)
+        return value.replace(tzinfo=AMSTERDAM_TZ)
+    return value.astimezone(AMSTERDAM_TZ)
+
+
+def amsterdam_datetime(value) -> Optional[datetime]:
+    """Aware Amsterdam datetime from an ISO string or a database timestamp (None passes through)"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = parse_iso_datetime(value)
+    return localize_amsterdam(value)
+
+
+def iso_or_none(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def member_joined_utc(member) -> datetime:
+    """A member's join time as aware UTC; members without one sort as the oldest"""
+    if not member.joined_at:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return member.joined_at.replace(tzinfo=timezone.utc)
+
+
+# Auto-role state records. Timestamps are aware Amsterdam datetimes and IDs are ints;
+# they only become ISO strings in the journal/snapshot JSON and rows at the database.
+
+
+@dataclass(slots=True)
+class ActiveMember:
+    role_added_time: datetime
+    role_id: int
+    guild_id: int
+    weekend_delayed: bool = False
+    expiry_time: Optional[datetime] = None
+    custom_duration: bool = False
+    monday_notification_sent: bool = False
+
+    def expires_at(self) -> datetime:
+        """When the member's access runs out"""
+        if self.weekend_delayed and self.expiry_time:
+            # Weekend joiners have specific expiry time (Monday 23:59)
+            return self.expiry_time
+        # Normal members - 72 hours (3 days) from role_added_time
+        return self.role_added_time + timedelta(hours=72)
+
+    def to_row(self):
+        return (self.role_added_time, self.role_id, self.guild_id,
+                self.weekend_delayed, self.expiry_time, self.custom_duration)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(amsterdam_datetime(row['role_added_time']), row['role_id'],
+                   row['guild_id'], row['weekend_delayed'],
+                   amsterdam_datetime(row['expiry_time']),
+                   row['custom_duration'])
+
+    def to_json(self):
+        return {
+            "role_added_time": self.role_added_time.isoformat(),
+            "role_id": self.role_id,
+            "guild_id": self.guild_id,
+            "weekend_delayed": self.weekend_delayed,
+            "expiry_time": iso_or_none(self.expiry_time),
+            "custom_duration": self.custom_duration,
+            "monday_notification_sent": self.monday_notification_sent
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(amsterdam_datetime(data["role_added_time"]),
+                   int(data["role_id"]), int(data["guild_id"]),
+                   data.get("weekend_delayed", False),
+                   amsterdam_datetime(data.get("expiry_time")),
+                   data.get("custom_duration", False),
+                   data.get("monday_notification_sent", False))
+
+
+@dataclass(slots=True)
+class WeekendPending:
+    join_time: datetime
+    guild_id: int
+
+    def to_row(self):
+        return (self.join_time, self.guild_id)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(amsterdam_datetime(row['join_time']), row['guild_id'])
+
+    def to_json(self):
+        return {"join_time": self.join_time.isoformat(), "guild_id": self.guild_id}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(amsterdam_datetime(data["join_time"]), int(data["guild_id"]))
+
+
+@dataclass(slots=True)
+class RoleHistory:
+    first_granted: datetime
+    guild_id: int
+    times_granted: int = 1
+    last_expired: Optional[datetime] = None
+
+    def to_row(self):
+        return (self.first_granted, self.times_granted, self.last_expired,
+                self.guild_id)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(amsterdam_datetime(row['first_granted']), row['guild_id'],
+                   row['times_granted'], amsterdam_datetime(row['last_expired']))
+
+    def to_json(self):
+        return {
+            "first_granted": self.first_granted.isoformat(),
+            "times_granted": self.times_granted,
+            "last_expired": iso_or_none(self.last_expired),
+            "guild_id": self.guild_id
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(amsterdam_datetime(data["first_granted"]),
+                   int(data["guild_id"]), data.get("times_granted", 1),
+                   amsterdam_datetime(data.get("last_expired")))
+
+
+@dataclass(slots=True)
+class DmSchedule:
+    role_expired: datetime
+    guild_id: int
+    dm_3_sent: bool = False
+    dm_7_sent: bool = False
+    dm_14_sent: bool = False
+
+    def is_sent(self, days: int) -> bool:
+        return getattr(self, f"dm_{days}_sent")
+
+    def mark_sent(self, days: int):
+        setattr(self, f"dm_{days}_sent", True)
+
+    @property
+    def next_stage(self) -> Optional[int]:
+        """Days after expiry of the next follow-up to send, None once all are sent"""
+        for days in FOLLOWUP_DM_MESSAGES:
+            if not self.is_sent(days):
+                return days
+        return None
+
+    @property
+    def next_due_at(self) -> Optional[datetime]:
+        stage = self.next_stage
+        return None if stage is None else self.role_expired + timedelta(
+            days=stage)
+
+    def to_row(self):
+        return (self.role_expired, self.guild_id, self.dm_3_sent,
+                self.dm_7_sent, self.dm_14_sent, self.next_stage,
+                self.next_due_at)
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(amsterdam_datetime(row['role_expired']), row['guild_id'],
+                   row['dm_3_sent'], row['dm_7_sent'], row['dm_14_sent'])
+
+    def to_json(self):
+        return {
+            "role_expired": self.role_expired.isoformat(),
+            "guild_id": self.guild_id,
+            "dm_3_sent": self.dm_3_sent,
+            "dm_7_sent": self.dm_7_sent,
+            "dm_14_sent": self.dm_14_sent
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(amsterdam_datetime(data["role_expired"]),
+                   int(data["guild_id"]), data.get("dm_3_sent", False),
+                   data.get("dm_7_sent", False), data.get("dm_14_sent", False))
+
+
+# AUTO_ROLE_CONFIG key: record type of its values
+AUTO_ROLE_RECORDS = {
+    "active_members": ActiveMember,
+    "weekend_pending": WeekendPending,
+    "role_history": RoleHistory,
+    "dm_schedule": DmSchedule
+}
+
+
+def scheduled_job(kind, job_key, due_at, member_id=None, guild_id=None,
+                  payload=None) -> dict:
+    """A due-time job for the scheduled_jobs table; job_key identifies it across restarts"""
+    return {
+        "kind": kind,
+        "job_key": job_key,
+        "due_at": due_at,
+        "member_id": member_id,
+        "guild_id": guild_id,
+        "payload": payload or {},
+        "attempts": 0
+    }
+
+
+class ExpiryScheduler:
+    """Min-heap of (due time, key); replaced or cancelled entries are skipped lazily"""
+
+    def __init__(self):
+        self.heap = []
+        self.expiries = {}  # key: current due time, the only heap entry that counts
+        self.changed = asyncio.Event()
+
+    def schedule(self, key, expiry):
+        self.expiries[key] = expiry
+        heapq.heappush(self.heap, (expiry, key))
+        if self.heap[0] == (expiry, key):
+            # New earliest due time: wake the waiting task so it sleeps less
+            self.changed.set()
+
+    def cancel(self, key):
+        self.expiries.pop(key, None)
+        if len(self.heap) > 2 * len(self.expiries) + 64:
+            self.rebuild_from(self.expiries)
+
+    def rebuild_from(self, expiries):
+        self.expiries = dict(expiries)
+        self.heap = [(expiry, key) for key, expiry in self.expiries.items()]
+        heapq.heapify(self.heap)
+        self.changed.set()
+
+    def next_expiry(self) -> Optional[datetime]:
+        while self.heap and self.expiries.get(
+                self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, now) -> List[str]:
+        due = []
+        while (expiry := self.next_expiry()) is not None and expiry <= now:
+            key = heapq.heappop(self.heap)[1]
+            del self.expiries[key]
+            due.append(key)
+        return due
+
+
+@dataclass(slots=True)
+class UserLevel:
+    """One member's level counters in one guild, as the state store sees them"""
+    message_count: int = 0
+    current_level: int = 0
+
+    def to_row(self) -> tuple:
+        return (self.message_count, self.current_level)
+
+    def to_json(self) -> dict:
+        return {
+            "message_count": self.message_count,
+            "current_level": self.current_level
+        }
+
+    @classmethod
+    def from_json(cls, data) -> "UserLevel":
+        return cls(data["message_count"], data["current_level"])
+
+
+def level_key(guild_id: int, user_id: int) -> str:
+    """State store key of a member's level counters"""
+    return f"{guild_id}:{user_id}"
+
+
+def split_level_key(key: str) -> Tuple[int, int]:
+    guild_id, user_id = key.split(":")
+    return int(guild_id), int(user_id)
+
+
+class GuildLevels:
+    """One guild's level counters in parallel arrays indexed by slot: int64 user IDs,
+    message counts and levels, plus the leaderboard order.
+
+    Members with the same message count form a block in `order`, most messages first.
+    A message swaps its author to the front of their block, which then joins the block
+    above, so counting a message and looking up a rank are O(1) and the top N is a
+    slice. Levels follow message counts, so this is also the (level, messages) order."""
+
+    def __init__(self):
+        self.slots = {}  # user_id: slot in the arrays below
+        self.user_ids = array("q")
+        self.counts = array("i")
+        self.levels = array("B")
+        self.order = array("i")  # slots, most messages first
+        self.position = array("i")  # slot: index in order
+        self.block_start = {}  # message_count: index in order of its first slot
+        self.ordered = True  # False after bulk loads until the next ranking query
+        self.total_messages = 0
+        self.level_total = 0
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def get(self, user_id: int) -> Optional[UserLevel]:
+        slot = self.slots.get(user_id)
+        if slot is None:
+            return None
+        return UserLevel(self.counts[slot], self.levels[slot])
+
+    def add(self, user_id: int) -> int:
+        """New member with no messages, ranked last"""
+        slot = len(self.user_ids)
+        self.slots[user_id] = slot
+        self.user_ids.append(user_id)
+        self.counts.append(0)
+        self.levels.append(0)
+        self.order.append(slot)
+        self.position.append(slot)
+        self.block_start.setdefault(0, slot)
+        return slot
+
+    def set(self, user_id: int, message_count: int, current_level: int) -> int:
+        """Store loaded counters; the order is rebuilt by the next ranking query"""
+        slot = self.slots.get(user_id)
+        if slot is None:
+            slot = self.add(user_id)
+        self.total_messages += message_count - self.counts[slot]
+        self.level_total += current_level - self.levels[slot]
+        self.counts[slot] = message_count
+        self.levels[slot] = current_level
+        self.ordered = False
+        return slot
+
+    def remove(self, user_id: int) -> Optional[UserLevel]:
+        slot = self.slots.pop(user_id, None)
+        if slot is None:
+            return None
+        removed = UserLevel(self.counts[slot], self.levels[slot])
+        self.total_messages -= removed.message_count
+        self.level_total -= removed.current_level
+        # The last slot moves into the gap so the arrays stay dense
+        last = len(self.user_ids) - 1
+        if slot != last:
+            moved = self.user_ids[last]
+            self.user_ids[slot] = moved
+            self.counts[slot] = self.counts[last]
+            self.levels[slot] = self.levels[last]
+            self.slots[moved] = slot
+        for values in (self.user_ids, self.counts, self.levels, self.order,
+                       self.position):
+            values.pop()
+        self.ordered = False
+        return removed
+
+    def ensure_order(self):
+        if self.ordered:
+            return
+        counts = self.counts
+        self.order = array("i", sorted(range(len(counts)),
+                                       key=counts.__getitem__,
+                                       reverse=True))
+        self.position = array("i", [0]) * len(counts)
+        self.block_start = {}
+        for index, slot in enumerate(self.order):
+            self.position[slot] = index
+            self.block_start.setdefault(counts[slot], index)
+        self.ordered = True
+
+    def increment(self, user_id: int) -> int:
+        """Count one more message for a member and return their slot"""
+        slot = self.slots.get(user_id)
+        if slot is None:
+            slot = self.add(user_id)
+        self.ensure_order()
+
+        count = self.counts[slot]
+        index = self.position[slot]
+        first = self.block_start[count]
+        other = self.order[first]
+        self.order[first], self.order[index] = slot, other
+        self.position[slot], self.position[other] = first, index
+        if first + 1 < len(self.order) and self.counts[self.order[first + 1]] == count:
+            self.block_start[count] = first + 1
+        else:
+            del self.block_start[count]
+        self.block_start.setdefault(count + 1, first)
+
+        self.counts[slot] = count + 1
+        self.total_messages += 1
+        return slot
+
+    def set_level(self, slot: int, level: int):
+        self.level_total += level - self.levels[slot]
+        self.levels[slot] = level
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based rank; members with the same count share it"""
+        slot = self.slots.get(user_id)
+        if slot is None:
+            return None
+        self.ensure_order()
+        return self.block_start[self.counts[slot]] + 1
+
+    def top(self, limit: int) -> List[Tuple[int, int, int]]:
+        """(user_id, message_count, current_level) of the most active members"""
+        self.ensure_order()
+        return [(self.user_ids[slot], self.counts[slot], self.levels[slot])
+                for slot in self.order[:limit]]
+
+
+class LevelStore:
+    """Level counters partitioned per guild. The state store sees a mapping of
+    level_key(guild_id, user_id) -> UserLevel; the message path uses the partitions."""
+
+    def __init__(self):
+        self.guilds = {}  # guild_id: GuildLevels
+
+    def guild(self, guild_id: int) -> GuildLevels:
+        partition = self.guilds.get(guild_id)
+        if partition is None:
+            partition = self.guilds[guild_id] = GuildLevels()
+        return partition
+
+    def __len__(self):
+        return sum(len(partition) for partition in self.guilds.values())
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value: UserLevel):
+        guild_id, user_id = split_level_key(key)
+        self.guild(guild_id).set(user_id, value.message_count,
+                                 value.current_level)
+
+    def get(self, key, default=None):
+        guild_id, user_id = split_level_key(key)
+        partition = self.guilds.get(guild_id)
+        value = partition.get(user_id) if partition else None
+        return default if value is None else value
+
+    def pop(self, key, default=None):
+        guild_id, user_id = split_level_key(key)
+        partition = self.guilds.get(guild_id)
+        value = partition.remove(user_id) if partition else None
+        return default if value is None else value
+
+    def keys(self):
+        return [
+            level_key(guild_id, user_id)
+            for guild_id, partition in self.guilds.items()
+            for user_id in partition.user_ids
+        ]
+
+    def items(self):
+        for guild_id, partition in self.guilds.items():
+            for slot, user_id in enumerate(partition.user_ids):
+                yield level_key(guild_id, user_id), UserLevel(
+                    partition.counts[slot], partition.levels[slot])
+
+    def update(self, items):
+        for key, value in items:
+            self[key] = value
+
+    def clear(self):
+        self.guilds.clear()
+
+    def to_json(self) -> dict:
+        return {key: value.to_json() for key, value in self.items()}
+
+    def load_json(self, data: dict):
+        """Counters from journal JSON; entries keyed by user ID alone were written
+        before levels were per guild and carry their guild in the value"""
+        for key, value in data.items():
+            if ":" not in key:
+                key = level_key(value["guild_id"], int(key))
+            self[key] = UserLevel.from_json(value)
+
+
+LEVEL_SYSTEM["user_data"] = LevelStore()
+
+# Level requirements in ascending order, for a bisect per level check
+LEVEL_STEPS = sorted(LEVEL_SYSTEM["level_requirements"].items(),
+                     key=lambda item: item[1])
+LEVEL_THRESHOLDS = [requirement for _, requirement in LEVEL_STEPS]
+
+
+def calculate_level(message_count: int) -> int:
+    """Highest level whose message requirement is met, 0 below level 1"""
+    index = bisect.bisect_right(LEVEL_THRESHOLDS, message_count)
+    return LEVEL_STEPS[index - 1][0] if index else 0
+
+
+class StateCollection:
+    """A named in-memory dict persisted through the StateStore into its own table"""
+
+    def __init__(self, name, data, table, key_column, key_cast, columns,
+                 to_row, record=None):
+        self.name = name
+        self.data = data  # the module-level dict itself, so existing code keeps working
+        self.table = table
+        # A tuple of columns for a composite key, with key_cast returning a tuple
+        self.key_columns = list(key_column) if isinstance(
+            key_column, tuple) else [key_column]
+        self.key_cast = key_cast  # dict key -> column value (int for BIGINT ids)
+        self.columns = columns  # value columns after the key column
+        self.to_row = to_row  # value -> tuple matching columns
+        self.record = record  # record class with to_json/from_json, None for plain dicts
+        self.persisted = {}  # key: JSON of the value last written to the database
+        self.dirty_keys = set()
+        self.full_scan = False
+
+    def encode(self, value):
+        if self.record:
+            value = value.to_json()
+        return json.dumps(value, sort_keys=True, default=str)
+
+    def decode(self, data):
+        return self.record.from_json(data) if self.record else data
+
+    def key_values(self, key) -> tuple:
+        values = self.key_cast(key)
+        return values if len(self.key_columns) > 1 else (values, )
+
+    def upsert_sql(self):
+        columns = self.key_columns + self.columns
+        placeholders = ", ".join(f"${i}" for i in range(1, len(columns) + 1))
+        updates = ", ".join(f"{column} = EXCLUDED.{column}"
+                            for column in self.columns)
+        return (f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                f"VALUES ({placeholders}) "
+                f"ON CONFLICT ({', '.join(self.key_columns)}) DO UPDATE SET {updates}")
+
+    async def delete_rows(self, conn, keys):
+        if len(self.key_columns) == 1:
+            await conn.execute(
+                f"DELETE FROM {self.table} WHERE {self.key_columns[0]} = ANY($1)",
+                [self.key_cast(key) for key in keys])
+            return
+        conditions = " AND ".join(
+            f"{column} = ${i}" for i, column in enumerate(self.key_columns, 1))
+        await conn.executemany(f"DELETE FROM {self.table} WHERE {conditions}",
+                               [self.key_values(key) for key in keys])
+
+    def take_changes(self):
+        """Return ({key: encoded}, [deleted keys]) since the last flush and reset the dirty marks"""
+        if self.full_scan:
+            candidates = list(self.data.keys())
+            deletes = [key for key in self.persisted if key not in self.data]
+        else:
+            candidates = list(self.dirty_keys)
+            deletes = [
+                key for key in candidates
+                if key not in self.data and key in self.persisted
+            ]
+        self.dirty_keys = set()
+        self.full_scan = False
+
+        upserts = {}
+        for key in candidates:
+            value = self.data.get(key)
+            if value is None:
+                continue
+            encoded = self.encode(value)
+            if self.persisted.get(key) != encoded:
+                upserts[key] = encoded
+        return upserts, deletes
+
+    def prime(self):
+        """Treat the current contents as already persisted"""
+        self.persisted = {
+            key: self.encode(value)
+            for key, value in self.data.items()
+        }
+        self.dirty_keys = set()
+        self.full_scan = False
+
+
+class StateStore:
+    """Unified persistence for the state dicts: batched flushes, change journal and snapshots"""
+
+    def __init__(self):
+        self.collections = {}
+        self.lock = asyncio.Lock()
+        self.metrics = {
+            "flushes": 0,
+            "rows_upserted": 0,
+            "rows_deleted": 0,
+            "journal_rows": 0,
+            "invalid_rows": 0,
+            "flush_errors": 0,
+            "last_error": None,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "snapshots": 0,
+            "last_snapshot_at": None,
+            "loaded_from": None,
+            "load_ms": 0.0
+        }
+
+    def register(self, collection: StateCollection):
+        self.collections[collection.name] = collection
+
+    def touch(self, name, key):
+        """Mark one key of a collection as changed"""
+        self.collections[name].dirty_keys.add(key)
+
+    def mark_dirty(self, *names):
+        """Mark whole collections for a diff against what was last persisted"""
+        for name in names:
+            self.collections[name].full_scan = True
+
+    def prime(self):
+        for collection in self.collections.values():
+            collection.prime()
+
+    def get_metrics(self):
+        return {
+            **self.metrics, "pending_keys": {
+                name: len(c.data) if c.full_scan else len(c.dirty_keys)
+                for name, c in self.collections.items()
+            },
+            "sizes": {
+                name: len(c.data)
+                for name, c in self.collections.items()
+            }
+        }
+
+    async def flush(self, pool, conn=None):
+        """Write every pending change and its journal rows in one transaction.
+        Pass `conn` to join the caller's transaction (as a savepoint)."""
+        if not pool:
+            return 0
+
+        async with self.lock:
+            changes = {}
+            for name, collection in self.collections.items():
+                if not (collection.full_scan or collection.dirty_keys):
+                    continue
+                upserts, deletes = collection.take_changes()
+                rows = []
+                for key, encoded in list(upserts.items()):
+                    try:
+                        rows.append(collection.key_values(key) +
+                                    tuple(collection.to_row(
+                                        collection.decode(json.loads(encoded)))))
+                    except (KeyError, TypeError, ValueError) as e:
+                        # Malformed entry - skip it rather than failing the whole batch
+                        self.metrics["invalid_rows"] += 1
+                        core_logger.warning(
+                            f"⚠️ Skipping invalid {name} entry {key}: {str(e)}")
+                        del upserts[key]
+                if upserts or deletes:
+                    changes[name] = (upserts, deletes, rows)
+
+            if not changes:
+                return 0
+
+            started = asyncio.get_running_loop().time()
+            try:
+                async with nullcontext(conn) if conn else pool.acquire() as conn, conn.transaction():
+                    journal_rows = []
+                    for name, (upserts, deletes, rows) in changes.items():
+                        collection = self.collections[name]
+                        if rows:
+                            await conn.executemany(collection.upsert_sql(),
+                                                   rows)
+                        if deletes:
+                            await collection.delete_rows(conn, deletes)
+                        journal_rows.extend(
+                            (name, key, "upsert", encoded)
+                            for key, encoded in upserts.items())
+                        journal_rows.extend((name, key, "delete", None)
+                                            for key in deletes)
+                    await conn.executemany(
+                        '''
+                        INSERT INTO state_journal (collection, key, op, data)
+                        VALUES ($1, $2, $3, $4::jsonb)
+                    ''', journal_rows)
+            except Exception as e:
+                # Nothing was committed - diff the affected collections again next time
+                for name in changes:
+                    self.collections[name].full_scan = True
+                self.metrics["flush_errors"] += 1
+                self.metrics["last_error"] = str(e)[:200]
+                core_logger.exception("❌ State store flush failed")
+                return 0
+
+            written = 0
+            for name, (upserts, deletes, rows) in changes.items():
+                collection = self.collections[name]
+                collection.persisted.update(upserts)
+                for key in deletes:
+                    collection.persisted.pop(key, None)
+                self.metrics["rows_upserted"] += len(upserts)
+                self.metrics["rows_deleted"] += len(deletes)
+                written += len(upserts) + len(deletes)
+
+            elapsed_ms = (asyncio.get_running_loop().time() - started) * 1000
+            self.metrics["flushes"] += 1
+            self.metrics["journal_rows"] += written
+            self.metrics["last_flush_ms"] = round(elapsed_ms, 2)
+            self.metrics["max_flush_ms"] = round(
+                max(self.metrics["max_flush_ms"], elapsed_ms), 2)
+            return written
+
+    async def snapshot(self, pool):
+        """Store a compact snapshot of every collection and drop the journal it covers"""
+        if not pool:
+            return
+
+        async with self.lock:
+            async with pool.acquire() as conn, conn.transaction():
+                journal_seq = await conn.fetchval(
+                    'SELECT COALESCE(MAX(seq), 0) FROM state_journal')
+                rows = []
+                for name, collection in self.collections.items():
+                    # Snapshot what is persisted - unflushed changes land in the journal later
+                    body = ",".join(
+                        f"{json.dumps(key)}:{encoded}"
+                        for key, encoded in collection.persisted.items())
+                    rows.append((name, "{" + body + "}", journal_seq))
+                await conn.executemany(
+                    '''
+                    INSERT INTO state_snapshots (collection, data, journal_seq, taken_at)
+                    VALUES ($1, $2::jsonb, $3, NOW())
+                    ON CONFLICT (collection) DO UPDATE SET
+                        data = EXCLUDED.data,
+                        journal_seq = EXCLUDED.journal_seq,
+                        taken_at = NOW()
+                ''', rows)
+                await conn.execute('DELETE FROM state_journal WHERE seq <= $1',
+                                   journal_seq)
+            self.metrics["snapshots"] += 1
+            self.metrics["last_snapshot_at"] = datetime.now(
+                timezone.utc).isoformat()
+
+    async def load(self, pool):
+        """Load every collection from its snapshot plus the journal tail; False if any snapshot is missing"""
+        if not pool:
+            return False
+
+        started = asyncio.get_running_loop().time()
+        async with pool.acquire() as conn:
+            snapshot_rows = await conn.fetch(
+                'SELECT collection, data::text AS data, journal_seq FROM state_snapshots'
+            )
+            snapshots = {row['collection']: row for row in snapshot_rows}
+            if any(name not in snapshots for name in self.collections):
+                return False
+            min_seq = min(snapshots[name]['journal_seq']
+                          for name in self.collections)
+            tail = await conn.fetch(
+                '''
+                SELECT seq, collection, key, op, data::text AS data
+                FROM state_journal WHERE seq > $1 ORDER BY seq
+            ''', min_seq)
+
+        for name, collection in self.collections.items():
+            collection.data.clear()
+            collection.data.update(
+                (key, collection.decode(value)) for key, value in json.loads(
+                    snapshots[name]['data']).items())
+        for row in tail:
+            collection = self.collections.get(row['collection'])
+            if not collection or row['seq'] <= snapshots[
+                    row['collection']]['journal_seq']:
+                continue
+            if row['op'] == "delete":
+                collection.data.pop(row['key'], None)
+            else:
+                collection.data[row['key']] = collection.decode(
+                    json.loads(row['data']))
+        self.prime()
+
+        self.metrics["loaded_from"] = f"snapshot + {len(tail)} journal rows"
+        self.metrics["load_ms"] = round(
+            (asyncio.get_running_loop().time() - started) * 1000, 2)
+        return True
+
+
+class ProviderMatrix:
+    """Which price APIs support which pairs, with last success, recent latency and error rate"""
+
+    def __init__(self):
+        self.entries = {}  # (pair, api_name): capability entry
+        self.assignments = {}  # pair: api_name
+        self.dirty = set()
+        self.last_refresh = None
+
+    def record(self, pair, api_name, success, latency_ms, at=None):
+        """Fold one request outcome into the matrix and re-pick the pair's API"""
+        at = at or datetime.now(timezone.utc)
+        alpha = PROVIDER_MATRIX_CONFIG["ewma_alpha"]
+        entry = self.entries.get((pair, api_name))
+        if entry is None:
+            entry = self.entries[(pair, api_name)] = {
+                "last_success_at": None,
+                "last_checked_at": None,
+                "latency_ms": None,
+                "error_rate": 0.0 if success else 1.0,
+                "checks": 0
+            }
+        else:
+            entry["error_rate"] = round(
+                (1 - alpha) * entry["error_rate"] + alpha * (0.0 if success else 1.0), 4)
+        if success:
+            entry["last_success_at"] = at
+            entry["latency_ms"] = round(
+                latency_ms if entry["latency_ms"] is None else
+                (1 - alpha) * entry["latency_ms"] + alpha * latency_ms, 1)
+        entry["last_checked_at"] = at
+        entry["checks"] += 1
+        self.dirty.add((pair, api_name))
+        self.assign(pair)
+
+    def supports(self, pair, api_name):
+        entry = self.entries.get((pair, api_name))
+        return bool(entry and entry["last_success_at"] and
+                    entry["error_rate"] <= PROVIDER_MATRIX_CONFIG["max_error_rate"])
+
+    def assign(self, pair):
+        """Highest-priority API that currently supports the pair"""
+        for api_name in PRICE_TRACKING_CONFIG["api_priority_order"]:
+            if self.supports(pair, api_name):
+                self.assignments[pair] = api_name
+                return
+        self.assignments.pop(pair, None)
+
+    def assigned_api(self, pair) -> Optional[str]:
+        return self.assignments.get(pair)
+
+    def load(self, rows):
+        for row in rows:
+            self.entries[(row['pair'], row['api_name'])] = {
+                "last_success_at": row['last_success_at'],
+                "last_checked_at": row['last_checked_at'],
+                "latency_ms": row['latency_ms'],
+                "error_rate": row['error_rate'],
+                "checks": row['checks']
+            }
+        for pair in {pair for pair, _ in self.entries}:
+            self.assign(pair)
+
+    def take_dirty_rows(self):
+        rows = [(pair, api_name, entry["last_success_at"], entry["last_checked_at"],
+                 entry["latency_ms"], entry["error_rate"], entry["checks"])
+                for (pair, api_name), entry in self.entries.items()
+                if (pair, api_name) in self.dirty]
+        self.dirty.clear()
+        return rows
+
+    def needs_probe(self, pair, api_name, now):
+        entry = self.entries.get((pair, api_name))
+        return (entry is None or entry["last_checked_at"] is None
+                or now - entry["last_checked_at"] >= timedelta(
+                    hours=PROVIDER_MATRIX_CONFIG["refresh_interval_hours"]))
+
+    def pair_rows(self, pair):
+        """Per-API view of one pair for /pricetest"""
+        return {
+            api_name: self.entries.get((pair, api_name))
+            for api_name in PRICE_TRACKING_CONFIG["api_priority_order"]
+        }
+
+
+class LogSink:
+    """Bounded queue of Discord log lines, coalesced into one embed per batch and channel"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.queues = {}  # channel_id: deque of (title, line, color)
+        self.depth = 0
+        self.dropped = {}  # channel_id: lines dropped since the last flush
+        self.metrics = {
+            "queued_total": 0,
+            "dropped_total": 0,
+            "undeliverable_total": 0,
+            "sent_lines": 0,
+            "sent_batches": 0,
+            "send_errors": 0
+        }
+
+    def submit(self, channel_id, title, line, color=0x0099ff):
+        """Queue a line without blocking; returns False if it was dropped"""
+        if self.depth >= self.capacity:
+            # Under pressure new lines are dropped and summarised in the next batch
+            self.dropped[channel_id] = self.dropped.get(channel_id, 0) + 1
+            self.metrics["dropped_total"] += 1
+            return False
+        self.queues.setdefault(channel_id, deque()).append((title, line, color))
+        self.depth += 1
+        self.metrics["queued_total"] += 1
+        return True
+
+    def take_batches(self, channel_id, char_limit, max_batches):
+        """Pop queued lines as (title, description, color, line_count) batches"""
+        queue = self.queues.get(channel_id)
+        batches = []
+        while queue and len(batches) < max_batches:
+            title = queue[0][0]
+            lines = []
+            colors = []
+            size = 0
+            # Consecutive lines with the same title share an embed
+            while queue and queue[0][0] == title:
+                line = queue[0][1][:char_limit]
+                if lines and size + len(line) + 1 > char_limit:
+                    break
+                colors.append(queue.popleft()[2])
+                self.depth -= 1
+                lines.append(line)
+                size += len(line) + 1
+            batches.append((title, "\n".join(lines),
+                            0xff0000 if 0xff0000 in colors else colors[0],
+                            len(lines)))
+        if queue is not None and not queue:
+            del self.queues[channel_id]
+
+        dropped = self.dropped.pop(channel_id, 0)
+        if dropped:
+            batches.append(("⚠️ Log Sink",
+                            f"{dropped} log lines dropped while the queue was full",
+                            0xff9900, 0))
+        return batches
+
+    def discard(self, channel_id):
+        """Forget lines for a channel that can't be resolved"""
+        queue = self.queues.pop(channel_id, None)
+        if queue:
+            self.depth -= len(queue)
+            self.metrics["undeliverable_total"] += len(queue)
+        self.dropped.pop(channel_id, None)
+
+    def get_metrics(self):
+        return {
+            "depth": self.depth,
+            "capacity": self.capacity,
+            "channels": {
+                str(channel_id): len(queue)
+                for channel_id, queue in self.queues.items()
+            },
+            "dropped_pending": sum(self.dropped.values()),
+            **self.metrics
+        }
+
+
+class NotificationDispatcher:
+    """One send queue per channel so each rate-limit bucket has a single request in flight"""
+
+    ALERT = 0
+    LOG = 1
+
+    def __init__(self):
+        self.queues = {}  # channel_id: PriorityQueue of pending sends
+        self.workers = {}
+        self.sequence = 0
+        self.pending_alerts = 0
+        self.alerts_idle = asyncio.Event()
+        self.alerts_idle.set()
+        self.latencies = deque(maxlen=NOTIFICATION_CONFIG["latency_history"])
+        self.metrics = {"sent": 0, "failed": 0, "rate_limited": 0}
+
+    def submit(self, channel_id, send, priority, label="", detected_at=None):
+        """Queue `send` (a coroutine function) for a channel; returns a future with its result"""
+        queue = self.queues.get(channel_id)
+        if queue is None:
+            queue = self.queues[channel_id] = asyncio.PriorityQueue()
+            self.workers[channel_id] = asyncio.create_task(
+                self.run_channel(queue))
+        if priority == self.ALERT:
+            self.pending_alerts += 1
+            self.alerts_idle.clear()
+        future = asyncio.get_running_loop().create_future()
+        self.sequence += 1
+        queue.put_nowait((priority, self.sequence, send, label, detected_at,
+                          future))
+        return future
+
+    async def run_channel(self, queue):
+        while True:
+            item = await queue.get()
+            priority, _, send, label, detected_at, future = item
+            if priority != self.ALERT and not self.alerts_idle.is_set():
+                # Log traffic yields while a trade alert is queued on any channel;
+                # it goes back in order and this channel's own alerts are picked first
+                queue.put_nowait(item)
+                queue.task_done()
+                try:
+                    await asyncio.wait_for(self.alerts_idle.wait(), 0.1)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            ok = False
+            try:
+                result = await self.send_with_retry(send)
+                ok = True
+                self.metrics["sent"] += 1
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                self.metrics["failed"] += 1
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                if priority == self.ALERT:
+                    self.pending_alerts -= 1
+                    if not self.pending_alerts:
+                        self.alerts_idle.set()
+                    if detected_at is not None:
+                        self.latencies.append({
+                            "label": label,
+                            "ms": round((asyncio.get_running_loop().time() -
+                                         detected_at) * 1000, 1),
+                            "ok": ok
+                        })
+                queue.task_done()
+
+    async def send_with_retry(self, send):
+        for attempt in range(NOTIFICATION_CONFIG["max_attempts"]):
+            try:
+                return await send()
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt + 1 == NOTIFICATION_CONFIG[
+                        "max_attempts"]:
+                    raise
+                self.metrics["rate_limited"] += 1
+                await asyncio.sleep(getattr(e, "retry_after", None) or 1)
+
+    async def drain(self, timeout):
+        """Wait for queued sends to finish, e.g. before shutdown"""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*[queue.join() for queue in self.queues.values()]),
+                timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def get_metrics(self):
+        values = [record["ms"] for record in self.latencies]
+        return {
+            "queued": {
+                str(channel_id): queue.qsize()
+                for channel_id, queue in self.queues.items()
+            },
+            "pending_alerts": self.pending_alerts,
+            **self.metrics,
+            "alert_latency_ms": {
+                "avg": round(sum(values) / len(values), 1),
+                "max": max(values)
+            } if values else {},
+            "recent": list(self.latencies)[-10:]
+        }
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the most recent log records in memory so GET /logs can search them"""
+
+    def __init__(self, capacity):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        try:
+            self.records.append(
+                (record.created, record.name.rsplit(".", 1)[-1],
+                 record.levelno, record.getMessage()))
+        except Exception:
+            self.handleError(record)
+
+    def query(self, subsystem=None, min_level=logging.NOTSET, text=None,
+              limit=100):
+        """Newest matching records first"""
+        text = text.lower() if text else None
+        matches = []
+        for created, name, levelno, message in reversed(self.records):
+            if ((subsystem and name != subsystem) or levelno < min_level
+                    or (text and text not in message.lower())):
+                continue
+            matches.append({
+                "time": datetime.fromtimestamp(created, timezone.utc).isoformat(),
+                "subsystem": name,
+                "level": logging.getLevelName(levelno),
+                "message": message
+            })
+            if len(matches) >= limit:
+                break
+        return matches
+
+
+LOG_RING_BUFFER = RingBufferHandler(LOGGING_CONFIG["ring_buffer_size"])
+LOGGERS = {
+    subsystem: logging.getLogger(f"fxpp.{subsystem}")
+    for subsystem in LOG_SUBSYSTEMS
+}
+core_logger = LOGGERS["core"]
+pricing_logger = LOGGERS["pricing"]
+tracking_logger = LOGGERS["tracking"]
+autorole_logger = LOGGERS["autorole"]
+invites_logger = LOGGERS["invites"]
+giveaways_logger = LOGGERS["giveaways"]
+levels_logger = LOGGERS["levels"]
+DEBUG_SAMPLE_COUNTS = {}
+
+
+def setup_logging():
+    root = logging.getLogger("fxpp")
+    root.setLevel(LOGGING_CONFIG["default_level"])
+    root.propagate = False
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(
+        logging.Formatter("%(levelname)s [%(name)s] %(message)s"))
+    root.addHandler(console)
+    root.addHandler(LOG_RING_BUFFER)
+    for setting in LOGGING_CONFIG["subsystem_levels"].split(","):
+        if "=" in setting:
+            subsystem, level = setting.split("=", 1)
+            set_log_level(subsystem.strip(), level.strip())
+
+
+def set_log_level(subsystem: str, level: str) -> bool:
+    """Change a subsystem's level at runtime; "all" changes the default"""
+    level = level.upper()
+    if not isinstance(logging.getLevelName(level), int):
+        return False
+    if subsystem == "all":
+        logging.getLogger("fxpp").setLevel(level)
+        return True
+    if subsystem not in LOGGERS:
+        return False
+    LOGGERS[subsystem].setLevel(level)
+    return True
+
+
+def get_log_levels() -> Dict[str, str]:
+    return {
+        subsystem: logging.getLevelName(logger.getEffectiveLevel())
+        for subsystem, logger in LOGGERS.items()
+    }
+
+
+def is_authorized_request(request) -> bool:
+    """Shared-secret check for web endpoints that expose logs or trade data: a Bearer
+    token or ?token= matching LOG_API_TOKEN, or localhost when no token is configured"""
+    token = LOGGING_CONFIG["api_token"]
+    if not token:
+        return request.remote in ("127.0.0.1", "::1")
+    supplied = request.headers.get("Authorization", "")
+    supplied = supplied.removeprefix("Bearer ") if supplied else request.query.get("token", "")
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def log_sampled(logger, message, *args):
+    """Hot-path debug line: only 1 in debug_sample_rate calls per message is logged"""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    count = DEBUG_SAMPLE_COUNTS.get(message, 0)
+    DEBUG_SAMPLE_COUNTS[message] = count + 1
+    if count % LOGGING_CONFIG["debug_sample_rate"] == 0:
+        logger.debug(message, *args)
+
+
+setup_logging()
+
+
+# ===== SIGNAL PARSING =====
+
+# Number as written in signals ("$3473.50", "1.08500")
+_PRICE = r'\$?(?P<{}>[0-9]+(?:\.[0-9]+)?)'
+
+# One alternation covering the /entry format and the legacy format, scanned once per message.
+# Alternatives are tried left to right at each position, so "Entry Type:" / "Entry Price:"
+# win over the legacy "Entry" form. The first value seen for a field is kept, and the
+# /entry form of a field always beats its legacy form, as in the old field-by-field parser.
+# The leading lookahead rejects most positions on their first character before any
+# alternative is tried, which is what keeps the single scan cheaper than per-field searches.
+SIGNAL_TOKEN_PATTERN = re.compile(
+    r'(?=[TtEeSsBb])(?:'
+    r'Trade Signal For:[ \t]*(?P<pair>[^\n]*)'
+    r'|Entry Type:\s*(?P<action>Buy|Sell)\s+(?P<order_type>execution|limit)'
+    r'|Entry Price:\s*' + _PRICE.format('entry') +
+    r'|Take Profit (?P<tp_n>[123]):\s*' + _PRICE.format('tp') +
+    r'|Stop Loss:\s*' + _PRICE.format('sl') +
+    r'|TP(?P<legacy_tp_n>[123])[:\s]*' + _PRICE.format('legacy_tp') +
+    r'|SL[:\s]*' + _PRICE.format('legacy_sl') +
+    r'|Entry[:\s]*' + _PRICE.format('legacy_entry') +
+    r'|(?P<legacy_action>BUY|SELL))', re.IGNORECASE)
+
+_PAIR_CLEAN_PATTERN = re.compile(r'[^A-Za-z0-9]')
+
+SIGNAL_REQUIRED_FIELDS = ("pair", "action", "entry", "tp1", "tp2", "tp3", "sl")
+
+
+@dataclass
+class Signal:
+    """A parsed trading signal; errors block tracking, warnings are informational"""
+    pair: Optional[str] = None
+    action: Optional[str] = None  # "BUY" or "SELL"
+    order_type: Optional[str] = None  # "execution" or "limit" (None for legacy signals)
+    entry: Optional[float] = None
+    tp1: Optional[float] = None
+    tp2: Optional[float] = None
+    tp3: Optional[float] = None
+    sl: Optional[float] = None
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+    @property
+    def entry_type(self) -> Optional[str]:
+        if self.action and self.order_type:
+            return f"{self.action.lower()} {self.order_type}"
+        return None
+
+    def to_trade_data(self) -> Dict:
+        """Convert to the trade_data dict used by the tracking system"""
+        return {
+            "pair": self.pair,
+            "action": self.action,
+            "entry": self.entry,
+            "tp1": self.tp1,
+            "tp2": self.tp2,
+            "tp3": self.tp3,
+            "sl": self.sl,
+            # Limit orders wait for the entry to be hit before tracking TP/SL
+            "status": "pending_entry" if self.order_type == "limit" else "active",
+            "tp_hits": [],
+            "breakeven_active": False,
+            "entry_type": self.entry_type
+        }
+
+
+def parse_signal(content: str) -> Signal:
+    """Parse a signal message in a single scan over precompiled patterns"""
+    values = {}
+    legacy = {}
+
+    for match in SIGNAL_TOKEN_PATTERN.finditer(content):
+        kind = match.lastgroup
+        if kind == "pair":
+            values.setdefault("pair", match.group("pair"))
+        elif kind == "order_type":
+            values.setdefault("action", match.group("action").upper())
+            values.setdefault("order_type", match.group("order_type").lower())
+        elif kind == "tp":
+            values.setdefault(f"tp{match.group('tp_n')}", match.group("tp"))
+        elif kind == "legacy_tp":
+            legacy.setdefault(f"tp{match.group('legacy_tp_n')}",
+                              match.group("legacy_tp"))
+        elif kind in ("entry", "sl"):
+            values.setdefault(kind, match.group(kind))
+        elif kind == "legacy_action":
+            legacy.setdefault("action", match.group(kind).upper())
+        else:  # legacy_entry, legacy_sl
+            legacy.setdefault(kind[len("legacy_"):], match.group(kind))
+
+    for key, value in legacy.items():
+        values.setdefault(key, value)
+
+    signal = Signal(order_type=values.get("order_type"),
+                    action=values.get("action"))
+    if values.get("pair") is not None:
+        signal.pair = _PAIR_CLEAN_PATTERN.sub('', values["pair"]).upper() or None
+    for key in ("entry", "tp1", "tp2", "tp3", "sl"):
+        if key in values:
+            setattr(signal, key, float(values[key]))
+
+    missing = [
+        name for name in SIGNAL_REQUIRED_FIELDS
+        if getattr(signal, name) is None
+    ]
+    if missing:
+        signal.errors.append(f"missing fields: {', '.join(missing)}")
+        return signal
+
+    # Levels should sit on the correct side of the entry for the direction
+    if signal.action == "BUY":
+        ordered = signal.sl < signal.entry < signal.tp1 < signal.tp2 < signal.tp3
+    else:
+        ordered = signal.sl > signal.entry > signal.tp1 > signal.tp2 > signal.tp3
+    if not ordered:
+        signal.warnings.append(
+            f"levels out of order for {signal.action}: SL {signal.sl}, entry {signal.entry}, "
+            f"TP {signal.tp1}/{signal.tp2}/{signal.tp3}")
+
+    return signal
+
+
+# on_message prefilter, built once from PRICE_TRACKING_CONFIG so that ordinary chat is
+# rejected with int-set lookups instead of str() conversions and substring searches
+SIGNAL_AUTHOR_IDS = frozenset({int(PRICE_TRACKING_CONFIG["owner_user_id"])})
+SIGNAL_EXCLUDED_CHANNEL_IDS = frozenset(
+    {int(PRICE_TRACKING_CONFIG["excluded_channel_id"])})
+
+# Signals for these pairs are posted but not tracked
+UNTRACKED_SIGNAL_PATTERN = re.compile(r'US100|GER40', re.IGNORECASE)
+
+
+def is_signal_candidate(message) -> bool:
+    """Whether a message can be a trading signal; cheapest checks first"""
+    author = message.author
+    return (PRICE_TRACKING_CONFIG["enabled"]
+            and (author.bot or author.id in SIGNAL_AUTHOR_IDS)
+            and message.channel.id not in SIGNAL_EXCLUDED_CHANNEL_IDS
+            and PRICE_TRACKING_CONFIG["signal_keyword"] in message.content)
+
+
+# ===== SIGNAL GROUPS =====
+# A signal posted to several channels is tracked once: the first message is the
+# tracked trade and the others are stored as "linked_messages" and get the same replies.
+
+
+def encode_linked_messages(linked_messages) -> str:
+    """Linked messages as "channel_id:message_id,..." for the active_trades column"""
+    return ','.join(f"{link['channel_id']}:{link['message_id']}"
+                    for link in linked_messages or [])
+
+
+def decode_linked_messages(value) -> List[Dict]:
+    links = []
+    for item in (value or '').split(','):
+        if ':' in item:
+            channel_id, message_id = item.split(':', 1)
+            links.append({"channel_id": int(channel_id), "message_id": message_id})
+    return links
+
+
 class TradingBot(commands.Bot):
 
     def __init__(self):
@@ -191,39 +1852,168 @@ class TradingBot(commands.Bot):
         self.client_session = None
         self.last_online_time = None
         self.last_heartbeat = None
+        self.local_journal = LocalJournal(LOCAL_JOURNAL_CONFIG["path"])
+        self.journal_sync_task = None
+        self.journal_replay_stats = {}
+        self.state_store = StateStore()
+        self.register_state_collections()
+        self._saved_auto_role_settings = None
+        self.provider_matrix = ProviderMatrix()
+        self.startup_report = {}
+        self.log_sink = LogSink(LOG_SINK_CONFIG["queue_size"])
+        self.notifications = NotificationDispatcher()
+        self.local_jobs = {}  # job_key: job, held here while there is no database
+        self.job_heap = ExpiryScheduler()  # local due times; its event also wakes the scheduler
+        self.next_job_due = None
+        self.job_handlers = {
+            "monday_activation": self.run_monday_activation_job,
+            "welcome_dm": self.run_welcome_dm_job,
+            "followup_dms": self.run_followup_dms_job,
+            "maintenance": self.run_maintenance_job
+        }
+        # Kinds whose claimed jobs are handled together, one commit per batch
+        self.job_batch_handlers = {"role_expiry": self.run_role_expiry_batch}
+        self.job_metrics = {
+            "scheduled": 0,
+            "completed": 0,
+            "retried": 0,
+            "failed": 0
+        }
+        self.job_lateness = deque(
+            maxlen=JOB_SCHEDULER_CONFIG["lateness_history"])
+        self.role_edit_next_at = 0.0
+        self.role_expiry_burst = None  # progress of the expiry burst being worked through
+        self.role_expiry_metrics = {
+            "batches": 0,
+            "expired": 0,
+            "rate_limited": 0,
+            "last_batch_size": 0,
+            "last_batch_seconds": 0.0,
+            "last_commit_ms": 0.0
+        }
+        self.dm_next_send_at = 0.0
+        self.dm_outbox_metrics = {
+            "queued": 0,
+            "deduplicated": 0,
+            "sent": 0,
+            "retried": 0,
+            "rate_limited": 0,
+            "forbidden": 0,
+            "failed": 0
+        }
+        self.dm_sent_times = deque(maxlen=1000)
+        self.signal_queue = asyncio.Queue(
+            maxsize=SIGNAL_INGESTION_CONFIG["queue_size"])
+        self.signal_latencies = deque(
+            maxlen=SIGNAL_INGESTION_CONFIG["latency_history"])
+
+    def register_state_collections(self):
+        """Register the module-level state dicts with the state store"""
+        self.state_store.register(
+            StateCollection(
+                "active_members", AUTO_ROLE_CONFIG["active_members"],
+                "active_members", "member_id", int, [
+                    "role_added_time", "role_id", "guild_id",
+                    "weekend_delayed", "expiry_time", "custom_duration"
+                ], ActiveMember.to_row, ActiveMember))
+        self.state_store.register(
+            StateCollection("weekend_pending",
+                            AUTO_ROLE_CONFIG["weekend_pending"],
+                            "weekend_pending", "member_id", int,
+                            ["join_time", "guild_id"], WeekendPending.to_row,
+                            WeekendPending))
+        self.state_store.register(
+            StateCollection(
+                "role_history", AUTO_ROLE_CONFIG["role_history"],
+                "role_history", "member_id", int,
+                ["first_granted", "times_granted", "last_expired", "guild_id"],
+                RoleHistory.to_row, RoleHistory))
+        self.state_store.register(
+            StateCollection(
+                "dm_schedule", AUTO_ROLE_CONFIG["dm_schedule"], "dm_schedule",
+                "member_id", int, [
+                    "role_expired", "guild_id", "dm_3_sent", "dm_7_sent",
+                    "dm_14_sent", "next_stage", "next_due_at"
+                ], DmSchedule.to_row, DmSchedule))
+        self.state_store.register(
+            StateCollection(
+                "user_levels", LEVEL_SYSTEM["user_data"], "user_levels",
+                ("guild_id", "user_id"), split_level_key,
+                ["message_count", "current_level"], UserLevel.to_row,
+                UserLevel))
+        self.state_store.register(
+            StateCollection(
+                "invite_tracking", INVITE_TRACKING, "invite_tracking",
+                "invite_code", str, [
+                    "guild_id", "creator_id", "nickname", "total_joins",
+                    "total_left", "current_members", "last_updated"
+                ], lambda data:
+                (data["guild_id"], data["creator_id"], data["nickname"],
+                 data["total_joins"], data["total_left"],
+                 data["current_members"], datetime.now(timezone.utc))))
 
     async def log_to_discord(self, message):
-        """Send log message to Discord channel"""
+        """Queue log message for the Discord log channel"""
         if self.log_channel:
-            try:
-                await self.log_channel.send(f"📋 **Bot Log:** {message}")
-            except Exception as e:
-                print(f"Failed to send log to Discord: {e}")
-        # Always print to console as backup
-        print(message)
+            self.log_sink.submit(self.log_channel.id, "📋 Bot Log", message)
+        # Always log to console as backup
+        core_logger.info(message)
 
     async def log_giveaway_event(self, message):
-        """Send giveaway-related log message to giveaway debug channel"""
-        giveaway_debug_channel = self.get_channel(GIVEAWAY_DEBUG_CHANNEL_ID)
-        if giveaway_debug_channel:
-            try:
-                await giveaway_debug_channel.send(
-                    f"🎁 **Giveaway Log:** {message}")
-            except Exception as e:
-                print(f"Failed to send giveaway log to Discord: {e}")
-        # Always print to console as backup
-        print(f"[GIVEAWAY] {message}")
+        """Queue giveaway-related log message for the giveaway debug channel"""
+        self.log_sink.submit(GIVEAWAY_DEBUG_CHANNEL_ID, "🎁 Giveaway Log",
+                             message)
+        # Always log to console as backup
+        giveaways_logger.info(message)
+
+    @tasks.loop(seconds=LOG_SINK_CONFIG["flush_interval_seconds"])
+    async def log_sink_task(self):
+        """Send queued log lines as batched embeds"""
+        await self.flush_log_sink()
+
+    async def flush_log_sink(self):
+        for channel_id in set(self.log_sink.queues) | set(
+                self.log_sink.dropped):
+            channel = self.get_channel(channel_id)
+            if not channel:
+                self.log_sink.discard(channel_id)
+                continue
+            for title, description, color, line_count in self.log_sink.take_batches(
+                    channel_id, LOG_SINK_CONFIG["embed_char_limit"],
+                    LOG_SINK_CONFIG["max_embeds_per_flush"]):
+                embed = discord.Embed(title=title,
+                                      description=description,
+                                      color=color,
+                                      timestamp=datetime.now())
+                try:
+                    await self.notifications.submit(
+                        channel_id,
+                        lambda channel=channel, embed=embed: channel.send(
+                            embed=embed), NotificationDispatcher.LOG)
+                    self.log_sink.metrics["sent_batches"] += 1
+                    self.log_sink.metrics["sent_lines"] += line_count
+                except Exception as e:
+                    self.log_sink.metrics["send_errors"] += 1
+                    print(f"Failed to send log batch to Discord: {e}")
 
     async def close(self):
         """Cleanup when bot shuts down"""
         # Record offline time for recovery
         self.last_online_time = datetime.now(AMSTERDAM_TZ)
+        if not self.db_pool:
+            self.journal_level_counts()
+            self.local_journal.sync()
         if self.db_pool:
             try:
                 await self.save_bot_status()
             except Exception as e:
                 print(f"Failed to save bot status: {e}")
 
+        # Send whatever is still queued for the log channels
+        if self.is_ready():
+            await self.notifications.drain(10)
+            await self.flush_log_sink()
+
         # Close aiohttp client session to prevent unclosed client session warnings
         if self.client_session:
             await self.client_session.close()
@@ -231,6 +2021,8 @@ class TradingBot(commands.Bot):
 
         # Close database pool
         if self.db_pool:
+            await self.state_store.flush(self.db_pool)
+            await self.save_provider_matrix()
             await self.db_pool.close()
             print("✅ Database connection pool closed")
 
@@ -240,39 +2032,7 @@ class TradingBot(commands.Bot):
     def calculate_live_tracking_levels(self, live_price: float, pair: str,
                                        action: str):
         """Calculate TP and SL levels based on live price for backend tracking"""
-        if pair in PAIR_CONFIG:
-            pip_value = PAIR_CONFIG[pair]['pip_value']
-        else:
-            # Default values for unknown pairs
-            pip_value = 0.0001
-
-        # Calculate pip amounts (20, 40, 70, 50 as specified by user)
-        tp1_pips = 20 * pip_value
-        tp2_pips = 40 * pip_value
-        tp3_pips = 70 * pip_value
-        sl_pips = 50 * pip_value
-
-        # Determine direction based on action
-        is_buy = action.upper() == "BUY"
-
-        if is_buy:
-            tp1 = live_price + tp1_pips
-            tp2 = live_price + tp2_pips
-            tp3 = live_price + tp3_pips
-            sl = live_price - sl_pips
-        else:  # SELL
-            tp1 = live_price - tp1_pips
-            tp2 = live_price - tp2_pips
-            tp3 = live_price - tp3_pips
-            sl = live_price + sl_pips
-
-        return {
-            'entry': live_price,
-            'tp1': tp1,
-            'tp2': tp2,
-            'tp3': tp3,
-            'sl': sl
-        }
+        return calculate_live_tracking_levels(live_price, pair, action)
 
     async def save_bot_status(self):
         """Save bot status to database for offline recovery"""
@@ -324,7 +2084,9 @@ class TradingBot(commands.Bot):
                 offline_check_time = datetime.now(AMSTERDAM_TZ) - timedelta(
                     hours=24)
 
-            recovered_count = 0
+            started = asyncio.get_running_loop().time()
+            offline_since = offline_check_time.astimezone(timezone.utc)
+            recovered_count = scanned = cached = chunk_requests = 0
 
             for guild in self.guilds:
                 if not guild:
@@ -334,232 +2096,162 @@ class TradingBot(commands.Bot):
                 if not role:
                     continue
 
-                # Get all members and check join times
-                async for member in guild.fetch_members(limit=None):
+                # Startup chunking fills the member cache before on_ready; a guild it
+                # skipped is chunked over the gateway rather than paged through REST
+                if not guild.chunked:
+                    await guild.chunk(cache=True)
+                    chunk_requests += 1
+                cached += len(guild.members)
+
+                # Newest joiners first, so the scan stops at the first join before the offline window
+                for member in sorted(guild.members,
+                                     key=member_joined_utc,
+                                     reverse=True):
+                    scanned += 1
+                    if member_joined_utc(member) <= offline_since:
+                        break
                     if member.bot:  # Skip bots
                         continue
 
                     member_id_str = str(member.id)
 
-                    # Check if member joined after we went offline
-                    if member.joined_at and member.joined_at.replace(
-                            tzinfo=timezone.utc
-                    ) > offline_check_time.astimezone(timezone.utc):
+                    # Check if they already have the role or are already tracked
+                    if member_id_str in AUTO_ROLE_CONFIG["active_members"]:
+                        continue  # Already tracked
 
-                        # Check if they already have the role or are already tracked
-                        if member_id_str in AUTO_ROLE_CONFIG["active_members"]:
-                            continue  # Already tracked
-
-                        if role in member.roles:
-                            continue  # Already has role
-
-                        # Check anti-abuse system
-                        if member_id_str in AUTO_ROLE_CONFIG["role_history"]:
-                            await self.log_to_discord(
-                                f"🚫 {member.display_name} joined while offline but blocked by anti-abuse system"
-                            )
-                            continue
+                    if role in member.roles:
+                        continue  # Already has role
 
-                        # Process this offline joiner
-                        join_time = member.joined_at.astimezone(AMSTERDAM_TZ)
-
-                        # Add the role
-                        await member.add_roles(
-                            role, reason="Auto-role recovery for offline join")
-
-                        # Determine if it was weekend when they joined
-                        if self.is_weekend_time(join_time):
-                            # Weekend join - 120 hours (5 days) from join time to account for weekend
-                            expiry_time = join_time + timedelta(hours=120)
-
-                            AUTO_ROLE_CONFIG["active_members"][
-                                member_id_str] = {
-                                    "role_added_time": join_time.isoformat(),
-                                    "role_id": AUTO_ROLE_CONFIG["role_id"],
-                                    "guild_id": guild.id,
-                                    "weekend_delayed": True,
-                                    "expiry_time": expiry_time.isoformat()
-                                }
-
-                            # Send weekend DM
-                            try:
-                                weekend_message = (
-                                    "**Welcome to FX Pip Pioneers!** As a welcome gift, we've given you "
-                                    "**access to the Premium Signals channel for 3 trading days.** Since you joined during the weekend, "
-                                    "your access will expire in 5 days (120 hours) to account for the 2 weekend days when the markets are closed. "
-                                    "This way, you get the full 3 trading days of premium access. Good luck trading!")
-                                await member.send(weekend_message)
-                            except discord.Forbidden:
-                                await self.log_to_discord(
-                                    f"❌ Could not send weekend DM to {member.display_name} (DMs disabled)"
-                                )
-
-                        else:
-                            # Regular join - 72 hours (3 days) from join time
-                            expiry_time = join_time + timedelta(hours=72)
-
-                            AUTO_ROLE_CONFIG["active_members"][
-                                member_id_str] = {
-                                    "role_added_time": join_time.isoformat(),
-                                    "role_id": AUTO_ROLE_CONFIG["role_id"],
-                                    "guild_id": guild.id,
-                                    "weekend_delayed": False,
-                                    "expiry_time": expiry_time.isoformat()
-                                }
-
-                            # Send regular welcome DM
-                            try:
-                                welcome_message = (
-                                    "**Welcome to FX Pip Pioneers!** As a welcome gift, we've given you "
-                                    "**access to the Premium Signals channel for 3 days.** "
-                                    "Good luck trading!")
-                                await member.send(welcome_message)
-                            except discord.Forbidden:
-                                await self.log_to_discord(
-                                    f"❌ Could not send welcome DM to {member.display_name} (DMs disabled)"
-                                )
-
-                        # Record in role history for anti-abuse
-                        AUTO_ROLE_CONFIG["role_history"][member_id_str] = {
-                            "first_granted": join_time.isoformat(),
-                            "times_granted": 1,
-                            "last_expired": None,
-                            "guild_id": guild.id
-                        }
-
-                        recovered_count += 1
+                    # Check anti-abuse system
+                    if member_id_str in AUTO_ROLE_CONFIG["role_history"]:
                         await self.log_to_discord(
-                            f"✅ Recovered offline joiner: {member.display_name}"
+                            f"🚫 {member.display_name} joined while offline but blocked by anti-abuse system"
                         )
+                        continue
 
-            # Save the updated configuration
-            await self.save_auto_role_config()
-
-            if recovered_count > 0:
-                await self.log_to_discord(
-                    f"🎯 Successfully recovered {recovered_count} members who joined while bot was offline!"
-                )
-            else:
-                await self.log_to_discord(
-                    "✅ No offline members found to recover")
-
-        except Exception as e:
-            await self.log_to_discord(
-                f"❌ Error during offline member recovery: {str(e)}")
-            print(f"Offline recovery error: {e}")
-
-    async def recover_offline_dm_reminders(self):
-        """Check for DM reminders that should have been sent while bot was offline"""
-        if not AUTO_ROLE_CONFIG["enabled"] or not self.db_pool:
-            return
-
-        try:
-            await self.log_to_discord(
-                "🔍 Checking for missed DM reminders while offline...")
+                    # Process this offline joiner
+                    join_time = member.joined_at.astimezone(AMSTERDAM_TZ)
 
-            current_time = datetime.now(AMSTERDAM_TZ)
-            recovered_dms = 0
+                    # Add the role
+                    await member.add_roles(
+                        role, reason="Auto-role recovery for offline join")
 
-            # Check all members in DM schedule for missed reminders
-            for member_id_str, dm_data in AUTO_ROLE_CONFIG[
-                    "dm_schedule"].items():
-                try:
-                    role_expired = datetime.fromisoformat(
-                        dm_data["role_expired"]).replace(tzinfo=AMSTERDAM_TZ)
-                    guild_id = dm_data["guild_id"]
+                    # Determine if it was weekend when they joined
+                    if self.is_weekend_time(join_time):
+                        # Weekend join - 120 hours (5 days) from join time to account for weekend
+                        expiry_time = join_time + timedelta(hours=120)
 
-                    # Calculate when each DM should have been sent
-                    dm_3_time = role_expired + timedelta(days=3)
-                    dm_7_time = role_expired + timedelta(days=7)
-                    dm_14_time = role_expired + timedelta(days=14)
-
-                    guild = self.get_guild(guild_id)
-                    if not guild:
-                        continue
+                        AUTO_ROLE_CONFIG["active_members"][
+                            member_id_str] = ActiveMember(
+                                join_time,
+                                AUTO_ROLE_CONFIG["role_id"],
+                                guild.id,
+                                weekend_delayed=True,
+                                expiry_time=expiry_time)
+
+                        # Send weekend DM
+                        weekend_message = (
+                            "**Welcome to FX Pip Pioneers!** As a welcome gift, we've given you "
+                            "**access to the Premium Signals channel for 3 trading days.** Since you joined during the weekend, "
+                            "your access will expire in 5 days (120 hours) to account for the 2 weekend days when the markets are closed. "
+                            "This way, you get the full 3 trading days of premium access. Good luck trading!")
+                        await self.enqueue_dm(member.id, weekend_message,
+                                              f"join-welcome:{member.id}",
+                                              "weekend welcome", guild.id)
 
-                    member = guild.get_member(int(member_id_str))
-                    if not member:
-                        continue
+                    else:
+                        # Regular join - 72 hours (3 days) from join time
+                        expiry_time = join_time + timedelta(hours=72)
 
-                    # Check if member has Gold Pioneer role (skip DMs if they do)
-                    if any(role.id == GOLD_PIONEER_ROLE_ID
-                           for role in member.roles):
-                        continue
+                        AUTO_ROLE_CONFIG["active_members"][
+                            member_id_str] = ActiveMember(
+                                join_time,
+                                AUTO_ROLE_CONFIG["role_id"],
+                                guild.id,
+                                expiry_time=expiry_time)
 
-                    # Send missed 3-day DM
-                    if not dm_data["dm_3_sent"] and current_time >= dm_3_time:
-                        try:
-                            dm_message = "Hey! It's been 3 days since your **3-day free access to the Premium Signals channel** ended. We truly hope that you were able to catch good trades with us during that time.\n\nAs you've probably seen, our free signals channel gets **1 free signal per day**, while our **Gold Pioneers** in <#1350929852299214999> receive **6+ high-quality signals per day. That means that our Premium Signals Channel offers way more chances to profit and grow consistently.\n\nWe'd love to **invite you back to Premium Signals Channel,** so you don't miss out on more solid opportunities.\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer/gold-pioneer/>"
-                            await member.send(dm_message)
-                            AUTO_ROLE_CONFIG["dm_schedule"][member_id_str][
-                                "dm_3_sent"] = True
-                            recovered_dms += 1
-                            await self.log_to_discord(
-                                f"📤 Sent missed 3-day DM to {member.display_name}"
-                            )
-                        except discord.Forbidden:
-                            await self.log_to_discord(
-                                f"❌ Could not send missed 3-day DM to {member.display_name} (DMs disabled)"
-                            )
+                        # Send regular welcome DM
+                        welcome_message = (
+                            "**Welcome to FX Pip Pioneers!** As a welcome gift, we've given you "
+                            "**access to the Premium Signals channel for 3 days.** "
+                            "Good luck trading!")
+                        await self.enqueue_dm(member.id, welcome_message,
+                                              f"join-welcome:{member.id}",
+                                              "welcome", guild.id)
 
-                    # Send missed 7-day DM
-                    if not dm_data["dm_7_sent"] and current_time >= dm_7_time:
-                        try:
-                            dm_message = "It's been a week since your Premium Signals trial ended. Since then, our **Gold Pioneers have been catching trade setups daily in <#1350929852299214999>**.\n\nIf you found value in just 3 days, imagine what results you could've been seeing by now with full access. It's all about **consistency and staying connected to the right information**.\n\nWe'd like to **personally invite you to rejoin Premium Signals** and get back into the rhythm.\n\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer/gold-pioneer/>"
-                            await member.send(dm_message)
-                            AUTO_ROLE_CONFIG["dm_schedule"][member_id_str][
-                                "dm_7_sent"] = True
-                            recovered_dms += 1
-                            await self.log_to_discord(
-                                f"📤 Sent missed 7-day DM to {member.display_name}"
-                            )
-                        except discord.Forbidden:
-                            await self.log_to_discord(
-                                f"❌ Could not send missed 7-day DM to {member.display_name} (DMs disabled)"
-                            )
+                    await self.schedule_auto_role_jobs(member_id_str)
 
-                    # Send missed 14-day DM
-                    if not dm_data["dm_14_sent"] and current_time >= dm_14_time:
-                        try:
-                            dm_message = "Hey! It's been two weeks since your free access to our Premium Signals Channel ended. We hope you've stayed active since then. \n\nIf you've been trading solo or passively following the free channel, you might be feeling the difference. In <#1350929852299214999>, it's not just about more signals. It's about the **structure, support, and smarter decision-making**. That edge can make all the difference over time.\n\nWe'd love to **invite you back into the Premium Signals Channel** and help you start compounding results again.\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer/gold-pioneer/>"
-                            await member.send(dm_message)
-                            AUTO_ROLE_CONFIG["dm_schedule"][member_id_str][
-                                "dm_14_sent"] = True
-                            recovered_dms += 1
-                            await self.log_to_discord(
-                                f"📤 Sent missed 14-day DM to {member.display_name}"
-                            )
-                        except discord.Forbidden:
-                            await self.log_to_discord(
-                                f"❌ Could not send missed 14-day DM to {member.display_name} (DMs disabled)"
-                            )
+                    # Record in role history for anti-abuse
+                    AUTO_ROLE_CONFIG["role_history"][
+                        member_id_str] = RoleHistory(join_time, guild.id)
 
-                except Exception as e:
+                    recovered_count += 1
                     await self.log_to_discord(
-                        f"❌ Error processing missed DM for member {member_id_str}: {str(e)}"
+                        f"✅ Recovered offline joiner: {member.display_name}"
                     )
-                    continue
 
-            # Save updated DM schedule
+            # Save the updated configuration
             await self.save_auto_role_config()
 
-            if recovered_dms > 0:
+            self.startup_report["member_recovery"] = {
+                "members_cached": cached,
+                "members_scanned": scanned,
+                "chunk_requests": chunk_requests,
+                "recovered": recovered_count,
+                "duration_ms": round(
+                    (asyncio.get_running_loop().time() - started) * 1000, 1)
+            }
+            scan_summary = (
+                f"scanned {scanned} of {cached} cached members in "
+                f"{self.startup_report['member_recovery']['duration_ms']:.0f}ms")
+
+            if recovered_count > 0:
                 await self.log_to_discord(
-                    f"📬 Successfully sent {recovered_dms} missed DM reminders!"
+                    f"🎯 Successfully recovered {recovered_count} members who joined while bot was offline! ({scan_summary})"
                 )
             else:
-                await self.log_to_discord("✅ No missed DM reminders found")
+                await self.log_to_discord(
+                    f"✅ No offline members found to recover ({scan_summary})")
 
         except Exception as e:
             await self.log_to_discord(
-                f"❌ Error during offline DM recovery: {str(e)}")
-            print(f"Offline DM recovery error: {e}")
+                f"❌ Error during offline member recovery: {str(e)}")
+            autorole_logger.error(f"Offline recovery error: {e}")
+
+    async def get_known_signal_ids(self, since) -> set:
+        """Message IDs of all active trades and of trades created since `since`, with signal group links"""
+        known_ids = set()
+        for message_id, trade_data in PRICE_TRACKING_CONFIG["active_trades"].items():
+            known_ids.add(message_id)
+            known_ids.update(link["message_id"]
+                             for link in trade_data.get("linked_messages", []))
+
+        if self.db_pool:
+            try:
+                async with self.db_pool.acquire() as conn:
+                    rows = await conn.fetch(
+                        '''
+                        SELECT message_id, linked_messages FROM active_trades
+                        UNION ALL
+                        SELECT message_id, linked_messages FROM completed_trades
+                        WHERE created_at >= $1
+                    ''', since)
+                for row in rows:
+                    known_ids.add(row['message_id'])
+                    known_ids.update(
+                        link["message_id"]
+                        for link in decode_linked_messages(row['linked_messages']))
+            except Exception as e:
+                tracking_logger.error(f"❌ Error loading known signal IDs: {str(e)}")
+
+        return known_ids
 
     async def recover_missed_signals(self):
-        """Check for trading signals that were sent while bot was offline"""
+        """Check the signal channels for trading signals that were sent while bot was offline"""
         if not PRICE_TRACKING_CONFIG["enabled"]:
             return
 
+        started = asyncio.get_running_loop().time()
         try:
             await self.log_to_discord(
                 "🔍 Scanning for missed trading signals while offline...")
@@ -571,117 +2263,32 @@ class TradingBot(commands.Bot):
                 offline_check_time = datetime.now(AMSTERDAM_TZ) - timedelta(
                     hours=6)
 
-            recovered_signals = 0
-
-            for guild in self.guilds:
-                if not guild:
-                    continue
-
-                for channel in guild.text_channels:
-                    # Skip excluded channel
-                    if str(channel.id
-                           ) == PRICE_TRACKING_CONFIG["excluded_channel_id"]:
-                        continue
-
-                    try:
-                        # Check messages sent while bot was offline
-                        async for message in channel.history(
-                                after=offline_check_time, limit=100):
-                            # Only process signals from owner or bot
-                            if not (str(message.author.id)
-                                    == PRICE_TRACKING_CONFIG["owner_user_id"]
-                                    or message.author.bot):
-                                continue
-
-                            # Check if message contains trading signal
-                            if PRICE_TRACKING_CONFIG[
-                                    "signal_keyword"] not in message.content:
-                                continue
-
-                            # Skip if already being tracked (check both memory and database)
-                            current_trades = await self.get_active_trades_from_db(
-                            )
-                            if str(message.id) in current_trades:
-                                continue
-
-                            # Parse the signal
-                            trade_data = self.parse_signal_message(
-                                message.content)
-                            if not trade_data:
-                                continue
-
-                            # Get historical price at the time the message was sent
-                            message_time = message.created_at.astimezone(
-                                AMSTERDAM_TZ)
-                            historical_price = await self.get_historical_price(
-                                trade_data["pair"], message_time)
-
-                            if historical_price:
-                                # Calculate tracking levels based on historical price
-                                # DEBUG: Verify method exists for recovery process
-                                has_method = hasattr(
-                                    self, 'calculate_live_tracking_levels')
-                                print(
-                                    f"🔍 DEBUG (recover_missed_signals) - Method available: {has_method}"
-                                )
-                                if not has_method:
-                                    calc_methods = [
-                                        attr for attr in dir(self)
-                                        if attr.startswith('calculate')
-                                    ]
-                                    print(
-                                        f"🔍 DEBUG (recover_missed_signals) - Available 'calculate' methods: {calc_methods}"
-                                    )
-
-                                live_levels = self.calculate_live_tracking_levels(
-                                    historical_price, trade_data["pair"],
-                                    trade_data["action"])
-
-                                # Store both Discord and historical prices
-                                trade_data["discord_entry"] = trade_data[
-                                    "entry"]
-                                trade_data["discord_tp1"] = trade_data["tp1"]
-                                trade_data["discord_tp2"] = trade_data["tp2"]
-                                trade_data["discord_tp3"] = trade_data["tp3"]
-                                trade_data["discord_sl"] = trade_data["sl"]
-
-                                # Override with historical-price-based levels
-                                trade_data["live_entry"] = historical_price
-                                trade_data["entry"] = live_levels["entry"]
-                                trade_data["tp1"] = live_levels["tp1"]
-                                trade_data["tp2"] = live_levels["tp2"]
-                                trade_data["tp3"] = live_levels["tp3"]
-                                trade_data["sl"] = live_levels["sl"]
-
-                                # Add metadata
-                                trade_data["channel_id"] = channel.id
-                                trade_data[
-                                    "guild_id"] = guild.id  # Fix: Add missing guild_id for database
-                                trade_data["message_id"] = str(message.id)
-                                trade_data[
-                                    "timestamp"] = message.created_at.isoformat(
-                                    )
-                                trade_data[
-                                    "recovered"] = True  # Mark as recovered signal
-
-                                # Add to active tracking with database persistence
-                                await self.save_trade_to_db(
-                                    str(message.id), trade_data)
-                                recovered_signals += 1
-
-                                print(
-                                    f"✅ Recovered signal: {trade_data['pair']} from {message_time.strftime('%Y-%m-%d %H:%M')}"
-                                )
-                            else:
-                                print(
-                                    f"⚠️ Could not get historical price for {trade_data['pair']} - skipping recovery"
-                                )
+            channels = [
+                channel for channel in map(
+                    self.get_channel, PRICE_TRACKING_CONFIG["signal_channel_ids"])
+                if channel and channel.id not in SIGNAL_EXCLUDED_CHANNEL_IDS
+            ]
 
-                    except Exception as e:
-                        print(
-                            f"❌ Error scanning {channel.name} for missed signals: {e}"
-                        )
-                        continue
+            # One query up front instead of a full active_trades reload per message
+            known_ids = await self.get_known_signal_ids(offline_check_time)
+
+            # Bounded concurrency keeps history requests under Discord's per-route limits
+            semaphore = asyncio.Semaphore(SIGNAL_RECOVERY_CONFIG["concurrency"])
+            results = await asyncio.gather(*[
+                self.recover_channel_signals(channel, offline_check_time,
+                                             known_ids, semaphore)
+                for channel in channels
+            ])
+            scanned = sum(result[0] for result in results)
+            recovered_signals = sum(result[1] for result in results)
+
+            self.startup_report["signal_recovery"] = {
+                "channels": len(channels),
+                "messages_scanned": scanned,
+                "recovered": recovered_signals,
+                "duration_ms": round(
+                    (asyncio.get_running_loop().time() - started) * 1000, 1)
+            }
 
             if recovered_signals > 0:
                 await self.log_to_discord(
@@ -695,7 +2302,95 @@ class TradingBot(commands.Bot):
         except Exception as e:
             await self.log_to_discord(
                 f"❌ Error during missed signal recovery: {str(e)}")
-            print(f"Missed signal recovery error: {e}")
+            tracking_logger.error(f"Missed signal recovery error: {e}")
+
+    async def recover_channel_signals(self, channel, after, known_ids,
+                                      semaphore):
+        """Recover missed signals from one channel; returns (messages scanned, signals recovered)"""
+        scanned = 0
+        recovered = 0
+        async with semaphore:
+            for attempt in range(2):
+                try:
+                    # Check messages sent while bot was offline
+                    messages = [
+                        message async for message in channel.history(
+                            after=after,
+                            limit=SIGNAL_RECOVERY_CONFIG["history_limit"])
+                    ]
+                    break
+                except discord.HTTPException as e:
+                    if e.status != 429 or attempt:
+                        tracking_logger.error(
+                            f"❌ Error scanning {channel.name} for missed signals: {e}"
+                        )
+                        return scanned, recovered
+                    await asyncio.sleep(getattr(e, "retry_after", None) or 2)
+
+        for message in messages:
+            scanned += 1
+            # Only signals from owner or bot, skipping anything already tracked or completed
+            if (not is_signal_candidate(message)
+                    or str(message.id) in known_ids
+                    or UNTRACKED_SIGNAL_PATTERN.search(message.content)):
+                continue
+
+            try:
+                # Parse the signal
+                trade_data = self.parse_signal_message(message.content)
+                if not trade_data:
+                    continue
+
+                # Get historical price at the time the message was sent
+                message_time = message.created_at.astimezone(AMSTERDAM_TZ)
+                historical_price = await self.get_historical_price(
+                    trade_data["pair"], message_time)
+                if not historical_price:
+                    tracking_logger.warning(
+                        f"⚠️ Could not get historical price for {trade_data['pair']} - skipping recovery"
+                    )
+                    continue
+
+                # Calculate tracking levels based on historical price
+                live_levels = self.calculate_live_tracking_levels(
+                    historical_price, trade_data["pair"], trade_data["action"])
+
+                # Store both Discord and historical prices
+                trade_data["discord_entry"] = trade_data["entry"]
+                trade_data["discord_tp1"] = trade_data["tp1"]
+                trade_data["discord_tp2"] = trade_data["tp2"]
+                trade_data["discord_tp3"] = trade_data["tp3"]
+                trade_data["discord_sl"] = trade_data["sl"]
+
+                # Override with historical-price-based levels
+                trade_data["live_entry"] = historical_price
+                trade_data["entry"] = live_levels["entry"]
+                trade_data["tp1"] = live_levels["tp1"]
+                trade_data["tp2"] = live_levels["tp2"]
+                trade_data["tp3"] = live_levels["tp3"]
+                trade_data["sl"] = live_levels["sl"]
+
+                # Add metadata
+                trade_data["channel_id"] = channel.id
+                trade_data["guild_id"] = channel.guild.id
+                trade_data["message_id"] = str(message.id)
+                trade_data["timestamp"] = message.created_at.isoformat()
+                trade_data["recovered"] = True  # Mark as recovered signal
+
+                # Add to active tracking with database persistence
+                await self.save_trade_to_db(str(message.id), trade_data)
+                known_ids.add(str(message.id))
+                recovered += 1
+
+                tracking_logger.info(
+                    f"✅ Recovered signal: {trade_data['pair']} from {message_time.strftime('%Y-%m-%d %H:%M')}"
+                )
+            except Exception as e:
+                tracking_logger.error(
+                    f"❌ Error recovering signal {message.id} in {channel.name}: {e}"
+                )
+
+        return scanned, recovered
 
     async def check_offline_tp_sl_hits(self):
         """Check for TP/SL hits that occurred while bot was offline"""
@@ -811,7 +2506,7 @@ class TradingBot(commands.Bot):
         except Exception as e:
             await self.log_to_discord(
                 f"❌ Error checking offline TP/SL hits: {str(e)}")
-            print(f"Offline TP/SL check error: {e}")
+            tracking_logger.error(f"Offline TP/SL check error: {e}")
 
     async def get_historical_price(self, pair: str,
                                    timestamp: datetime) -> Optional[float]:
@@ -897,7 +2592,7 @@ class TradingBot(commands.Bot):
                     message_deleted = await self.check_message_deleted(
                         message_id, trade_data.get("channel_id"))
                     if message_deleted:
-                        print(
+                        tracking_logger.info(
                             f"📝 Original message deleted for {trade_data['pair']} - removing from tracking"
                         )
                         trades_to_remove.append(message_id)
@@ -906,6 +2601,8 @@ class TradingBot(commands.Bot):
                     # Check if this is a limit order waiting for entry
                     entry_type = trade_data.get("entry_type", "").lower()
                     status = trade_data.get("status", "active")
+                    log_sampled(tracking_logger, "Checking %s %s (%s)",
+                                trade_data.get("pair"), message_id, status)
 
                     if "limit" in entry_type and status == "pending_entry":
                         # Check if limit entry has been hit
@@ -923,7 +2620,7 @@ class TradingBot(commands.Bot):
 
                 except Exception as e:
                     # Log the error instead of silently removing the trade
-                    print(
+                    tracking_logger.error(
                         f"❌ Error checking trade {message_id} for {trade_data.get('pair', 'unknown')}: {str(e)}"
                     )
                     debug_channel = self.get_channel(DEBUG_CHANNEL_ID)
@@ -944,7 +2641,7 @@ class TradingBot(commands.Bot):
             if debug_channel:
                 await debug_channel.send(
                     f"❌ Price level checking failed: {str(e)}")
-            print(f"❌ Price level checking error: {str(e)}")
+            tracking_logger.error(f"❌ Price level checking error: {str(e)}")
 
     @tasks.loop(minutes=30)
     async def heartbeat_task(self):
@@ -956,92 +2653,49 @@ class TradingBot(commands.Bot):
             except Exception as e:
                 print(f"Heartbeat error: {e}")
 
-    @tasks.loop(minutes=1)
-    async def process_pending_welcome_dms(self):
-        """Process pending welcome DMs that are ready to be sent"""
+    @tasks.loop(seconds=STATE_STORE_CONFIG["flush_interval_seconds"])
+    async def state_flush_task(self):
+        """Flush pending state store changes in one batched transaction"""
+        if self.db_pool:
+            await self.state_store.flush(self.db_pool)
+        else:
+            self.journal_level_counts()
+
+    @tasks.loop(minutes=STATE_STORE_CONFIG["snapshot_interval_minutes"])
+    async def state_snapshot_task(self):
+        """Compact the state journal into per-collection snapshots"""
         if not self.db_pool:
             return
-        
         try:
-            now = datetime.now(AMSTERDAM_TZ)
-            async with self.db_pool.acquire() as conn:
-                # Get all pending DMs that should be sent now
-                pending_dms = await conn.fetch('''
-                    SELECT member_id, guild_id, scheduled_send_time
-                    FROM pending_welcome_dms
-                    WHERE sent = FALSE AND scheduled_send_time <= $1
-                    ORDER BY scheduled_send_time ASC
-                    LIMIT 10
-                ''', now)
-                
-                for dm in pending_dms:
-                    member_id = dm['member_id']
-                    guild_id = dm['guild_id']
-                    
-                    try:
-                        # Get the guild and member
-                        guild = self.get_guild(guild_id)
-                        if not guild:
-                            # Guild not found, mark as sent to clean up
-                            await conn.execute('''
-                                UPDATE pending_welcome_dms SET sent = TRUE
-                                WHERE member_id = $1
-                            ''', member_id)
-                            continue
-                        
-                        member = guild.get_member(member_id)
-                        if not member:
-                            # Try fetching member
-                            try:
-                                member = await guild.fetch_member(member_id)
-                            except (discord.NotFound, discord.HTTPException):
-                                # Member left or not found, mark as sent to clean up
-                                await conn.execute('''
-                                    UPDATE pending_welcome_dms SET sent = TRUE
-                                    WHERE member_id = $1
-                                ''', member_id)
-                                await self.log_to_discord(
-                                    f"⚠️ Could not send welcome DM to member ID {member_id} (member left or not found)"
-                                )
-                                continue
-                        
-                        # Send the welcome DM
-                        try:
-                            await member.send(WELCOME_DM_MESSAGE)
-                            await conn.execute('''
-                                UPDATE pending_welcome_dms SET sent = TRUE
-                                WHERE member_id = $1
-                            ''', member_id)
-                            await self.log_to_discord(
-                                f"✅ Sent welcome DM to {member.display_name} (ID: {member_id})"
-                            )
-                        except discord.Forbidden:
-                            # User has DMs disabled, mark as sent to clean up
-                            await conn.execute('''
-                                UPDATE pending_welcome_dms SET sent = TRUE
-                                WHERE member_id = $1
-                            ''', member_id)
-                            await self.log_to_discord(
-                                f"⚠️ Could not send welcome DM to {member.display_name} (DMs disabled)"
-                            )
-                        
-                    except Exception as e:
-                        # Log error but don't mark as sent so we can retry
-                        await self.log_to_discord(
-                            f"❌ Error sending welcome DM to member ID {member_id}: {str(e)}"
-                        )
-                        print(f"Error sending welcome DM to {member_id}: {e}")
-                
-                # Clean up old sent DMs (older than 7 days)
-                cleanup_time = now - timedelta(days=7)
-                await conn.execute('''
-                    DELETE FROM pending_welcome_dms
-                    WHERE sent = TRUE AND created_at < $1
-                ''', cleanup_time)
-                
-        except Exception as e:
-            print(f"Error in process_pending_welcome_dms: {e}")
-            await self.log_to_discord(f"❌ Error processing pending welcome DMs: {str(e)}")
+            await self.state_store.flush(self.db_pool)
+            await self.state_store.snapshot(self.db_pool)
+        except Exception:
+            core_logger.exception("❌ State snapshot failed")
+
+    @tasks.loop(minutes=LOCAL_JOURNAL_CONFIG["reconnect_interval_minutes"])
+    async def database_reconnect_task(self):
+        """Retry PostgreSQL while running on the local journal; once connected, retry
+        journal records left by writes that failed since"""
+        if self.db_pool:
+            if self.local_journal.has_pending():
+                await self.replay_journal_to_database(apply_to_memory=False)
+            return
+        if not (os.getenv('DATABASE_URL') or os.getenv('POSTGRES_URL')
+                or os.getenv('POSTGRESQL_URL')):
+            return
+
+        # init_database reloads state from the database and then replays the journal,
+        # so journal the counts made since the last flush tick first
+        self.journal_level_counts()
+        await self.init_database()
+        if not self.db_pool:
+            return
+
+        await self.log_to_discord("✅ PostgreSQL connection restored")
+        await self.save_bot_status()
+        if not hasattr(self, 'heartbeat_task_started'):
+            self.heartbeat_task.start()
+            self.heartbeat_task_started = True
 
     async def init_database(self):
         """Initialize database connection and create tables"""
@@ -1059,14 +2713,26 @@ class TradingBot(commands.Bot):
                 print("   2. Set DATABASE_URL environment variable")
                 return
 
-            # Create connection pool with Render-optimized settings
-            self.db_pool = await asyncpg.create_pool(
+            # Create connection pool with Render-optimized settings (see DB_POOL_CONFIG)
+            server_settings = {'application_name': 'discord-trading-bot'}
+            if DB_POOL_CONFIG["statement_timeout_ms"] > 0:
+                server_settings['statement_timeout'] = str(
+                    DB_POOL_CONFIG["statement_timeout_ms"])
+            pool = await asyncpg.create_pool(
                 database_url,
-                min_size=1,
-                max_size=5,  # Lower for Render's limits
-                command_timeout=30,
-                server_settings={'application_name': 'discord-trading-bot'})
-            print("✅ PostgreSQL connection pool created for persistent memory")
+                min_size=DB_POOL_CONFIG["min_size"],
+                max_size=DB_POOL_CONFIG["max_size"],
+                command_timeout=DB_POOL_CONFIG["command_timeout"],
+                max_inactive_connection_lifetime=DB_POOL_CONFIG[
+                    "max_inactive_connection_lifetime"],
+                statement_cache_size=DB_POOL_CONFIG["statement_cache_size"],
+                server_settings=server_settings)
+            self.db_pool = MeteredPool(
+                pool, acquire_timeout=DB_POOL_CONFIG["acquire_timeout"] or None)
+            print(
+                f"✅ PostgreSQL connection pool created for persistent memory "
+                f"(min={DB_POOL_CONFIG['min_size']}, max={DB_POOL_CONFIG['max_size']}, "
+                f"command_timeout={DB_POOL_CONFIG['command_timeout']}s)")
 
             # Create tables
             async with self.db_pool.acquire() as conn:
@@ -1115,6 +2781,36 @@ class TradingBot(commands.Bot):
                     )
                 ''')
 
+                # Next follow-up per member, so due DMs are an index range instead of a scan
+                try:
+                    await conn.execute('''
+                        ALTER TABLE dm_schedule
+                        ADD COLUMN IF NOT EXISTS next_stage INTEGER,
+                        ADD COLUMN IF NOT EXISTS next_due_at TIMESTAMP WITH TIME ZONE
+                    ''')
+                    await conn.execute('''
+                        UPDATE dm_schedule SET next_stage = CASE
+                            WHEN NOT dm_3_sent THEN 3
+                            WHEN NOT dm_7_sent THEN 7
+                            WHEN NOT dm_14_sent THEN 14
+                        END
+                        WHERE next_due_at IS NULL AND NOT dm_14_sent
+                    ''')
+                    await conn.execute('''
+                        UPDATE dm_schedule
+                        SET next_due_at = role_expired + make_interval(days => next_stage)
+                        WHERE next_due_at IS NULL AND next_stage IS NOT NULL
+                    ''')
+                    await conn.execute('''
+                        CREATE INDEX IF NOT EXISTS idx_dm_schedule_due
+                        ON dm_schedule (next_due_at) WHERE next_due_at IS NOT NULL
+                    ''')
+                    print(
+                        "✅ Database migration: ensured next_stage/next_due_at columns exist for follow-up DMs"
+                    )
+                except Exception as e:
+                    print(f"Database migration info: {e}")
+
                 # Auto-role config table for bot settings
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS auto_role_config (
@@ -1155,6 +2851,70 @@ class TradingBot(commands.Bot):
                     )
                 ''')
 
+                # Outbox for every DM the bot sends (see enqueue_dm)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS dm_outbox (
+                        id BIGSERIAL PRIMARY KEY,
+                        dedupe_key VARCHAR(200) UNIQUE NOT NULL,
+                        user_id BIGINT NOT NULL,
+                        guild_id BIGINT,
+                        kind VARCHAR(40) NOT NULL,
+                        content TEXT NOT NULL,
+                        status VARCHAR(20) DEFAULT 'pending',
+                        attempts INTEGER DEFAULT 0,
+                        next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                        last_error TEXT,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                        sent_at TIMESTAMP WITH TIME ZONE
+                    )
+                ''')
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_dm_outbox_due
+                    ON dm_outbox (status, next_attempt_at)
+                ''')
+                # DMs claimed by a worker that never finished (restart mid-send) go back to pending
+                await conn.execute(
+                    "UPDATE dm_outbox SET status = 'pending' WHERE status = 'sending'")
+
+                # Due-time jobs for the auto-role and DM flows (see job_scheduler_task)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                        id BIGSERIAL PRIMARY KEY,
+                        job_key VARCHAR(200) UNIQUE NOT NULL,
+                        kind VARCHAR(40) NOT NULL,
+                        member_id BIGINT,
+                        guild_id BIGINT,
+                        payload JSONB DEFAULT '{}'::jsonb,
+                        due_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                        status VARCHAR(20) DEFAULT 'pending',
+                        attempts INTEGER DEFAULT 0,
+                        last_error TEXT,
+                        lateness_ms DOUBLE PRECISION,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                        completed_at TIMESTAMP WITH TIME ZONE
+                    )
+                ''')
+                await conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_due
+                    ON scheduled_jobs (due_at) WHERE status = 'pending'
+                ''')
+                # Jobs claimed before a restart never finished - run them again
+                await conn.execute(
+                    "UPDATE scheduled_jobs SET status = 'pending' WHERE status = 'running'")
+                # Follow-ups run from dm_schedule.next_due_at now, not one job per DM
+                await conn.execute(
+                    "DELETE FROM scheduled_jobs WHERE kind = 'followup_dm'")
+                # Welcome DMs still waiting in the old polling table become jobs
+                await conn.execute('''
+                    INSERT INTO scheduled_jobs (job_key, kind, member_id, guild_id, due_at)
+                    SELECT 'welcome-dm:' || member_id, 'welcome_dm', member_id,
+                           guild_id, scheduled_send_time
+                    FROM pending_welcome_dms WHERE sent = FALSE
+                    ON CONFLICT (job_key) DO NOTHING
+                ''')
+                await conn.execute(
+                    "UPDATE pending_welcome_dms SET sent = TRUE WHERE sent = FALSE")
+
                 # Bot status table for offline recovery
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS bot_status (
@@ -1168,10 +2928,11 @@ class TradingBot(commands.Bot):
                 # User levels table for level system
                 await conn.execute('''
                     CREATE TABLE IF NOT EXISTS user_levels (
-                        user_id BIGINT PRIMARY KEY,
+                        user_id BIGINT NOT NULL,
                         message_count INTEGER DEFAULT 0,
                         current_level INTEGER DEFAULT 0,
-                        guild_id BIGINT NOT NULL
+                        guild_id BIGINT NOT NULL,
+                        PRIMARY KEY (guild_id, user_id)
                     )
                 ''')
 
@@ -1294,6 +3055,84 @@ class TradingBot(commands.Bot):
                     )
                 ''')
 
+                # Unified state store: append-only change journal plus compact snapshots
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS state_journal (
+                        seq BIGSERIAL PRIMARY KEY,
+                        collection VARCHAR(30) NOT NULL,
+                        key VARCHAR(50) NOT NULL,
+                        op VARCHAR(10) NOT NULL,
+                        data JSONB,
+                        created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                    )
+                ''')
+
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS state_snapshots (
+                        collection VARCHAR(30) PRIMARY KEY,
+                        data JSONB NOT NULL,
+                        journal_seq BIGINT NOT NULL,
+                        taken_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+                    )
+                ''')
+
+                # Levels are per guild: key user_levels on (guild_id, user_id)
+                try:
+                    key_columns = await conn.fetchval('''
+                        SELECT COUNT(*) FROM information_schema.key_column_usage
+                        WHERE table_name = 'user_levels' AND constraint_name = 'user_levels_pkey'
+                    ''')
+                    if key_columns == 1:
+                        async with conn.transaction():
+                            await conn.execute('''
+                                ALTER TABLE user_levels
+                                DROP CONSTRAINT user_levels_pkey,
+                                ADD PRIMARY KEY (guild_id, user_id)
+                            ''')
+                            # Snapshot and journal entries use the old user_id keys - reload from the table
+                            await conn.execute(
+                                "DELETE FROM state_snapshots WHERE collection = 'user_levels'")
+                            await conn.execute(
+                                "DELETE FROM state_journal WHERE collection = 'user_levels'")
+                        print(
+                            "✅ Database migration: user_levels keyed by (guild_id, user_id)"
+                        )
+                except Exception as e:
+                    print(f"Database migration info: {e}")
+
+                # Incrementally maintained performance rollups over completed_trades
+                # bucket_type: 'day' (YYYY-MM-DD), 'week' (YYYY-Www), 'pair' (EURUSD), 'direction' (BUY/SELL)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS trade_rollups (
+                        bucket_type VARCHAR(10) NOT NULL,
+                        bucket_key VARCHAR(20) NOT NULL,
+                        trades INTEGER DEFAULT 0,
+                        tp1_hits INTEGER DEFAULT 0,
+                        tp2_hits INTEGER DEFAULT 0,
+                        tp3_hits INTEGER DEFAULT 0,
+                        sl_hits INTEGER DEFAULT 0,
+                        breakeven_hits INTEGER DEFAULT 0,
+                        other_closes INTEGER DEFAULT 0,
+                        pips_total DECIMAL(14,1) DEFAULT 0,
+                        updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+                        PRIMARY KEY(bucket_type, bucket_key)
+                    )
+                ''')
+
+                # Which price APIs support which pairs (see ProviderMatrix)
+                await conn.execute('''
+                    CREATE TABLE IF NOT EXISTS provider_capabilities (
+                        pair VARCHAR(20) NOT NULL,
+                        api_name VARCHAR(30) NOT NULL,
+                        last_success_at TIMESTAMP WITH TIME ZONE,
+                        last_checked_at TIMESTAMP WITH TIME ZONE,
+                        latency_ms REAL,
+                        error_rate REAL DEFAULT 0,
+                        checks INTEGER DEFAULT 0,
+                        PRIMARY KEY(pair, api_name)
+                    )
+                ''')
+
                 # Add missing columns for existing tables (migration)
                 try:
                     await conn.execute('''
@@ -1328,6 +3167,21 @@ class TradingBot(commands.Bot):
                 except Exception as e:
                     print(f"Database migration info: {e}")  # May already exist
 
+                try:
+                    await conn.execute('''
+                        ALTER TABLE active_trades 
+                        ADD COLUMN IF NOT EXISTS linked_messages TEXT DEFAULT ''
+                    ''')
+                    await conn.execute('''
+                        ALTER TABLE completed_trades 
+                        ADD COLUMN IF NOT EXISTS linked_messages TEXT DEFAULT ''
+                    ''')
+                    print(
+                        "✅ Database migration: ensured linked_messages column exists for signal groups"
+                    )
+                except Exception as e:
+                    print(f"Database migration info: {e}")  # May already exist
+
                 # Fix numeric field overflow by using DECIMAL(30,15) for massive prices with many decimal places
                 try:
                     await conn.execute('''
@@ -1384,17 +3238,27 @@ class TradingBot(commands.Bot):
 
             print("✅ Database tables initialized")
 
-            # Load existing config from database
-            await self.load_config_from_db()
+            # Load state collections from snapshot + journal tail, or table by table on first run
+            if await self.state_store.load(self.db_pool):
+                await self.load_config_from_db(include_members=False)
+                print(
+                    f"✅ State loaded from {self.state_store.metrics['loaded_from']} in {self.state_store.metrics['load_ms']}ms"
+                )
+            else:
+                # Load existing config from database
+                await self.load_config_from_db()
+
+                # Load level system data
+                await self.load_level_system()
 
-            # Load bot status for offline recovery
-            await self.load_bot_status()
+                # Load invite tracking data
+                await self.load_invite_tracking()
 
-            # Load level system data
-            await self.load_level_system()
+                self.state_store.prime()
+                self.state_store.metrics["loaded_from"] = "tables"
 
-            # Load invite tracking data
-            await self.load_invite_tracking()
+            # Load bot status for offline recovery
+            await self.load_bot_status()
 
             # Load active trades from database for 24/7 persistence
             await self.load_active_trades_from_db()
@@ -1408,6 +3272,15 @@ class TradingBot(commands.Bot):
                 f"✅ Loaded {len(ACTIVE_GIVEAWAYS)} active giveaways from database"
             )
 
+            # Build performance rollups once for databases that predate them
+            await self.backfill_trade_rollups()
+
+            # Price API assignments come from the persisted capability matrix
+            await self.load_provider_matrix()
+
+            # Replay anything recorded in the local journal while PostgreSQL was down
+            await self.replay_journal_to_database()
+
         except Exception as e:
             print(f"❌ Database initialization failed: {e}")
             print(
@@ -1419,7 +3292,7 @@ class TradingBot(commands.Bot):
             print("   3. Restart the service")
             self.db_pool = None
 
-    async def load_config_from_db(self):
+    async def load_config_from_db(self, include_members: bool = True):
         """Load configuration from database"""
         if not self.db_pool:
             return
@@ -1438,61 +3311,33 @@ class TradingBot(commands.Bot):
                         AUTO_ROLE_CONFIG["custom_message"] = config_row[
                             'custom_message']
 
+                if not include_members:
+                    return
+
                 # Load active members
                 active_rows = await conn.fetch('SELECT * FROM active_members')
                 for row in active_rows:
                     AUTO_ROLE_CONFIG["active_members"][str(
-                        row['member_id'])] = {
-                            "role_added_time":
-                            row['role_added_time'].isoformat(),
-                            "role_id":
-                            row['role_id'],
-                            "guild_id":
-                            row['guild_id'],
-                            "weekend_delayed":
-                            row['weekend_delayed'],
-                            "expiry_time":
-                            row['expiry_time'].isoformat()
-                            if row['expiry_time'] else None,
-                            "custom_duration":
-                            row['custom_duration']
-                        }
+                        row['member_id'])] = ActiveMember.from_row(row)
 
                 # Load weekend pending
                 weekend_rows = await conn.fetch('SELECT * FROM weekend_pending'
                                                 )
                 for row in weekend_rows:
                     AUTO_ROLE_CONFIG["weekend_pending"][str(
-                        row['member_id'])] = {
-                            "join_time": row['join_time'].isoformat(),
-                            "guild_id": row['guild_id']
-                        }
+                        row['member_id'])] = WeekendPending.from_row(row)
 
                 # Load role history
                 history_rows = await conn.fetch('SELECT * FROM role_history')
                 for row in history_rows:
-                    AUTO_ROLE_CONFIG["role_history"][str(row['member_id'])] = {
-                        "first_granted":
-                        row['first_granted'].isoformat(),
-                        "times_granted":
-                        row['times_granted'],
-                        "last_expired":
-                        row['last_expired'].isoformat()
-                        if row['last_expired'] else None,
-                        "guild_id":
-                        row['guild_id']
-                    }
+                    AUTO_ROLE_CONFIG["role_history"][str(
+                        row['member_id'])] = RoleHistory.from_row(row)
 
                 # Load DM schedule
                 dm_rows = await conn.fetch('SELECT * FROM dm_schedule')
                 for row in dm_rows:
-                    AUTO_ROLE_CONFIG["dm_schedule"][str(row['member_id'])] = {
-                        "role_expired": row['role_expired'].isoformat(),
-                        "guild_id": row['guild_id'],
-                        "dm_3_sent": row['dm_3_sent'],
-                        "dm_7_sent": row['dm_7_sent'],
-                        "dm_14_sent": row['dm_14_sent']
-                    }
+                    AUTO_ROLE_CONFIG["dm_schedule"][str(
+                        row['member_id'])] = DmSchedule.from_row(row)
 
                 print("✅ Configuration loaded from database")
 
@@ -1537,6 +3382,10 @@ class TradingBot(commands.Bot):
         # Initialize database
         await self.init_database()
 
+        # Without PostgreSQL, recover state recorded in the local journal before the restart
+        if not self.db_pool:
+            self.restore_from_journal()
+
     async def backtrack_existing_invites(self):
         """Backtrack and start monitoring all existing server invites"""
         try:
@@ -1580,13 +3429,13 @@ class TradingBot(commands.Bot):
                             backtracked_count += 1
 
                 except Exception as e:
-                    print(
+                    invites_logger.error(
                         f"❌ Error backtracking invites for guild {guild.name}: {e}"
                     )
                     continue
 
             if backtracked_count > 0:
-                print(
+                invites_logger.info(
                     f"✅ Backtracked {backtracked_count} existing server invites for monitoring"
                 )
                 await self.log_to_discord(
@@ -1594,10 +3443,10 @@ class TradingBot(commands.Bot):
                     f"Started monitoring {backtracked_count} existing server invites"
                 )
             else:
-                print("📋 No new invites found to backtrack")
+                invites_logger.info("📋 No new invites found to backtrack")
 
         except Exception as e:
-            print(f"❌ Error during invite backtracking: {e}")
+            invites_logger.error(f"❌ Error during invite backtracking: {e}")
 
     async def on_ready(self):
         print("🎉 DISCORD BOT READY EVENT TRIGGERED!")
@@ -1632,21 +3481,11 @@ class TradingBot(commands.Bot):
             except Exception as e:
                 print(f"⚠️ Force sync on ready failed: {e}")
 
-        # Start the role removal task
-        if not self.role_removal_task.is_running():
-            self.role_removal_task.start()
-
-        # Start the Monday activation notification task
-        if not self.weekend_activation_task.is_running():
-            self.weekend_activation_task.start()
-
-        # Start the Monday activation task for weekend joiners
-        if not self.monday_activation_task.is_running():
-            self.monday_activation_task.start()
-
-        # Start the follow-up DM task
-        if not self.followup_dm_task.is_running():
-            self.followup_dm_task.start()
+        # Make sure every auto-role member has its jobs, then start the job scheduler;
+        # jobs that fell due while offline run on its first pass
+        await self.seed_scheduled_jobs()
+        if not self.job_scheduler_task.is_running():
+            self.job_scheduler_task.start()
 
         # Start the price tracking task
         if not self.price_tracking_task.is_running():
@@ -1658,6 +3497,32 @@ class TradingBot(commands.Bot):
                     "🚀 **Price Tracking Started** - Monitoring every 8 minutes (480s) for thorough TP/SL detection"
                 )
 
+        # Keep retrying PostgreSQL while running on the local journal
+        if not self.database_reconnect_task.is_running():
+            self.database_reconnect_task.start()
+
+        # Start the low-priority provider capability refresh
+        if not self.provider_matrix_task.is_running():
+            self.provider_matrix_task.start()
+
+        # Start the DM outbox workers
+        if not self.dm_outbox_task.is_running():
+            self.dm_outbox_task.start()
+
+        # Start the signal ingestion worker
+        if not self.signal_ingestion_task.is_running():
+            self.signal_ingestion_task.start()
+
+        # Start sending batched log and debug channel lines
+        if not self.log_sink_task.is_running():
+            self.log_sink_task.start()
+
+        # Start the state store flush and snapshot pipeline
+        if not self.state_flush_task.is_running():
+            self.state_flush_task.start()
+        if not self.state_snapshot_task.is_running():
+            self.state_snapshot_task.start()
+
         # Check for TP/SL hits that occurred while offline
         await self.check_offline_tp_sl_hits()
 
@@ -1688,24 +3553,32 @@ class TradingBot(commands.Bot):
         # Check for offline members who joined while bot was offline
         await self.recover_offline_members()
 
-        # Check for missed DM reminders while bot was offline
-        await self.recover_offline_dm_reminders()
-
         # Check for missed trading signals while bot was offline
         await self.recover_missed_signals()
 
+        lines = []
+        members = self.startup_report.get("member_recovery")
+        if members:
+            lines.append(
+                f"Member recovery: {members['recovered']} recovered, {members['members_scanned']} of "
+                f"{members['members_cached']} cached members scanned ({members['duration_ms']:.0f}ms)")
+        recovery = self.startup_report.get("signal_recovery")
+        if recovery:
+            lines.append(
+                f"Signal recovery: {recovery['recovered']} recovered from "
+                f"{recovery['messages_scanned']} messages in {recovery['channels']} channels "
+                f"({recovery['duration_ms']:.0f}ms)")
+        if lines:
+            report = "📋 **Startup Report**\n" + "\n".join(lines)
+            print(report.replace("**", ""))
+            await self.log_to_discord(report)
+
         # Update bot status and start heartbeat
         if self.db_pool:
             await self.save_bot_status()
             if not hasattr(self, 'heartbeat_task_started'):
                 self.heartbeat_task.start()
                 self.heartbeat_task_started = True
-            
-            # Start welcome DM processing task
-            if not hasattr(self, 'welcome_dm_task_started'):
-                self.process_pending_welcome_dms.start()
-                self.welcome_dm_task_started = True
-                print("✅ Welcome DM processing task started")
 
     async def on_connect(self):
         """Called when bot connects to Discord"""
@@ -1757,9 +3630,10 @@ class TradingBot(commands.Bot):
         else:
             return False
 
-    def get_next_monday_activation_time(self):
-        """Get the next Monday 00:01 Amsterdam time (when 24h countdown starts)"""
-        now = datetime.now(AMSTERDAM_TZ)
+    def get_next_monday_activation_time(self, after=None):
+        """Get the next Monday 00:01 Amsterdam time after `after` (default now)"""
+        now = datetime.now(AMSTERDAM_TZ) if after is None else after.astimezone(
+            AMSTERDAM_TZ)
 
         # Find next Monday
         days_ahead = 0 - now.weekday()  # Monday is 0
@@ -1833,17 +3707,14 @@ class TradingBot(commands.Bot):
                     if config and config['enabled']:
                         delay_minutes = config['delay_minutes']
                         
-                        # Save to database for persistent tracking
+                        # Durable job, so the DM survives restarts
                         joined_at = datetime.now(AMSTERDAM_TZ)
                         scheduled_send_time = joined_at + timedelta(minutes=delay_minutes)
-                        
-                        await conn.execute('''
-                            INSERT INTO pending_welcome_dms (member_id, guild_id, joined_at, scheduled_send_time, sent)
-                            VALUES ($1, $2, $3, $4, FALSE)
-                            ON CONFLICT (member_id) DO UPDATE
-                            SET scheduled_send_time = EXCLUDED.scheduled_send_time,
-                                sent = FALSE
-                        ''', member.id, member.guild.id, joined_at, scheduled_send_time)
+
+                        await self.schedule_job(scheduled_job(
+                            "welcome_dm", f"welcome-dm:{member.id}",
+                            scheduled_send_time, member.id, member.guild.id),
+                                                conn=conn)
                         
                         await self.log_to_discord(
                             f"⏰ Scheduled welcome DM for {member.display_name} - will send at {scheduled_send_time.strftime('%Y-%m-%d %H:%M:%S')} (in {delay_minutes} minutes)"
@@ -1955,41 +3826,27 @@ class TradingBot(commands.Bot):
                 # This way weekend joiners still get exactly 3 trading days worth of trial
                 expiry_time = join_time + timedelta(hours=120)
 
-                AUTO_ROLE_CONFIG["active_members"][member_id_str] = {
-                    "role_added_time": join_time.isoformat(),
-                    "role_id": AUTO_ROLE_CONFIG["role_id"],
-                    "guild_id": member.guild.id,
-                    "weekend_delayed": True,
-                    "expiry_time": expiry_time.isoformat()
-                }
+                AUTO_ROLE_CONFIG["active_members"][
+                    member_id_str] = ActiveMember(join_time,
+                                                  AUTO_ROLE_CONFIG["role_id"],
+                                                  member.guild.id,
+                                                  weekend_delayed=True,
+                                                  expiry_time=expiry_time)
+                await self.schedule_auto_role_jobs(member_id_str)
 
                 # Record in role history for anti-abuse
-                AUTO_ROLE_CONFIG["role_history"][member_id_str] = {
-                    "first_granted": join_time.isoformat(),
-                    "times_granted": 1,
-                    "last_expired": None,
-                    "guild_id": member.guild.id
-                }
+                AUTO_ROLE_CONFIG["role_history"][member_id_str] = RoleHistory(
+                    join_time, member.guild.id)
 
                 # Send weekend notification DM
-                try:
-                    weekend_message = (
-                        "**Welcome to FX Pip Pioneers!** As a welcome gift, we've given you "
-                        "**access to the Premium Signals channel for 3 trading days.** Since you joined during the weekend, "
-                        "your access will expire in 5 days (120 hours) to account for the 2 weekend days when the markets are closed. "
-                        "This way, you get the full 3 trading days of premium access. Good luck trading!")
-                    await member.send(weekend_message)
-                    await self.log_to_discord(
-                        f"✅ Sent weekend notification DM to {member.display_name}"
-                    )
-                except discord.Forbidden:
-                    await self.log_to_discord(
-                        f"⚠️ Could not send weekend notification DM to {member.display_name} (DMs disabled)"
-                    )
-                except Exception as e:
-                    await self.log_to_discord(
-                        f"❌ Error sending weekend notification DM to {member.display_name}: {str(e)}"
-                    )
+                weekend_message = (
+                    "**Welcome to FX Pip Pioneers!** As a welcome gift, we've given you "
+                    "**access to the Premium Signals channel for 3 trading days.** Since you joined during the weekend, "
+                    "your access will expire in 5 days (120 hours) to account for the 2 weekend days when the markets are closed. "
+                    "This way, you get the full 3 trading days of premium access. Good luck trading!")
+                await self.enqueue_dm(member.id, weekend_message,
+                                      f"join-welcome:{member.id}",
+                                      "weekend welcome", member.guild.id)
 
                 await self.log_to_discord(
                     f"✅ Auto-role '{role.name}' added to {member.display_name} (120h countdown - expires {expiry_time.strftime('%Y-%m-%d %H:%M')})"
@@ -1997,40 +3854,26 @@ class TradingBot(commands.Bot):
 
             else:
                 # Normal join - immediate 72-hour (3 day) countdown
-                AUTO_ROLE_CONFIG["active_members"][member_id_str] = {
-                    "role_added_time": join_time.isoformat(),
-                    "role_id": AUTO_ROLE_CONFIG["role_id"],
-                    "guild_id": member.guild.id,
-                    "weekend_delayed": False
-                }
+                AUTO_ROLE_CONFIG["active_members"][
+                    member_id_str] = ActiveMember(join_time,
+                                                  AUTO_ROLE_CONFIG["role_id"],
+                                                  member.guild.id)
+                await self.schedule_auto_role_jobs(member_id_str)
 
                 # Record in role history for anti-abuse
-                AUTO_ROLE_CONFIG["role_history"][member_id_str] = {
-                    "first_granted": join_time.isoformat(),
-                    "times_granted": 1,
-                    "last_expired": None,
-                    "guild_id": member.guild.id
-                }
+                AUTO_ROLE_CONFIG["role_history"][member_id_str] = RoleHistory(
+                    join_time, member.guild.id)
 
                 # Send weekday welcome DM
-                try:
-                    weekday_message = (
-                        "**:star2: Welcome to FX Pip Pioneers! :star2:**\n\n"
-                        ":white_check_mark: As a welcome gift, we've given you access to our **Premium Signals channel for 3 days.** "
-                        "That means that you can immediately start profiting from the **6+ trade signals** we send per day in <#1384668129036075109>!\n\n"
-                        "***This is your shot at consistency, clarity, and growth in trading. Let's level up together!***"
-                    )
-                    await member.send(weekday_message)
-                    await self.log_to_discord(
-                        f"✅ Sent weekday welcome DM to {member.display_name}")
-                except discord.Forbidden:
-                    await self.log_to_discord(
-                        f"⚠️ Could not send weekday welcome DM to {member.display_name} (DMs disabled)"
-                    )
-                except Exception as e:
-                    await self.log_to_discord(
-                        f"❌ Error sending weekday welcome DM to {member.display_name}: {str(e)}"
-                    )
+                weekday_message = (
+                    "**:star2: Welcome to FX Pip Pioneers! :star2:**\n\n"
+                    ":white_check_mark: As a welcome gift, we've given you access to our **Premium Signals channel for 3 days.** "
+                    "That means that you can immediately start profiting from the **6+ trade signals** we send per day in <#1384668129036075109>!\n\n"
+                    "***This is your shot at consistency, clarity, and growth in trading. Let's level up together!***"
+                )
+                await self.enqueue_dm(member.id, weekday_message,
+                                      f"join-welcome:{member.id}", "welcome",
+                                      member.guild.id)
 
                 await self.log_to_discord(
                     f"✅ Auto-role '{role.name}' added to {member.display_name} (72h countdown starts now)"
@@ -2064,231 +3907,254 @@ class TradingBot(commands.Bot):
                                step: str,
                                details: str,
                                status: str = "ℹ️"):
-        """Send debugging information to specific Discord channel"""
-        debug_channel_id = str(DEBUG_CHANNEL_ID)
-        try:
-            channel = self.get_channel(int(debug_channel_id))
-            if channel:
-                embed = discord.Embed(
-                    title=f"{status} Signal Tracking Debug",
-                    description=f"**Step:** {step}\n**Details:** {details}",
-                    color=0x00ff00 if status == "✅" else
-                    0xff0000 if status == "❌" else 0x0099ff,
-                    timestamp=datetime.now())
-                await channel.send(embed=embed)
-        except Exception as e:
-            print(f"Debug channel error: {e}")
+        """Queue debugging information for the debug channel"""
+        tracking_logger.log(
+            logging.ERROR if status == "❌" else
+            logging.WARNING if status == "⚠️" else logging.INFO,
+            "%s %s: %s", status, step, details)
+        self.log_sink.submit(
+            DEBUG_CHANNEL_ID, "🔍 Signal Tracking Debug",
+            f"{status} **{step}:** {details}",
+            0x00ff00 if status == "✅" else
+            0xff0000 if status == "❌" else 0x0099ff)
 
     async def on_message(self, message):
         """Handle messages for level system and price tracking"""
-        # Check for trading signals (only from owner or bot)
-        if (PRICE_TRACKING_CONFIG["enabled"] and str(message.channel.id)
-                != PRICE_TRACKING_CONFIG["excluded_channel_id"] and
-            (str(message.author.id) == PRICE_TRACKING_CONFIG["owner_user_id"]
-             or message.author.bot) and PRICE_TRACKING_CONFIG["signal_keyword"]
-                in message.content):
-
+        # Check for trading signals (only from owner or bot); our own /entry
+        # signals are registered directly by entry_command
+        if is_signal_candidate(message) and not (
+                self.user and message.author.id == self.user.id):
             # Skip tracking for US100 and GER40 as per user requirements
-            if "US100" in message.content.upper(
-            ) or "GER40" in message.content.upper():
+            if UNTRACKED_SIGNAL_PATTERN.search(message.content):
                 await self.debug_to_channel(
                     "SIGNAL SKIPPED",
                     f"Skipping signal tracking for US100/GER40 as requested by user",
                     "⏭️")
                 return
 
-            await self.debug_to_channel(
-                "1. SIGNAL DETECTED",
-                f"Message from: {message.author.name} ({message.author.id})\n"
-                + f"Channel: {message.channel.name} ({message.channel.id})\n" +
-                f"Content: {message.content[:500]}...")
+            self.enqueue_signal(message)
 
-            try:
-                # Parse the signal message
-                await self.debug_to_channel(
-                    "2. PARSING SIGNAL", "Starting to parse signal message...")
-                trade_data = self.parse_signal_message(message.content)
+        # Process message for level system
+        await self.process_message_for_levels(message)
 
-                if trade_data:
-                    await self.debug_to_channel(
-                        "2. PARSING SIGNAL", f"✅ Successfully parsed:\n" +
-                        f"Pair: {trade_data.get('pair')}\n" +
-                        f"Action: {trade_data.get('action')}\n" +
-                        f"Entry: {trade_data.get('entry')}\n" +
-                        f"TP1: {trade_data.get('tp1')}\n" +
-                        f"TP2: {trade_data.get('tp2')}\n" +
-                        f"TP3: {trade_data.get('tp3')}\n" +
-                        f"SL: {trade_data.get('sl')}", "✅")
-
-                    # Determine which API works for this pair and assign it permanently
-                    await self.debug_to_channel(
-                        "3. API ASSIGNMENT",
-                        f"Testing APIs for pair: {trade_data['pair']}")
-                    assigned_api = await self.get_working_api_for_pair(
-                        trade_data["pair"])
-                    trade_data["assigned_api"] = assigned_api
-                    await self.debug_to_channel(
-                        "3. API ASSIGNMENT",
-                        f"✅ Assigned API: {assigned_api} for {trade_data['pair']}",
-                        "✅")
+    def enqueue_signal(self, message, trade_data: Optional[Dict] = None):
+        """Queue a signal for the ingestion worker; trade_data skips parsing the message"""
+        try:
+            self.signal_queue.put_nowait(
+                (message, asyncio.get_running_loop().time(), trade_data))
+        except asyncio.QueueFull:
+            tracking_logger.error(
+                f"❌ Signal queue full ({self.signal_queue.maxsize}) - dropped signal {message.id}"
+            )
 
-                    # Get live price using the assigned API for consistency, with fallback
-                    await self.debug_to_channel(
-                        "4. LIVE PRICE RETRIEVAL",
-                        f"Getting live price for {trade_data['pair']} using {assigned_api}"
-                    )
-                    live_price = await self.get_live_price(
-                        trade_data["pair"], specific_api=assigned_api)
-
-                    # If assigned API fails, try fallback
-                    if live_price is None:
-                        await self.debug_to_channel(
-                            "4. LIVE PRICE RETRIEVAL",
-                            f"❌ Assigned API {assigned_api} failed, trying fallback...",
-                            "⚠️")
-                        live_price = await self.get_live_price(
-                            trade_data["pair"], use_all_apis=False)
-
-                    if live_price:
-                        await self.debug_to_channel(
-                            "4. LIVE PRICE RETRIEVAL",
-                            f"✅ Got live price: {live_price} for {trade_data['pair']}",
-                            "✅")
-
-                        # Calculate live-price-based TP/SL levels for tracking
-                        await self.debug_to_channel(
-                            "5. LEVEL CALCULATION",
-                            "Calculating live tracking levels...")
-
-                        # DEBUG: Verify method exists (helpful for future troubleshooting)
-                        has_method = hasattr(self,
-                                             'calculate_live_tracking_levels')
-                        await self.debug_to_channel(
-                            "5. LEVEL CALCULATION",
-                            f"🔍 DEBUG - Method available: {has_method}")
-
-                        if not has_method:
-                            calc_methods = [
-                                attr for attr in dir(self)
-                                if attr.startswith('calculate')
-                            ]
-                            await self.debug_to_channel(
-                                "5. LEVEL CALCULATION",
-                                f"🔍 DEBUG - Available 'calculate' methods: {calc_methods}"
-                            )
+    @tasks.loop(seconds=0)
+    async def signal_ingestion_task(self):
+        """Take detected signals off the ingestion queue one at a time"""
+        message, queued_at, trade_data = await self.signal_queue.get()
+        try:
+            await self.handle_signal_message(message, queued_at, trade_data)
+        finally:
+            self.signal_queue.task_done()
 
-                        live_levels = self.calculate_live_tracking_levels(
-                            live_price, trade_data["pair"],
-                            trade_data["action"])
-
-                        # Store both Discord prices (for reference) and live prices (for tracking)
-                        trade_data["discord_entry"] = trade_data["entry"]
-                        trade_data["discord_tp1"] = trade_data["tp1"]
-                        trade_data["discord_tp2"] = trade_data["tp2"]
-                        trade_data["discord_tp3"] = trade_data["tp3"]
-                        trade_data["discord_sl"] = trade_data["sl"]
-
-                        # Override with live-price-based levels for tracking
-                        trade_data["live_entry"] = live_price
-                        trade_data["entry"] = live_levels["entry"]
-                        trade_data["tp1"] = live_levels["tp1"]
-                        trade_data["tp2"] = live_levels["tp2"]
-                        trade_data["tp3"] = live_levels["tp3"]
-                        trade_data["sl"] = live_levels["sl"]
-
-                        await self.debug_to_channel(
-                            "5. LEVEL CALCULATION", f"✅ Calculated levels:\n" +
-                            f"Live Entry: {live_price}\n" +
-                            f"Live TP1: {live_levels['tp1']}\n" +
-                            f"Live TP2: {live_levels['tp2']}\n" +
-                            f"Live TP3: {live_levels['tp3']}\n" +
-                            f"Live SL: {live_levels['sl']}", "✅")
-                    else:
-                        await self.debug_to_channel(
-                            "4. LIVE PRICE RETRIEVAL",
-                            f"❌ Failed to get live price for {trade_data['pair']} from all APIs",
-                            "❌")
-
-                    # Add channel and message info
-                    trade_data["channel_id"] = message.channel.id
-                    trade_data[
-                        "guild_id"] = message.guild.id if message.guild else None
-                    trade_data["message_id"] = str(message.id)
-                    trade_data["timestamp"] = message.created_at.isoformat()
-
-                    # Add to active trades with database persistence
-                    await self.debug_to_channel(
-                        "6. DATABASE STORAGE",
-                        f"Saving trade to database with message ID: {message.id}"
-                    )
-                    await self.save_trade_to_db(str(message.id), trade_data)
-                    await self.debug_to_channel(
-                        "6. DATABASE STORAGE",
-                        f"✅ Trade saved to database successfully", "✅")
+    async def probe_signal_price(self, pair: str) -> Tuple[str, Optional[float]]:
+        """Price a new signal from the matrix-assigned API, or probe every configured API at once"""
+        pair_clean = self.clean_pair_name(pair)
 
-                    # IMMEDIATE TRACKING: Start checking this trade right away instead of waiting up to 2 minutes
-                    await self.debug_to_channel(
-                        "7. IMMEDIATE TRACKING",
-                        f"Starting immediate price monitoring for {trade_data['pair']}",
-                        "🔄")
+        assigned_api = self.provider_matrix.assigned_api(pair_clean)
+        if assigned_api:
+            price = await self.get_price_from_single_api(assigned_api, pair_clean)
+            if price is not None:
+                return assigned_api, price
 
-                    # Do an immediate price check to verify current position vs levels
-                    await self.check_single_trade_immediately(
-                        str(message.id), trade_data)
+        api_names = [
+            api_name for api_name in PRICE_TRACKING_CONFIG["api_priority_order"]
+            if PRICE_TRACKING_CONFIG["api_keys"].get(f"{api_name}_key")
+        ]
+        if assigned_api in api_names:
+            api_names.remove(assigned_api)
+        prices = await asyncio.gather(*[
+            self.get_price_from_single_api(api_name, pair_clean)
+            for api_name in api_names
+        ],
+                                      return_exceptions=True)
+
+        for api_name, price in zip(api_names, prices):
+            if isinstance(price, Exception):
+                pricing_logger.warning(f"⚠️ {api_name} failed for {pair_clean}: {str(price)[:100]}")
+            elif price is not None:
+                pricing_logger.info(
+                    f"✅ API assignment: {pair_clean} will use {api_name} (price: {price})"
+                )
+                return api_name, price
 
-                    await self.debug_to_channel(
-                        "8. TRACKING ACTIVATED",
-                        f"✅ Signal tracking activated for {trade_data['pair']} {trade_data['action']}\n"
-                        +
-                        f"Entry: {trade_data.get('live_entry', 'No Price')}\n"
-                        + f"Assigned API: {assigned_api}\n" +
-                        f"Status: Active tracking enabled", "✅")
+        # If all APIs fail, default to currencybeacon like get_working_api_for_pair
+        await self.log_to_discord(
+            f"🚨 **ALL APIS FAILED** for {pair_clean}\nAll 4 price APIs are currently unavailable. Please check API keys and limits."
+        )
+        return "currencybeacon", None
+
+    def get_signal_latency_metrics(self):
+        """Per-stage latency summary over the most recent signals"""
+        stage_totals = {}
+        for record in self.signal_latencies:
+            for stage, ms in record["stages"].items():
+                stage_totals.setdefault(stage, []).append(ms)
+        return {
+            "queued": self.signal_queue.qsize(),
+            "signals": len(self.signal_latencies),
+            "stages_ms": {
+                stage: {
+                    "avg": round(sum(values) / len(values), 1),
+                    "max": max(values)
+                }
+                for stage, values in stage_totals.items()
+            },
+            "recent": list(self.signal_latencies)[-10:]
+        }
 
-                    await self.log_to_discord(
-                        f"✅ Started tracking {trade_data['pair']} {trade_data['action']} signal"
-                    )
-                    print(
-                        f"🔔 NEW SIGNAL DETECTED: {trade_data['pair']} {trade_data['action']} @ {trade_data.get('live_entry', 'No Price')}"
-                    )
-                else:
-                    await self.debug_to_channel(
-                        "2. PARSING SIGNAL",
-                        "❌ Failed to parse signal - invalid format or missing data",
-                        "❌")
-            except Exception as e:
-                import traceback
-                full_traceback = traceback.format_exc()
+    async def handle_signal_message(self,
+                                    message,
+                                    queued_at=None,
+                                    trade_data: Optional[Dict] = None):
+        """Parse, price and start tracking a trading signal message"""
+        loop = asyncio.get_running_loop()
+        stages = {}
+        mark = loop.time()
+        if queued_at is not None:
+            stages["queue_wait"] = round((mark - queued_at) * 1000, 1)
+        pipeline_started = mark
+
+        def lap(stage):
+            nonlocal mark
+            now = loop.time()
+            stages[stage] = round((now - mark) * 1000, 1)
+            mark = now
 
-                await self.debug_to_channel(
-                    "ERROR",
-                    f"❌ Exception during signal processing: {str(e)}\n" +
-                    f"Error type: {type(e).__name__}", "❌")
+        try:
+            if trade_data is None:
+                trade_data = self.parse_signal_message(message.content)
+                lap("parse")
 
-                # Add detailed traceback for troubleshooting
+            if not trade_data:
                 await self.debug_to_channel(
-                    "ERROR",
-                    f"🔍 FULL TRACEBACK:\n```\n{full_traceback[:1800]}\n```")
+                    "SIGNAL PARSING",
+                    f"❌ Failed to parse signal {message.id} from {message.author.name} - invalid format or missing data\n"
+                    + f"Content: {message.content[:500]}...", "❌")
+                return
 
-                # Method availability check at error time
-                has_method = hasattr(self, 'calculate_live_tracking_levels')
+            # Provider probe and live price come from the same concurrent request round
+            assigned_api, live_price = await self.probe_signal_price(
+                trade_data["pair"])
+            trade_data["assigned_api"] = assigned_api
+            lap("price")
+
+            if live_price:
+                # Calculate live-price-based TP/SL levels for tracking
+                live_levels = self.calculate_live_tracking_levels(
+                    live_price, trade_data["pair"], trade_data["action"])
+
+                # Store both Discord prices (for reference) and live prices (for tracking)
+                trade_data["discord_entry"] = trade_data["entry"]
+                trade_data["discord_tp1"] = trade_data["tp1"]
+                trade_data["discord_tp2"] = trade_data["tp2"]
+                trade_data["discord_tp3"] = trade_data["tp3"]
+                trade_data["discord_sl"] = trade_data["sl"]
+
+                # Override with live-price-based levels for tracking
+                trade_data["live_entry"] = live_price
+                trade_data["entry"] = live_levels["entry"]
+                trade_data["tp1"] = live_levels["tp1"]
+                trade_data["tp2"] = live_levels["tp2"]
+                trade_data["tp3"] = live_levels["tp3"]
+                trade_data["sl"] = live_levels["sl"]
+            else:
                 await self.debug_to_channel(
-                    "ERROR",
-                    f"🔍 ERROR DEBUG - Method available at error time: {has_method}"
-                )
+                    "LIVE PRICE RETRIEVAL",
+                    f"❌ Failed to get live price for {trade_data['pair']} from all APIs",
+                    "❌")
+
+            # Add channel and message info
+            trade_data["channel_id"] = message.channel.id
+            trade_data["guild_id"] = message.guild.id if message.guild else None
+            trade_data["message_id"] = str(message.id)
+            trade_data["timestamp"] = message.created_at.isoformat()
+
+            # Add to active trades with database persistence
+            await self.save_trade_to_db(str(message.id), trade_data)
+            lap("persist")
+
+            # First check reuses the price we just fetched
+            await self.check_single_trade_immediately(str(message.id),
+                                                      trade_data,
+                                                      current_price=live_price)
+            lap("first_check")
+
+            stages["pipeline"] = round((mark - pipeline_started) * 1000, 1)
+            stages["message_to_tracked"] = round(
+                (datetime.now(timezone.utc) -
+                 message.created_at).total_seconds() * 1000, 1)
+            self.signal_latencies.append({
+                "message_id": str(message.id),
+                "pair": trade_data["pair"],
+                "tracked_at": datetime.now(AMSTERDAM_TZ).isoformat(),
+                "stages": stages
+            })
 
-                print(f"❌ Error processing signal: {str(e)}")
-                print(f"🔍 Full traceback: {full_traceback}")
-                await self.log_to_discord(
-                    f"❌ Error processing signal: {str(e)}")
+            await self.debug_to_channel(
+                "SIGNAL TRACKED",
+                f"✅ {trade_data['pair']} {trade_data['action']} from {message.author.name} in #{message.channel.name}\n"
+                + f"Discord Entry: {trade_data.get('discord_entry', trade_data['entry'])} • "
+                + f"Live Entry: {trade_data.get('live_entry', 'No Price')}\n" +
+                f"TP1: {trade_data['tp1']} • TP2: {trade_data['tp2']} • TP3: {trade_data['tp3']} • SL: {trade_data['sl']}\n"
+                + f"Assigned API: {assigned_api}\n" +
+                f"Signal Group: {1 + len(trade_data.get('linked_messages', []))} message(s)\n"
+                + "Latency (ms): " +
+                ", ".join(f"{stage} {ms}" for stage, ms in stages.items()),
+                "✅")
 
-        # Process message for level system
-        await self.process_message_for_levels(message)
+            await self.log_to_discord(
+                f"✅ Started tracking {trade_data['pair']} {trade_data['action']} signal"
+            )
+            tracking_logger.info(
+                f"🔔 NEW SIGNAL DETECTED: {trade_data['pair']} {trade_data['action']} @ {trade_data.get('live_entry', 'No Price')} "
+                f"({stages['message_to_tracked']:.0f}ms message to tracked)")
+        except Exception as e:
+            import traceback
+            full_traceback = traceback.format_exc()
+
+            await self.debug_to_channel(
+                "ERROR",
+                f"❌ Exception during signal processing: {str(e)}\n" +
+                f"Error type: {type(e).__name__}\n" +
+                f"🔍 FULL TRACEBACK:\n```\n{full_traceback[:1700]}\n```", "❌")
+
+            tracking_logger.error(f"❌ Error processing signal: {str(e)}")
+            tracking_logger.error(f"🔍 Full traceback: {full_traceback}")
+            await self.log_to_discord(
+                f"❌ Error processing signal: {str(e)}")
 
     async def save_auto_role_config(self):
         """Save auto-role configuration to database"""
         if not self.db_pool:
+            self.journal_offline_write("auto_role", "snapshot", None, {
+                key: {
+                    member_id: record.to_json()
+                    for member_id, record in AUTO_ROLE_CONFIG[key].items()
+                }
+                for key in AUTO_ROLE_RECORDS
+            })
             return  # No database available
 
+        # Member state is written by the state store's batched flush
+        self.state_store.mark_dirty("active_members", "weekend_pending",
+                                    "role_history", "dm_schedule")
+
+        settings = (AUTO_ROLE_CONFIG["enabled"], AUTO_ROLE_CONFIG["role_id"],
+                    AUTO_ROLE_CONFIG["duration_hours"],
+                    AUTO_ROLE_CONFIG["custom_message"])
+        if settings == self._saved_auto_role_settings:
+            return
+
         try:
             async with self.db_pool.acquire() as conn:
                 # Save main config - use upsert with a fixed ID
@@ -2301,81 +4167,8 @@ class TradingBot(commands.Bot):
                         role_id = $2, 
                         duration_hours = $3,
                         custom_message = $4
-                ''', AUTO_ROLE_CONFIG["enabled"], AUTO_ROLE_CONFIG["role_id"],
-                    AUTO_ROLE_CONFIG["duration_hours"],
-                    AUTO_ROLE_CONFIG["custom_message"])
-
-                # Save active members
-                await conn.execute('DELETE FROM active_members')
-                for member_id, data in AUTO_ROLE_CONFIG[
-                        "active_members"].items():
-                    expiry_time = None
-                    if data.get("expiry_time"):
-                        expiry_time = datetime.fromisoformat(
-                            data["expiry_time"].replace('Z', '+00:00'))
-
-                    await conn.execute(
-                        '''
-                        INSERT INTO active_members 
-                        (member_id, role_added_time, role_id, guild_id, weekend_delayed, expiry_time, custom_duration)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7)
-                    ''', int(member_id),
-                        datetime.fromisoformat(data["role_added_time"].replace(
-                            'Z', '+00:00')), data["role_id"], data["guild_id"],
-                        data["weekend_delayed"], expiry_time,
-                        data.get("custom_duration", False))
-
-                # Save weekend pending
-                await conn.execute('DELETE FROM weekend_pending')
-                for member_id, data in AUTO_ROLE_CONFIG[
-                        "weekend_pending"].items():
-                    await conn.execute(
-                        '''
-                        INSERT INTO weekend_pending (member_id, join_time, guild_id)
-                        VALUES ($1, $2, $3)
-                    ''', int(member_id),
-                        datetime.fromisoformat(data["join_time"].replace(
-                            'Z', '+00:00')), data["guild_id"])
-
-                # Save role history using UPSERT to avoid conflicts
-                for member_id, data in AUTO_ROLE_CONFIG["role_history"].items(
-                ):
-                    last_expired = None
-                    if data.get("last_expired"):
-                        last_expired = datetime.fromisoformat(
-                            data["last_expired"].replace('Z', '+00:00'))
-
-                    await conn.execute(
-                        '''
-                        INSERT INTO role_history (member_id, first_granted, times_granted, last_expired, guild_id)
-                        VALUES ($1, $2, $3, $4, $5)
-                        ON CONFLICT (member_id) DO UPDATE SET
-                            first_granted = $2,
-                            times_granted = $3,
-                            last_expired = $4,
-                            guild_id = $5
-                    ''', int(member_id),
-                        datetime.fromisoformat(data["first_granted"].replace(
-                            'Z', '+00:00')), data["times_granted"],
-                        last_expired, data["guild_id"])
-
-                # Save DM schedule using UPSERT
-                for member_id, data in AUTO_ROLE_CONFIG["dm_schedule"].items():
-                    await conn.execute(
-                        '''
-                        INSERT INTO dm_schedule (member_id, role_expired, guild_id, dm_3_sent, dm_7_sent, dm_14_sent)
-                        VALUES ($1, $2, $3, $4, $5, $6)
-                        ON CONFLICT (member_id) DO UPDATE SET
-                            role_expired = $2,
-                            guild_id = $3,
-                            dm_3_sent = $4,
-                            dm_7_sent = $5,
-                            dm_14_sent = $6
-                    ''', int(member_id),
-                        datetime.fromisoformat(data["role_expired"].replace(
-                            'Z',
-                            '+00:00')), data["guild_id"], data["dm_3_sent"],
-                        data["dm_7_sent"], data["dm_14_sent"])
+                ''', *settings)
+            self._saved_auto_role_settings = settings
 
         except Exception as e:
             print(f"❌ Error saving to database: {str(e)}")
@@ -2385,25 +4178,27 @@ class TradingBot(commands.Bot):
     async def save_level_system(self):
         """Save level system data to database"""
         if not self.db_pool:
+            self.journal_offline_write("levels", "snapshot", None,
+                                       LEVEL_SYSTEM["user_data"].to_json())
             return  # No database available
 
-        try:
-            async with self.db_pool.acquire() as conn:
-                # Save user level data using UPSERT
-                for user_id, data in LEVEL_SYSTEM["user_data"].items():
-                    await conn.execute(
-                        '''
-                        INSERT INTO user_levels (user_id, message_count, current_level, guild_id)
-                        VALUES ($1, $2, $3, $4)
-                        ON CONFLICT (user_id) DO UPDATE SET
-                            message_count = $2,
-                            current_level = $3,
-                            guild_id = $4
-                    ''', int(user_id), data["message_count"],
-                        data["current_level"], data["guild_id"])
+        # Written by the state store's batched flush
+        self.state_store.mark_dirty("user_levels")
 
-        except Exception as e:
-            print(f"❌ Error saving level system to database: {str(e)}")
+    def journal_level_counts(self):
+        """Journal the level counters changed since the last call while PostgreSQL is down,
+        so ordinary message counts survive a restart and not only level-up snapshots"""
+        collection = self.state_store.collections["user_levels"]
+        if not collection.dirty_keys:
+            return
+        counts = {}
+        for key in collection.dirty_keys:
+            value = LEVEL_SYSTEM["user_data"].get(key)
+            if value is not None:
+                counts[key] = value.to_row()
+        if self.journal_offline_write("levels", "counts", None, counts):
+            # Replay marks the whole collection dirty, so these keys are covered
+            collection.dirty_keys.clear()
 
     async def load_level_system(self):
         """Load level system data from database"""
@@ -2417,21 +4212,19 @@ class TradingBot(commands.Bot):
                     'SELECT user_id, message_count, current_level, guild_id FROM user_levels'
                 )
                 for row in rows:
-                    LEVEL_SYSTEM["user_data"][str(row['user_id'])] = {
-                        "message_count": row['message_count'],
-                        "current_level": row['current_level'],
-                        "guild_id": row['guild_id']
-                    }
+                    LEVEL_SYSTEM["user_data"].guild(row['guild_id']).set(
+                        row['user_id'], row['message_count'],
+                        row['current_level'])
 
             if LEVEL_SYSTEM["user_data"]:
-                print(
+                levels_logger.info(
                     f"✅ Loaded level data for {len(LEVEL_SYSTEM['user_data'])} users"
                 )
             else:
-                print("📊 No existing level data found - starting fresh")
+                levels_logger.info("📊 No existing level data found - starting fresh")
 
         except Exception as e:
-            print(f"❌ Error loading level system from database: {str(e)}")
+            levels_logger.error(f"❌ Error loading level system from database: {str(e)}")
 
     async def load_invite_tracking(self):
         """Load invite tracking data from database"""
@@ -2455,21 +4248,37 @@ class TradingBot(commands.Bot):
                     }
 
                 if INVITE_TRACKING:
-                    print(
+                    invites_logger.info(
                         f"✅ Loaded invite tracking data for {len(INVITE_TRACKING)} invites"
                     )
                 else:
-                    print(
+                    invites_logger.info(
                         "📋 No existing invite tracking data found - starting fresh"
                     )
 
         except Exception as e:
-            print(f"❌ Error loading invite tracking from database: {str(e)}")
+            invites_logger.error(f"❌ Error loading invite tracking from database: {str(e)}")
 
-    async def save_giveaway_to_db(self, giveaway_id: str, giveaway_data: dict):
-        """Save a giveaway to database for persistence across bot restarts"""
+    async def save_giveaway_to_db(self, giveaway_id: str,
+                                  giveaway_data: dict) -> bool:
+        """Save a giveaway to database for persistence across bot restarts;
+        False when the write failed"""
         if not self.db_pool:
-            return
+            self.journal_offline_write(
+                "giveaway", "upsert", giveaway_id, {
+                    'message_id': giveaway_data['message_id'],
+                    'channel_id': giveaway_data['channel_id'],
+                    'creator_id': giveaway_data['creator_id'],
+                    'required_role_id': giveaway_data['required_role_id'],
+                    'winner_count': giveaway_data['winner_count'],
+                    'end_time': giveaway_data['end_time'],
+                    'participants': giveaway_data.get('participants', []),
+                    'chosen_winners': giveaway_data.get('chosen_winners', []),
+                    'guild_id': giveaway_data.get('guild_id'),
+                    'message': giveaway_data.get('settings',
+                                                 {}).get('message', '')
+                })
+            return True
 
         try:
             async with self.db_pool.acquire() as conn:
@@ -2511,12 +4320,14 @@ class TradingBot(commands.Bot):
                     giveaway_data['winner_count'], end_time, participants_str,
                     chosen_winners_str, message_text, guild_id)
 
-                print(f"✅ Saved giveaway {giveaway_id} to database")
+                giveaways_logger.info(f"✅ Saved giveaway {giveaway_id} to database")
+            return True
 
         except Exception as e:
-            print(f"❌ Error saving giveaway to database: {str(e)}")
+            giveaways_logger.error(f"❌ Error saving giveaway to database: {str(e)}")
             await self.log_to_discord(
                 f"❌ Error saving giveaway {giveaway_id} to database: {str(e)}")
+            return False
 
     async def load_giveaways_from_db(self):
         """Load active giveaways from database for persistence across bot restarts"""
@@ -2581,39 +4392,42 @@ class TradingBot(commands.Bot):
                     asyncio.create_task(schedule_giveaway_end(giveaway_id))
 
                     loaded_count += 1
-                    print(
+                    giveaways_logger.info(
                         f"✅ Loaded giveaway {giveaway_id} (ends in {(end_time - current_time).total_seconds() / 3600:.1f} hours)"
                     )
 
                 if loaded_count > 0:
-                    print(
+                    giveaways_logger.info(
                         f"✅ Loaded {loaded_count} active giveaways from database"
                     )
                     await self.log_to_discord(
                         f"🎉 Loaded {loaded_count} active giveaways from database"
                     )
                 else:
-                    print("📋 No active giveaways found in database")
+                    giveaways_logger.info("📋 No active giveaways found in database")
 
         except Exception as e:
-            print(f"❌ Error loading giveaways from database: {str(e)}")
+            giveaways_logger.error(f"❌ Error loading giveaways from database: {str(e)}")
             await self.log_to_discord(
                 f"❌ Error loading giveaways from database: {str(e)}")
 
-    async def remove_giveaway_from_db(self, giveaway_id: str):
-        """Remove a giveaway from database when it ends"""
+    async def remove_giveaway_from_db(self, giveaway_id: str) -> bool:
+        """Remove a giveaway from database when it ends; False when the delete failed"""
         if not self.db_pool:
-            return
+            self.journal_offline_write("giveaway", "remove", giveaway_id)
+            return True
 
         try:
             async with self.db_pool.acquire() as conn:
                 await conn.execute(
                     'DELETE FROM active_giveaways WHERE giveaway_id = $1',
                     giveaway_id)
-                print(f"✅ Removed giveaway {giveaway_id} from database")
+                giveaways_logger.info(f"✅ Removed giveaway {giveaway_id} from database")
+            return True
 
         except Exception as e:
-            print(f"❌ Error removing giveaway from database: {str(e)}")
+            giveaways_logger.error(f"❌ Error removing giveaway from database: {str(e)}")
+            return False
 
     async def load_active_trades_from_db(self):
         """Load active trading signals from database for 24/7 persistence"""
@@ -2687,6 +4501,8 @@ class TradingBot(commands.Bot):
                                 ',') if mo
                         ] if row.get('manual_overrides') else
                         [],  # Add manual_overrides field
+                        "linked_messages":
+                        decode_linked_messages(row.get('linked_messages')),
                         "channel_id":
                         row['channel_id'],
                         "guild_id":
@@ -2728,8 +4544,9 @@ class TradingBot(commands.Bot):
                             message_id, channel_id, guild_id, pair, action,
                             entry_price, tp1_price, tp2_price, tp3_price, sl_price,
                             discord_entry, discord_tp1, discord_tp2, discord_tp3, discord_sl,
-                            live_entry, assigned_api, status, tp_hits, breakeven_active, entry_type, manual_overrides
-                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20, $21, $22)
+                            live_entry, assigned_api, status, tp_hits, breakeven_active, entry_type, manual_overrides,
+                            linked_messages
+                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20, $21, $22, $23)
                     ''', message_id, trade_data.get("channel_id"),
                         trade_data.get("guild_id"), trade_data["pair"],
                         trade_data["action"], trade_data["entry"],
@@ -2746,7 +4563,9 @@ class TradingBot(commands.Bot):
                         ','.join(trade_data.get("tp_hits", [])),
                         trade_data.get("breakeven_active", False),
                         trade_data.get("entry_type"),
-                        ','.join(trade_data.get("manual_overrides", [])))
+                        ','.join(trade_data.get("manual_overrides", [])),
+                        encode_linked_messages(
+                            trade_data.get("linked_messages")))
                 # Send success confirmation to debug channel
                 debug_channel = self.get_channel(DEBUG_CHANNEL_ID)
                 if debug_channel:
@@ -2760,7 +4579,12 @@ class TradingBot(commands.Bot):
                     await debug_channel.send(
                         f"❌ Database INSERT failed for message_id {message_id}: {str(e)}"
                     )
-                print(f"❌ Database save error: {str(e)}")
+                tracking_logger.error(f"❌ Database save error: {str(e)}")
+                self.journal_offline_write("trade", "upsert", message_id,
+                                           trade_data)
+        else:
+            self.journal_offline_write("trade", "upsert", message_id,
+                                       trade_data)
 
     async def update_trade_in_db(self, message_id: str, trade_data: dict):
         """Update an existing trade in database"""
@@ -2782,105 +4606,794 @@ class TradingBot(commands.Bot):
                         trade_data.get("breakeven_active", False),
                         ','.join(trade_data.get("manual_overrides", [])))
 
-            except Exception as e:
-                # Send error details to debug channel instead of silently failing
-                debug_channel = self.get_channel(DEBUG_CHANNEL_ID)
-                if debug_channel:
-                    await debug_channel.send(
-                        f"❌ Database UPDATE failed for message_id {message_id}: {str(e)}"
-                    )
-                print(f"❌ Database update error: {str(e)}")
+            except Exception as e:
+                # Send error details to debug channel instead of silently failing
+                debug_channel = self.get_channel(DEBUG_CHANNEL_ID)
+                if debug_channel:
+                    await debug_channel.send(
+                        f"❌ Database UPDATE failed for message_id {message_id}: {str(e)}"
+                    )
+                tracking_logger.error(f"❌ Database update error: {str(e)}")
+                self.journal_offline_write("trade", "upsert", message_id,
+                                           trade_data)
+        else:
+            self.journal_offline_write("trade", "upsert", message_id,
+                                       trade_data)
+
+    async def update_limit_trade_in_db(self, message_id: str,
+                                       trade_data: dict):
+        """Update a limit trade in database with new price levels after entry hit"""
+        # Always update in-memory first
+        PRICE_TRACKING_CONFIG["active_trades"][message_id] = trade_data
+
+        # Also update database if available
+        if self.db_pool:
+            try:
+                async with self.db_pool.acquire() as conn:
+                    await conn.execute(
+                        '''
+                        UPDATE active_trades SET 
+                            entry_price = $2, tp1_price = $3, tp2_price = $4, tp3_price = $5, sl_price = $6,
+                            live_entry = $7, status = $8, tp_hits = $9, breakeven_active = $10, last_updated = NOW()
+                        WHERE message_id = $1
+                    ''', message_id, trade_data["entry"], trade_data["tp1"],
+                        trade_data["tp2"], trade_data["tp3"], trade_data["sl"],
+                        trade_data.get("live_entry"),
+                        trade_data.get("status", "active"),
+                        ','.join(trade_data.get("tp_hits", [])),
+                        trade_data.get("breakeven_active", False))
+            except Exception as e:
+                # Send error details to debug channel instead of silently failing
+                debug_channel = self.get_channel(DEBUG_CHANNEL_ID)
+                if debug_channel:
+                    await debug_channel.send(
+                        f"❌ Database UPDATE failed for message_id {message_id}: {str(e)}"
+                    )
+                tracking_logger.error(f"❌ Database update error: {str(e)}")
+                self.journal_offline_write("trade", "upsert", message_id,
+                                           trade_data)
+        else:
+            self.journal_offline_write("trade", "upsert", message_id,
+                                       trade_data)
+
+    async def remove_trade_from_db(self,
+                                   message_id: str,
+                                   completion_reason: str = "unknown"):
+        """Remove completed trade from database and save to historical table"""
+        await self.archive_trades_bulk({message_id: completion_reason})
+
+    async def archive_trades_bulk(self, completions: Dict[str, str]):
+        """Move many trades {message_id: completion_reason} to completed_trades in one statement"""
+        archived_ids = []
+        if self.db_pool and completions:
+            message_ids = list(completions.keys())
+            try:
+                async with self.db_pool.acquire() as conn, conn.transaction():
+                    # Delete and archive atomically - a crash can no longer duplicate or lose trades
+                    archived_rows = await conn.fetch(
+                        '''
+                        WITH reasons AS (
+                            SELECT * FROM unnest($1::varchar[], $2::varchar[])
+                                AS r(message_id, completion_reason)
+                        ), moved AS (
+                            DELETE FROM active_trades a
+                            USING reasons r
+                            WHERE a.message_id = r.message_id
+                            RETURNING a.*, r.completion_reason
+                        )
+                        INSERT INTO completed_trades (
+                            message_id, channel_id, guild_id, pair, action,
+                            entry_price, tp1_price, tp2_price, tp3_price, sl_price,
+                            discord_entry, discord_tp1, discord_tp2, discord_tp3, discord_sl,
+                            live_entry, assigned_api, final_status, tp_hits, breakeven_active,
+                            entry_type, manual_overrides, linked_messages, created_at, completion_reason
+                        )
+                        SELECT
+                            message_id, channel_id, guild_id, pair, action,
+                            entry_price, tp1_price, tp2_price, tp3_price, sl_price,
+                            discord_entry, discord_tp1, discord_tp2, discord_tp3, discord_sl,
+                            live_entry, assigned_api, status, tp_hits, breakeven_active,
+                            entry_type, COALESCE(manual_overrides, ''), COALESCE(linked_messages, ''),
+                            COALESCE(created_at, NOW()), completion_reason
+                        FROM moved
+                        ON CONFLICT (message_id) DO UPDATE SET
+                            entry_price = EXCLUDED.entry_price, tp1_price = EXCLUDED.tp1_price,
+                            tp2_price = EXCLUDED.tp2_price, tp3_price = EXCLUDED.tp3_price,
+                            sl_price = EXCLUDED.sl_price, live_entry = EXCLUDED.live_entry,
+                            final_status = EXCLUDED.final_status, tp_hits = EXCLUDED.tp_hits,
+                            breakeven_active = EXCLUDED.breakeven_active,
+                            manual_overrides = EXCLUDED.manual_overrides,
+                            linked_messages = EXCLUDED.linked_messages,
+                            completion_reason = EXCLUDED.completion_reason,
+                            completed_at = NOW()
+                        RETURNING message_id, pair, action, entry_price, tp3_price, sl_price,
+                                  tp_hits, completion_reason, completed_at,
+                                  (xmax = 0) AS inserted
+                    ''', message_ids, [completions[mid] for mid in message_ids])
+
+                    # A trade already in completed_trades was counted when it was first
+                    # archived; its row is updated above but the rollups are left alone
+                    rearchived = [row['message_id'] for row in archived_rows
+                                  if not row['inserted']]
+                    if rearchived:
+                        tracking_logger.warning(
+                            f"⚠️ Trades already archived, completed row updated: {', '.join(rearchived)}"
+                        )
+
+                    # Update performance rollups in the same transaction
+                    await self.apply_trade_rollups(
+                        conn, [(row, row['completion_reason'], row['completed_at'])
+                               for row in archived_rows if row['inserted']])
+                    archived_ids = [row['message_id'] for row in archived_rows]
+
+            except Exception as e:
+                # Send error details to debug channel instead of silently failing
+                debug_channel = self.get_channel(DEBUG_CHANNEL_ID)
+                if debug_channel:
+                    await debug_channel.send(
+                        f"❌ Database DELETE/ARCHIVE failed for message_id(s) {', '.join(message_ids)}: {str(e)}"
+                    )
+                tracking_logger.error(f"❌ Database delete/archive error: {str(e)}")
+                for message_id, reason in completions.items():
+                    self.journal_offline_write("trade", "archive", message_id,
+                                               {"completion_reason": reason})
+        elif completions:
+            for message_id, reason in completions.items():
+                self.journal_offline_write("trade", "archive", message_id,
+                                           {"completion_reason": reason})
+
+        # Always remove from memory after database operations
+        for message_id in completions:
+            PRICE_TRACKING_CONFIG["active_trades"].pop(message_id, None)
+
+        return archived_ids
+
+    # ===== LOCAL JOURNAL FALLBACK =====
+
+    def journal_offline_write(self, kind, op, key=None, data=None) -> bool:
+        """Record a state change in the local journal while PostgreSQL is unavailable.
+        The fsync runs in a thread, shared by every record appended meanwhile."""
+        try:
+            self.local_journal.append(kind, op, key, data)
+        except Exception as e:
+            core_logger.error(f"❌ Error writing local journal: {str(e)}")
+            return False
+        if self.journal_sync_task is None or self.journal_sync_task.done():
+            self.journal_sync_task = asyncio.create_task(
+                self.sync_local_journal())
+        return True
+
+    async def sync_local_journal(self):
+        try:
+            while self.local_journal.unsynced:
+                await asyncio.to_thread(self.local_journal.sync)
+        except Exception as e:
+            core_logger.error(f"❌ Error syncing local journal: {str(e)}")
+
+    def compact_journal_records(self, records):
+        """Collapse journal records to the final state per trade, giveaway and snapshot"""
+        trades = {}  # message_id: {"data": trade_data or None, "archive": reason or None}
+        giveaways = {}  # giveaway_id: giveaway_data, or None when removed
+        snapshots = {}  # kind: latest snapshot data
+        for record in records:
+            kind, op, key = record["kind"], record["op"], record["key"]
+            if kind == "trade":
+                entry = trades.setdefault(key, {"data": None, "archive": None})
+                if op == "upsert":
+                    entry["data"] = record["data"]
+                    entry["archive"] = None
+                elif op == "archive":
+                    entry["archive"] = record["data"]["completion_reason"]
+            elif kind == "giveaway":
+                giveaways[key] = record["data"] if op == "upsert" else None
+            elif kind == "levels" and op == "counts":
+                snapshots.setdefault("level_counts", {}).update(record["data"])
+            else:
+                snapshots[kind] = record["data"]
+                if kind == "levels":
+                    # A full snapshot already holds the counts journaled before it
+                    snapshots.pop("level_counts", None)
+        return trades, giveaways, snapshots
+
+    def apply_journal_to_memory(self, trades, giveaways, snapshots):
+        """Apply compacted journal state on top of the in-memory dicts"""
+        for message_id, entry in trades.items():
+            if entry["archive"]:
+                PRICE_TRACKING_CONFIG["active_trades"].pop(message_id, None)
+            elif entry["data"] is not None:
+                PRICE_TRACKING_CONFIG["active_trades"][message_id] = entry[
+                    "data"]
+
+        if "auto_role" in snapshots:
+            for key, value in snapshots["auto_role"].items():
+                record = AUTO_ROLE_RECORDS[key]
+                AUTO_ROLE_CONFIG[key].clear()
+                AUTO_ROLE_CONFIG[key].update(
+                    (member_id, record.from_json(data))
+                    for member_id, data in value.items())
+
+        if "levels" in snapshots:
+            LEVEL_SYSTEM["user_data"].load_json(snapshots["levels"])
+        for key, (message_count, current_level) in snapshots.get(
+                "level_counts", {}).items():
+            guild_id, user_id = split_level_key(key)
+            LEVEL_SYSTEM["user_data"].guild(guild_id).set(
+                user_id, message_count, current_level)
+
+        current_time = datetime.now(AMSTERDAM_TZ)
+        for giveaway_id, data in giveaways.items():
+            if data is None:
+                ACTIVE_GIVEAWAYS.pop(giveaway_id, None)
+                continue
+            end_time = datetime.fromisoformat(data['end_time'])
+            if end_time.tzinfo is None:
+                end_time = end_time.replace(tzinfo=AMSTERDAM_TZ)
+            if end_time <= current_time:
+                continue
+            already_scheduled = giveaway_id in ACTIVE_GIVEAWAYS
+            ACTIVE_GIVEAWAYS[giveaway_id] = {
+                'message_id': data['message_id'],
+                'channel_id': data['channel_id'],
+                'creator_id': data['creator_id'],
+                'required_role_id': data['required_role_id'],
+                'winner_count': data['winner_count'],
+                'end_time': end_time,
+                'participants': data['participants'],
+                'chosen_winners': data['chosen_winners'],
+                'guild_id': data['guild_id'],
+                'settings': {
+                    'message': data['message'],
+                    'winners': data['winner_count']
+                }
+            }
+            if not already_scheduled:
+                asyncio.create_task(schedule_giveaway_end(giveaway_id))
+
+    def restore_from_journal(self):
+        """Rebuild in-memory state from the local journal when starting without PostgreSQL"""
+        records = self.local_journal.read()
+        if not records:
+            return
+        self.apply_journal_to_memory(*self.compact_journal_records(records))
+        core_logger.info(
+            f"✅ Restored {len(records)} journal records from {self.local_journal.path} "
+            f"({len(PRICE_TRACKING_CONFIG['active_trades'])} trades, {len(ACTIVE_GIVEAWAYS)} giveaways)"
+        )
+
+    async def replay_journal_to_database(self, apply_to_memory: bool = True):
+        """Replay the local journal into PostgreSQL in batches and report throughput and lag.
+        apply_to_memory=False retries records left while connected, where memory is newer."""
+        if not self.db_pool:
+            return
+
+        # Replay from a rotated copy, deleted only once everything below has committed;
+        # writes that fail journal themselves again in the fresh file
+        records = self.local_journal.rotate()
+        if not records:
+            self.local_journal.discard_replay()
+            return
+
+        started = datetime.now(timezone.utc)
+        oldest = datetime.fromisoformat(records[0]["ts"])
+        trades, giveaways, snapshots = self.compact_journal_records(records)
+
+        # The database was just loaded into memory, so put the newer journal state back on top
+        if apply_to_memory:
+            self.apply_journal_to_memory(trades, giveaways, snapshots)
+
+        # Write the in-memory trade, which is at least as new as its journal record; a trade
+        # to archive needs its journaled row first, one gone from memory was archived since
+        batch_size = LOCAL_JOURNAL_CONFIG["replay_batch_size"]
+        active_trades = PRICE_TRACKING_CONFIG["active_trades"]
+        upserts = [(message_id, entry["data"] if entry["archive"] else
+                    active_trades[message_id])
+                   for message_id, entry in trades.items()
+                   if entry["data"] is not None and (
+                       entry["archive"] or message_id in active_trades)]
+        archives = [(message_id, entry["archive"])
+                    for message_id, entry in trades.items()
+                    if entry["archive"]]
+
+        for i in range(0, len(upserts), batch_size):
+            batch = upserts[i:i + batch_size]
+            try:
+                async with self.db_pool.acquire() as conn, conn.transaction():
+                    await conn.executemany(
+                        '''
+                        INSERT INTO active_trades (
+                            message_id, channel_id, guild_id, pair, action,
+                            entry_price, tp1_price, tp2_price, tp3_price, sl_price,
+                            discord_entry, discord_tp1, discord_tp2, discord_tp3, discord_sl,
+                            live_entry, assigned_api, status, tp_hits, breakeven_active, entry_type, manual_overrides,
+                            linked_messages
+                        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18, $19, $20, $21, $22, $23)
+                        ON CONFLICT (message_id) DO UPDATE SET
+                            entry_price = $6, tp1_price = $7, tp2_price = $8, tp3_price = $9, sl_price = $10,
+                            live_entry = $16, status = $18, tp_hits = $19, breakeven_active = $20,
+                            manual_overrides = $22, last_updated = NOW()
+                    ''', [(message_id, trade_data.get("channel_id"),
+                           trade_data.get("guild_id"), trade_data["pair"],
+                           trade_data["action"], trade_data["entry"],
+                           trade_data["tp1"], trade_data["tp2"],
+                           trade_data["tp3"], trade_data["sl"],
+                           trade_data.get("discord_entry"),
+                           trade_data.get("discord_tp1"),
+                           trade_data.get("discord_tp2"),
+                           trade_data.get("discord_tp3"),
+                           trade_data.get("discord_sl"),
+                           trade_data.get("live_entry"),
+                           trade_data.get("assigned_api", "currencybeacon"),
+                           trade_data.get("status", "active"),
+                           ','.join(trade_data.get("tp_hits", [])),
+                           trade_data.get("breakeven_active", False),
+                           trade_data.get("entry_type"),
+                           ','.join(trade_data.get("manual_overrides", [])),
+                           encode_linked_messages(
+                               trade_data.get("linked_messages")))
+                          for message_id, trade_data in batch])
+            except Exception:
+                core_logger.exception("❌ Error replaying journal trade batch")
+                for message_id, trade_data in batch:
+                    self.journal_offline_write("trade", "upsert", message_id,
+                                               trade_data)
+
+        for i in range(0, len(archives), batch_size):
+            await self.archive_trades_bulk(dict(archives[i:i + batch_size]))
+
+        # Archives and trade batches that fail journal themselves again; so do giveaways
+        for giveaway_id, data in giveaways.items():
+            if data is None:
+                written = await self.remove_giveaway_from_db(giveaway_id)
+            elif giveaway_id in ACTIVE_GIVEAWAYS:
+                written = await self.save_giveaway_to_db(
+                    giveaway_id, ACTIVE_GIVEAWAYS[giveaway_id])
+            else:
+                continue
+            if not written:
+                self.journal_offline_write(
+                    "giveaway", "remove" if data is None else "upsert",
+                    giveaway_id, data)
+
+        if "auto_role" in snapshots:
+            await self.save_auto_role_config()
+        if "levels" in snapshots or "level_counts" in snapshots:
+            await self.save_level_system()
+
+        # Commit the replayed member state now instead of at the next periodic flush;
+        # if that fails the rotated copy is kept and replayed on the next connect
+        flush_errors = self.state_store.metrics["flush_errors"]
+        await self.state_store.flush(self.db_pool)
+        if self.state_store.metrics["flush_errors"] == flush_errors:
+            self.local_journal.discard_replay()
+
+        finished = datetime.now(timezone.utc)
+        elapsed = (finished - started).total_seconds()
+        self.journal_replay_stats = {
+            "records": len(records),
+            "trades": len(trades),
+            "giveaways": len(giveaways),
+            "snapshots": sorted(snapshots.keys()),
+            "elapsed_seconds": round(elapsed, 3),
+            "records_per_second":
+            round(len(records) / elapsed, 1) if elapsed > 0 else len(records),
+            "lag_seconds": round((finished - oldest).total_seconds(), 1),
+            "requeued": self.local_journal.pending,
+            "replayed_at": finished.isoformat()
+        }
+        await self.log_to_discord(
+            f"📼 Replayed {len(records)} offline journal records into PostgreSQL in {elapsed:.2f}s "
+            f"({self.journal_replay_stats['records_per_second']} rec/s, oldest change {self.journal_replay_stats['lag_seconds']}s ago)"
+        )
+
+    # ===== DM OUTBOX =====
+
+    async def enqueue_dm(self,
+                         user_id: int,
+                         content: str,
+                         dedupe_key: str,
+                         kind: str,
+                         guild_id: Optional[int] = None,
+                         send_at: Optional[datetime] = None,
+                         conn=None) -> bool:
+        """Queue a DM for the outbox workers; a repeated dedupe_key is ignored.
+        Pass `conn` when the caller already holds a connection."""
+        if not self.db_pool:
+            # Without PostgreSQL there is no outbox, so send straight away
+            try:
+                user = self.get_user(user_id) or await self.fetch_user(user_id)
+                await user.send(content)
+                return True
+            except Exception as e:
+                await self.log_to_discord(
+                    f"⚠️ Could not send {kind} DM to user {user_id}: {str(e)}")
+                return False
+
+        try:
+            async with nullcontext(conn) if conn else self.db_pool.acquire() as conn:
+                inserted = await conn.fetchval(
+                    '''
+                    INSERT INTO dm_outbox (dedupe_key, user_id, guild_id, kind, content, next_attempt_at)
+                    VALUES ($1, $2, $3, $4, $5, COALESCE($6, NOW()))
+                    ON CONFLICT (dedupe_key) DO NOTHING
+                    RETURNING id
+                ''', dedupe_key, int(user_id), guild_id, kind, content, send_at)
+            if inserted:
+                self.dm_outbox_metrics["queued"] += 1
+            else:
+                self.dm_outbox_metrics["deduplicated"] += 1
+            return True
+        except Exception as e:
+            autorole_logger.error(f"❌ Error queueing {kind} DM for {user_id}: {str(e)}")
+            return False
+
+    async def enqueue_dms(self, dms: List[tuple], conn):
+        """Queue many (user_id, content, dedupe_key, kind, guild_id) DMs in one statement
+        on the caller's connection; errors are left to the caller's transaction"""
+        if not dms:
+            return
+        user_ids, contents, dedupe_keys, kinds, guild_ids = zip(*dms)
+        inserted = await conn.fetch(
+            '''
+            INSERT INTO dm_outbox (dedupe_key, user_id, guild_id, kind, content)
+            SELECT * FROM unnest($1::varchar[], $2::bigint[], $3::bigint[], $4::varchar[], $5::text[])
+            ON CONFLICT (dedupe_key) DO NOTHING
+            RETURNING id
+        ''', list(dedupe_keys), [int(user_id) for user_id in user_ids],
+            list(guild_ids), list(kinds), list(contents))
+        self.dm_outbox_metrics["queued"] += len(inserted)
+        self.dm_outbox_metrics["deduplicated"] += len(dms) - len(inserted)
+
+    @tasks.loop(seconds=DM_OUTBOX_CONFIG["poll_seconds"])
+    async def dm_outbox_task(self):
+        """Claim due DMs and send them through a paced worker pool"""
+        if not self.db_pool:
+            return
+        try:
+            async with self.db_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    '''
+                    UPDATE dm_outbox SET status = 'sending', attempts = attempts + 1
+                    WHERE id IN (
+                        SELECT id FROM dm_outbox
+                        WHERE status = 'pending' AND next_attempt_at <= NOW()
+                        ORDER BY next_attempt_at
+                        LIMIT $1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, user_id, kind, content, attempts
+                ''', DM_OUTBOX_CONFIG["batch_size"])
+            if not rows:
+                return
+
+            pending = deque(sorted(rows, key=lambda row: row['id']))
+
+            async def worker():
+                while pending:
+                    await self.deliver_outbox_dm(pending.popleft())
+
+            await asyncio.gather(
+                *[worker() for _ in range(DM_OUTBOX_CONFIG["workers"])])
+        except Exception:
+            core_logger.exception("❌ DM outbox error")
+
+    async def wait_for_dm_slot(self):
+        """Space DM sends evenly across all workers"""
+        loop = asyncio.get_running_loop()
+        slot = max(loop.time(), self.dm_next_send_at)
+        self.dm_next_send_at = slot + 1 / DM_OUTBOX_CONFIG["rate_per_second"]
+        await asyncio.sleep(slot - loop.time())
+
+    async def deliver_outbox_dm(self, row):
+        """Send one claimed DM and record the result. A 429 is rescheduled after
+        Discord's retry_after and does not use up one of the row's attempts."""
+        status, error, retry_after, rate_limited = "sent", None, None, False
+        await self.wait_for_dm_slot()
+        try:
+            user = self.get_user(row['user_id']) or await self.fetch_user(
+                row['user_id'])
+            await user.send(row['content'])
+        except discord.Forbidden as e:
+            status, error = "forbidden", str(e)
+        except discord.NotFound as e:
+            status, error = "failed", str(e)
+        except Exception as e:
+            status, error = "pending", str(e)
+            if isinstance(e, discord.HTTPException) and e.status == 429:
+                rate_limited = True
+                retry_after = getattr(e, "retry_after", None) or 5
+                # Back off every worker, not just this one
+                self.dm_next_send_at = max(
+                    self.dm_next_send_at,
+                    asyncio.get_running_loop().time() + retry_after)
+
+        if (status == "pending" and not rate_limited
+                and row['attempts'] >= DM_OUTBOX_CONFIG["max_attempts"]):
+            status = "failed"
+        if rate_limited:
+            self.dm_outbox_metrics["rate_limited"] += 1
+        elif status == "pending":
+            retry_after = retry_after or min(
+                DM_OUTBOX_CONFIG["backoff_base_seconds"] *
+                2**(row['attempts'] - 1), DM_OUTBOX_CONFIG["backoff_max_seconds"])
+            self.dm_outbox_metrics["retried"] += 1
+        else:
+            self.dm_outbox_metrics[status] += 1
+
+        if status == "sent":
+            self.dm_sent_times.append(asyncio.get_running_loop().time())
+            autorole_logger.info(
+                f"📬 Sent {row['kind']} DM to user {row['user_id']}")
+        elif status != "pending":
+            await self.log_to_discord(
+                f"⚠️ Could not send {row['kind']} DM to <@{row['user_id']}> ({status}): {error}"
+            )
+
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.execute(
+                    '''
+                    UPDATE dm_outbox
+                    SET status = $2,
+                        last_error = $3,
+                        sent_at = CASE WHEN $2 = 'sent' THEN NOW() ELSE sent_at END,
+                        next_attempt_at = NOW() + make_interval(secs => $4),
+                        attempts = attempts - $5
+                    WHERE id = $1
+                ''', row['id'], status, error, float(retry_after or 0),
+                    int(rate_limited))
+        except Exception:
+            core_logger.exception(f"❌ Error updating DM outbox row {row['id']}")
+
+    async def get_dm_outbox_metrics(self):
+        """Backlog by status, throughput and the expected drain time"""
+        loop_now = asyncio.get_running_loop().time()
+        sent_last_minute = sum(1 for sent_at in self.dm_sent_times
+                               if loop_now - sent_at <= 60)
+        metrics = {
+            **self.dm_outbox_metrics,
+            "workers": DM_OUTBOX_CONFIG["workers"],
+            "rate_per_second": DM_OUTBOX_CONFIG["rate_per_second"],
+            "sent_last_minute": sent_last_minute
+        }
+        if not self.db_pool:
+            return metrics
+        try:
+            async with self.db_pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT status, COUNT(*) AS count,
+                           COUNT(*) FILTER (WHERE next_attempt_at <= NOW()) AS due,
+                           EXTRACT(EPOCH FROM NOW() - MIN(next_attempt_at)) AS oldest_seconds
+                    FROM dm_outbox GROUP BY status
+                ''')
+            backlog = {row['status']: row['count'] for row in rows}
+            pending = next((row for row in rows if row['status'] == 'pending'), None)
+            due = pending['due'] if pending else 0
+            metrics.update(
+                backlog=backlog,
+                due=due,
+                oldest_due_seconds=round(max(float(pending['oldest_seconds'] or 0), 0))
+                if pending else 0,
+                drain_eta_seconds=round(due / DM_OUTBOX_CONFIG["rate_per_second"]))
+        except Exception as e:
+            metrics["error"] = str(e)
+        return metrics
+
+    async def cleanup_dm_outbox(self):
+        """Drop finished outbox rows past the retention window"""
+        if not self.db_pool:
+            return
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.execute(
+                    '''
+                    DELETE FROM dm_outbox
+                    WHERE status IN ('sent', 'forbidden', 'failed')
+                      AND created_at < NOW() - make_interval(days => $1)
+                ''', DM_OUTBOX_CONFIG["retention_days"])
+        except Exception as e:
+            core_logger.warning(f"❌ Error cleaning up DM outbox: {str(e)}")
+
+    # ===== PROVIDER CAPABILITY MATRIX =====
 
-    async def update_limit_trade_in_db(self, message_id: str,
-                                       trade_data: dict):
-        """Update a limit trade in database with new price levels after entry hit"""
-        # Always update in-memory first
-        PRICE_TRACKING_CONFIG["active_trades"][message_id] = trade_data
+    async def load_provider_matrix(self):
+        """Load the pair-to-provider capability matrix"""
+        if not self.db_pool:
+            return
+        try:
+            async with self.db_pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT pair, api_name, last_success_at, last_checked_at,
+                           latency_ms, error_rate, checks
+                    FROM provider_capabilities
+                ''')
+            self.provider_matrix.load(rows)
+            pricing_logger.info(
+                f"✅ Loaded provider matrix: {len(rows)} entries, {len(self.provider_matrix.assignments)} pairs assigned"
+            )
+        except Exception as e:
+            pricing_logger.error(f"❌ Error loading provider matrix: {str(e)}")
 
-        # Also update database if available
-        if self.db_pool:
-            try:
-                async with self.db_pool.acquire() as conn:
-                    await conn.execute(
-                        '''
-                        UPDATE active_trades SET 
-                            entry_price = $2, tp1_price = $3, tp2_price = $4, tp3_price = $5, sl_price = $6,
-                            live_entry = $7, status = $8, tp_hits = $9, breakeven_active = $10, last_updated = NOW()
-                        WHERE message_id = $1
-                    ''', message_id, trade_data["entry"], trade_data["tp1"],
-                        trade_data["tp2"], trade_data["tp3"], trade_data["sl"],
-                        trade_data.get("live_entry"),
-                        trade_data.get("status", "active"),
-                        ','.join(trade_data.get("tp_hits", [])),
-                        trade_data.get("breakeven_active", False))
-            except Exception as e:
-                # Send error details to debug channel instead of silently failing
-                debug_channel = self.get_channel(DEBUG_CHANNEL_ID)
-                if debug_channel:
-                    await debug_channel.send(
-                        f"❌ Database UPDATE failed for message_id {message_id}: {str(e)}"
-                    )
-                print(f"❌ Database update error: {str(e)}")
+    async def save_provider_matrix(self):
+        """Persist matrix entries that changed since the last save"""
+        if not self.db_pool or not self.provider_matrix.dirty:
+            return
+        rows = self.provider_matrix.take_dirty_rows()
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.executemany(
+                    '''
+                    INSERT INTO provider_capabilities
+                        (pair, api_name, last_success_at, last_checked_at, latency_ms, error_rate, checks)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7)
+                    ON CONFLICT (pair, api_name) DO UPDATE SET
+                        last_success_at = EXCLUDED.last_success_at,
+                        last_checked_at = EXCLUDED.last_checked_at,
+                        latency_ms = EXCLUDED.latency_ms,
+                        error_rate = EXCLUDED.error_rate,
+                        checks = EXCLUDED.checks
+                ''', rows)
+        except Exception as e:
+            self.provider_matrix.dirty.update((row[0], row[1]) for row in rows)
+            pricing_logger.error(f"❌ Error saving provider matrix: {str(e)}")
 
-    async def remove_trade_from_db(self,
-                                   message_id: str,
-                                   completion_reason: str = "unknown"):
-        """Remove completed trade from database and save to historical table"""
-        # First, save to historical table before removing
-        if self.db_pool:
-            try:
-                async with self.db_pool.acquire() as conn:
-                    # Get the trade data before removing it
-                    trade_row = await conn.fetchrow(
-                        'SELECT * FROM active_trades WHERE message_id = $1',
-                        message_id)
+    @tasks.loop(minutes=10)
+    async def provider_matrix_task(self):
+        """Low-priority refresh of stale matrix entries, one spaced-out probe at a time"""
+        if not PRICE_TRACKING_CONFIG["enabled"]:
+            return
+        try:
+            probed = 0
+            for pair in PAIR_CONFIG:
+                pair_clean = self.clean_pair_name(pair)
+                for api_name in PRICE_TRACKING_CONFIG["api_priority_order"]:
+                    if not PRICE_TRACKING_CONFIG["api_keys"].get(f"{api_name}_key"):
+                        continue
+                    if not self.provider_matrix.needs_probe(
+                            pair_clean, api_name, datetime.now(timezone.utc)):
+                        continue
+                    await self.get_price_from_single_api(api_name, pair_clean)
+                    probed += 1
+                    await asyncio.sleep(
+                        PROVIDER_MATRIX_CONFIG["probe_spacing_seconds"])
+            if probed:
+                self.provider_matrix.last_refresh = datetime.now(AMSTERDAM_TZ)
+                pricing_logger.info(
+                    f"🧭 Provider matrix refreshed: {probed} probes, {len(self.provider_matrix.assignments)} pairs assigned"
+                )
+            await self.save_provider_matrix()
+        except Exception as e:
+            pricing_logger.error(f"❌ Provider matrix refresh failed: {str(e)}")
+
+    # ===== TRADE PERFORMANCE ROLLUPS =====
+
+    def classify_trade_outcome(self, trade_row, completion_reason: str):
+        """Return (outcome, tp_hits, pips) for an archived trade row"""
+        reason = (completion_reason or "").lower()
+        if reason in ("tp3_hit", "manual_tp3_hit"):
+            outcome = "tp3"
+        elif reason in ("sl_hit", "manual_sl_hit"):
+            outcome = "sl"
+        elif reason in ("breakeven_hit", "manual_breakeven_hit"):
+            outcome = "breakeven"
+        else:
+            outcome = "other"
 
-                    if trade_row:
-                        # Save to completed_trades table for historical tracking
-                        await conn.execute(
-                            '''
-                            INSERT INTO completed_trades (
-                                message_id, channel_id, guild_id, pair, action,
-                                entry_price, tp1_price, tp2_price, tp3_price, sl_price,
-                                discord_entry, discord_tp1, discord_tp2, discord_tp3, discord_sl,
-                                live_entry, assigned_api, final_status, tp_hits, breakeven_active, 
-                                entry_type, manual_overrides, created_at, completion_reason
-                            ) VALUES (
-                                $1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, 
-                                $16, $17, $18, $19, $20, $21, $22, $23, $24
-                            )
-                        ''', trade_row['message_id'], trade_row['channel_id'],
-                            trade_row['guild_id'], trade_row['pair'],
-                            trade_row['action'], trade_row['entry_price'],
-                            trade_row['tp1_price'], trade_row['tp2_price'],
-                            trade_row['tp3_price'], trade_row['sl_price'],
-                            trade_row['discord_entry'],
-                            trade_row['discord_tp1'], trade_row['discord_tp2'],
-                            trade_row['discord_tp3'], trade_row['discord_sl'],
-                            trade_row['live_entry'], trade_row['assigned_api'],
-                            trade_row['status'], trade_row['tp_hits'],
-                            trade_row['breakeven_active'],
-                            trade_row['entry_type'],
-                            trade_row.get('manual_overrides', ''),
-                            trade_row['created_at'], completion_reason)
-
-                    # Now remove from active_trades
-                    await conn.execute(
-                        'DELETE FROM active_trades WHERE message_id = $1',
-                        message_id)
+        tp_hits = {
+            tp.strip()
+            for tp in (trade_row['tp_hits'] or "").split(',') if tp.strip()
+        }
+        if outcome == "tp3":
+            tp_hits.update({"tp1", "tp2", "tp3"})
+
+        pip_value = PAIR_CONFIG.get(trade_row['pair'],
+                                    {}).get('pip_value', 0.0001)
+        entry = float(trade_row['entry_price'])
+        if outcome == "tp3":
+            pips = abs(float(trade_row['tp3_price']) - entry) / pip_value
+        elif outcome == "sl":
+            pips = -abs(float(trade_row['sl_price']) - entry) / pip_value
+        else:
+            pips = 0.0
+
+        return outcome, tp_hits, round(pips, 1)
+
+    def build_rollup_rows(self, trade_row, completion_reason: str,
+                          completed_at: datetime):
+        """Build the per-bucket counter increments for one archived trade"""
+        outcome, tp_hits, pips = self.classify_trade_outcome(
+            trade_row, completion_reason)
+        local_time = completed_at.astimezone(AMSTERDAM_TZ)
+        iso_year, iso_week, _ = local_time.isocalendar()
+        counters = (1, int("tp1" in tp_hits), int("tp2" in tp_hits),
+                    int("tp3" in tp_hits), int(outcome == "sl"),
+                    int(outcome == "breakeven"), int(outcome == "other"),
+                    pips)
+        buckets = [("day", local_time.strftime('%Y-%m-%d')),
+                   ("week", f"{iso_year}-W{iso_week:02d}"),
+                   ("pair", trade_row['pair']),
+                   ("direction", trade_row['action'].upper())]
+        return [(bucket_type, bucket_key) + counters
+                for bucket_type, bucket_key in buckets]
+
+    async def apply_trade_rollups(self, conn, archived):
+        """Add archived trades [(row, reason, completed_at)] to trade_rollups on an open connection"""
+        rows = []
+        for trade_row, completion_reason, completed_at in archived:
+            rows.extend(
+                self.build_rollup_rows(trade_row, completion_reason,
+                                       completed_at))
+        if not rows:
+            return
+        await conn.executemany(
+            '''
+            INSERT INTO trade_rollups (
+                bucket_type, bucket_key, trades, tp1_hits, tp2_hits, tp3_hits,
+                sl_hits, breakeven_hits, other_closes, pips_total
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+            ON CONFLICT (bucket_type, bucket_key) DO UPDATE SET
+                trades = trade_rollups.trades + EXCLUDED.trades,
+                tp1_hits = trade_rollups.tp1_hits + EXCLUDED.tp1_hits,
+                tp2_hits = trade_rollups.tp2_hits + EXCLUDED.tp2_hits,
+                tp3_hits = trade_rollups.tp3_hits + EXCLUDED.tp3_hits,
+                sl_hits = trade_rollups.sl_hits + EXCLUDED.sl_hits,
+                breakeven_hits = trade_rollups.breakeven_hits + EXCLUDED.breakeven_hits,
+                other_closes = trade_rollups.other_closes + EXCLUDED.other_closes,
+                pips_total = trade_rollups.pips_total + EXCLUDED.pips_total,
+                updated_at = NOW()
+        ''', rows)
+
+    async def backfill_trade_rollups(self):
+        """Build trade_rollups from completed_trades if the rollups are empty"""
+        if not self.db_pool:
+            return
 
-            except Exception as e:
-                # Send error details to debug channel instead of silently failing
-                debug_channel = self.get_channel(DEBUG_CHANNEL_ID)
-                if debug_channel:
-                    await debug_channel.send(
-                        f"❌ Database DELETE/ARCHIVE failed for message_id {message_id}: {str(e)}"
-                    )
-                print(f"❌ Database delete/archive error: {str(e)}")
+        try:
+            async with self.db_pool.acquire() as conn, conn.transaction():
+                has_rollups = await conn.fetchval(
+                    'SELECT EXISTS (SELECT 1 FROM trade_rollups)')
+                if has_rollups:
+                    return
+                completed_rows = await conn.fetch('''
+                    SELECT pair, action, entry_price, tp3_price, sl_price, tp_hits,
+                           completion_reason, completed_at
+                    FROM completed_trades
+                ''')
+                if not completed_rows:
+                    return
+                await self.apply_trade_rollups(
+                    conn, [(row, row['completion_reason'], row['completed_at'])
+                           for row in completed_rows])
+            core_logger.info(
+                f"✅ Built trade rollups from {len(completed_rows)} completed trades"
+            )
+        except Exception:
+            core_logger.exception("❌ Error building trade rollups")
 
-        # Always remove from memory after database operations
-        if message_id in PRICE_TRACKING_CONFIG["active_trades"]:
-            del PRICE_TRACKING_CONFIG["active_trades"][message_id]
+    async def get_trade_rollups(self, bucket_type: str, limit: int = 30):
+        """Return the newest rollup rows for a bucket type as plain dicts"""
+        if not self.db_pool:
+            return []
+
+        try:
+            # Time buckets newest first, pair/direction buckets busiest first
+            order_by = "bucket_key DESC" if bucket_type in (
+                "day", "week") else "trades DESC, bucket_key"
+            async with self.db_pool.acquire() as conn:
+                rows = await conn.fetch(
+                    f'''
+                    SELECT bucket_key, trades, tp1_hits, tp2_hits, tp3_hits, sl_hits,
+                           breakeven_hits, other_closes, pips_total
+                    FROM trade_rollups
+                    WHERE bucket_type = $1
+                    ORDER BY {order_by}
+                    LIMIT $2
+                ''', bucket_type, limit)
+            return [{
+                **dict(row), "pips_total": float(row['pips_total'])
+            } for row in rows]
+        except Exception as e:
+            tracking_logger.error(f"❌ Error loading trade rollups: {str(e)}")
+            return []
 
     async def get_active_trades_from_db(self):
         """Get current active trades from database (used by commands)"""
@@ -2894,7 +5407,7 @@ class TradingBot(commands.Bot):
             return PRICE_TRACKING_CONFIG["active_trades"]
 
         except Exception as e:
-            print(f"Error loading trades from database: {e}")
+            tracking_logger.error(f"Error loading trades from database: {e}")
             return PRICE_TRACKING_CONFIG["active_trades"]
 
     async def get_trade_from_db(self, message_id: str):
@@ -2955,15 +5468,25 @@ class TradingBot(commands.Bot):
                         tp_hits_list,
                         'breakeven_active':
                         row['breakeven_active'],
+                        'entry_type':
+                        row.get('entry_type'),
+                        'manual_overrides': [
+                            mo for mo in row.get('manual_overrides', '').split(
+                                ',') if mo
+                        ] if row.get('manual_overrides') else [],
+                        'linked_messages':
+                        decode_linked_messages(row.get('linked_messages')),
                         'channel_id':
                         row['channel_id'],
                         'guild_id':
-                        row['guild_id']
+                        row['guild_id'],
+                        'message_id':
+                        row['message_id']
                     }
                 return None
 
         except Exception as e:
-            print(f"Error getting trade from database: {e}")
+            tracking_logger.error(f"Error getting trade from database: {e}")
             return PRICE_TRACKING_CONFIG["active_trades"].get(message_id)
 
     async def store_missed_hit(self, message_id: str, hit_type: str,
@@ -2981,7 +5504,7 @@ class TradingBot(commands.Bot):
                     VALUES ($1, $2, $3, $4, $5)
                 ''', message_id, hit_type, hit_level, hit_price, amsterdam_now)
         except Exception as e:
-            print(f"Error storing missed hit: {e}")
+            tracking_logger.error(f"Error storing missed hit: {e}")
 
     def is_night_pause(self):
         """Check if we're currently in night pause period (01:00-07:00 Amsterdam time on weekdays)"""
@@ -3003,6 +5526,11 @@ class TradingBot(commands.Bot):
         """Determine which API successfully provides a price for a trading pair"""
         pair_clean = self.clean_pair_name(pair)
 
+        # Known pairs are assigned straight from the capability matrix
+        assigned_api = self.provider_matrix.assigned_api(pair_clean)
+        if assigned_api:
+            return assigned_api
+
         # Try APIs in priority order and return the first one that works
         for api_name in PRICE_TRACKING_CONFIG["api_priority_order"]:
             try:
@@ -3015,16 +5543,16 @@ class TradingBot(commands.Bot):
                 price = await self.get_price_from_single_api(
                     api_name, pair_clean)
                 if price is not None:
-                    print(
+                    pricing_logger.info(
                         f"✅ API assignment: {pair_clean} will use {api_name} (price: {price})"
                     )
                     return api_name
             except Exception as e:
-                print(f"⚠️ {api_name} failed for {pair_clean}: {str(e)[:100]}")
+                pricing_logger.warning(f"⚠️ {api_name} failed for {pair_clean}: {str(e)[:100]}")
                 continue
 
         # If all APIs fail, default to currencybeacon
-        print(
+        pricing_logger.warning(
             f"⚠️ All APIs failed for {pair_clean}, defaulting to currencybeacon"
         )
         return "currencybeacon"
@@ -3042,26 +5570,8 @@ class TradingBot(commands.Bot):
         if not self.db_pool:
             return
 
-        try:
-            async with self.db_pool.acquire() as conn:
-                # Update all tracked invites
-                for invite_code, data in INVITE_TRACKING.items():
-                    await conn.execute(
-                        '''
-                        INSERT INTO invite_tracking 
-                        (invite_code, guild_id, creator_id, nickname, total_joins, total_left, current_members, last_updated)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7, NOW())
-                        ON CONFLICT (invite_code) DO UPDATE SET
-                            nickname = $4,
-                            total_joins = $5,
-                            total_left = $6,
-                            current_members = $7,
-                            last_updated = NOW()
-                        ''', invite_code, data["guild_id"], data["creator_id"],
-                        data["nickname"], data["total_joins"],
-                        data["total_left"], data["current_members"])
-        except Exception as e:
-            print(f"❌ Error saving invite tracking to database: {str(e)}")
+        # Written by the state store's batched flush
+        self.state_store.mark_dirty("invite_tracking")
 
     # ===== LIVE PRICE TRACKING METHODS =====
 
@@ -3102,7 +5612,7 @@ class TradingBot(commands.Bot):
                 if price is not None:
                     return price
             except Exception as e:
-                print(f"⚠️ {api_name} failed for {pair_clean}: {str(e)[:100]}")
+                pricing_logger.warning(f"⚠️ {api_name} failed for {pair_clean}: {str(e)[:100]}")
                 continue
 
         # If all APIs fail, notify user
@@ -3122,6 +5632,24 @@ class TradingBot(commands.Bot):
 
     async def get_price_from_single_api(self, api_name: str,
                                         pair_clean: str) -> Optional[float]:
+        """Get price from a specific API and record the outcome in the provider matrix"""
+        if not PRICE_TRACKING_CONFIG["api_keys"].get(f"{api_name}_key"):
+            return None
+
+        started = asyncio.get_running_loop().time()
+        price = None
+        try:
+            price = await self.request_price_from_api(api_name, pair_clean)
+            return price
+        finally:
+            latency_ms = (asyncio.get_running_loop().time() - started) * 1000
+            self.provider_matrix.record(pair_clean, api_name, price
+                                        is not None, latency_ms)
+            log_sampled(pricing_logger, "%s %s -> %s in %.0fms", api_name,
+                        pair_clean, price, latency_ms)
+
+    async def request_price_from_api(self, api_name: str,
+                                     pair_clean: str) -> Optional[float]:
         """Get price from a specific API - Only 4 selected APIs in priority order"""
         try:
             # Check if API key exists
@@ -3269,7 +5797,7 @@ class TradingBot(commands.Bot):
                             )
 
         except Exception as e:
-            print(f"⚠️ {api_name} API error for {pair_clean}: {str(e)[:100]}")
+            pricing_logger.warning(f"⚠️ {api_name} API error for {pair_clean}: {str(e)[:100]}")
 
         return None
 
@@ -3300,17 +5828,17 @@ class TradingBot(commands.Bot):
             api_errors: Dict[str, str]) -> Optional[float]:
         """Verify price accuracy by cross-checking multiple API sources"""
         if not prices:
-            print(f"❌ No valid prices obtained for {pair} - all APIs failed")
+            pricing_logger.error(f"❌ No valid prices obtained for {pair} - all APIs failed")
             if api_errors:
                 error_summary = ", ".join(
                     [f"{api}: {error}" for api, error in api_errors.items()])
-                print(f"   API Errors: {error_summary}")
+                pricing_logger.error(f"   API Errors: {error_summary}")
             return None
 
         if len(prices) == 1:
             # Only one source - use it but log warning
             api_name, price = next(iter(prices.items()))
-            print(f"⚠️ Only {api_name} provided price for {pair}: ${price}")
+            pricing_logger.warning(f"⚠️ Only {api_name} provided price for {pair}: ${price}")
             return price
 
         # Multiple sources - verify consistency
@@ -3326,7 +5854,7 @@ class TradingBot(commands.Bot):
             if deviation <= tolerance:
                 consistent_prices.append((api_name, price))
             else:
-                print(
+                pricing_logger.warning(
                     f"⚠️ {api_name} price for {pair} deviates significantly: ${price} (avg: ${avg_price:.5f})"
                 )
 
@@ -3335,7 +5863,7 @@ class TradingBot(commands.Bot):
             final_price = sum([price for _, price in consistent_prices
                                ]) / len(consistent_prices)
             api_names = ", ".join([api for api, _ in consistent_prices])
-            print(
+            pricing_logger.info(
                 f"✅ Price verified for {pair}: ${final_price:.5f} (sources: {api_names})"
             )
             return final_price
@@ -3343,7 +5871,7 @@ class TradingBot(commands.Bot):
             # Use median if we have multiple sources but they're not very consistent
             sorted_prices = sorted(price_values)
             median_price = sorted_prices[len(sorted_prices) // 2]
-            print(
+            pricing_logger.warning(
                 f"⚠️ Using median price for {pair}: ${median_price:.5f} (prices varied across sources)"
             )
             return median_price
@@ -3362,7 +5890,7 @@ class TradingBot(commands.Bot):
                      f"**Impact:** Price tracking accuracy may be reduced if multiple APIs are limited."
 
         await self.log_to_discord(warning_msg)
-        print(f"API LIMIT WARNING: {api_name} - {message}")
+        pricing_logger.warning(f"API LIMIT WARNING: {api_name} - {message}")
 
     async def get_all_api_prices(self, pair_clean: str) -> Dict[str, any]:
         """Get prices from all 4 selected APIs for comparison - returns dict with prices and errors"""
@@ -3401,165 +5929,22 @@ class TradingBot(commands.Bot):
     def parse_signal_message(self, content: str) -> Optional[Dict]:
         """Parse a trading signal message to extract trade data"""
         try:
-            lines = content.split('\n')
-            trade_data = {
-                "pair": None,
-                "action": None,
-                "entry": None,
-                "tp1": None,
-                "tp2": None,
-                "tp3": None,
-                "sl": None,
-                "status": "active",  # Will be set based on entry type
-                "tp_hits": [],
-                "breakeven_active": False,
-                "entry_type":
-                None  # Store full entry type (Buy/Sell + limit/execution)
-            }
-
-            # Find pair from "Trade Signal For: PAIR"
-            for line in lines:
-                if "Trade Signal For:" in line:
-                    parts = line.split("Trade Signal For:")
-                    if len(parts) > 1:
-                        # Extract and clean the pair name using centralized function
-                        raw_pair = parts[1].strip()
-                        cleaned_pair = self.clean_pair_name(raw_pair)
-                        trade_data["pair"] = cleaned_pair
-                        break
-
-            # Extract full entry type from "Entry Type: Buy execution/limit" or "Entry Type: Sell execution/limit"
-            entry_type_match = re.search(
-                r'Entry Type:\s*(Buy|Sell)\s+(execution|limit)', content,
-                re.IGNORECASE)
-            if entry_type_match:
-                action = entry_type_match.group(1).upper()  # BUY or SELL
-                order_type = entry_type_match.group(
-                    2).lower()  # execution or limit
-
-                trade_data["action"] = action
-                trade_data[
-                    "entry_type"] = f"{action.lower()} {order_type}"  # "buy execution", "sell limit", etc.
-
-                # Set status based on order type
-                if order_type == "limit":
-                    trade_data[
-                        "status"] = "pending_entry"  # Wait for entry to be hit
-                else:  # execution
-                    trade_data[
-                        "status"] = "active"  # Start tracking immediately
-            else:
-                # Fallback to old format detection
-                for line in lines:
-                    if "BUY" in line.upper() or "SELL" in line.upper():
-                        if "BUY" in line.upper():
-                            trade_data["action"] = "BUY"
-                        else:
-                            trade_data["action"] = "SELL"
-                        break
-
-            # Extract entry price from "Entry Price: $3473.50" (handles $ symbol)
-            # Enhanced pattern for BTCUSD and other high-value pairs
-            entry_match = re.search(r'Entry Price:\s*\$?([0-9]+(?:\.[0-9]+)?)',
-                                    content, re.IGNORECASE)
-            if entry_match:
-                trade_data["entry"] = float(entry_match.group(1))
-            else:
-                # Fallback to old format "Entry: price" with improved regex
-                entry_match = re.search(r'Entry[:\s]*\$?([0-9]+(?:\.[0-9]+)?)',
-                                        content, re.IGNORECASE)
-                if entry_match:
-                    trade_data["entry"] = float(entry_match.group(1))
-
-            # Extract Take Profit levels with enhanced patterns for all pairs including BTCUSD
-            tp1_match = re.search(r'Take Profit 1:\s*\$?([0-9]+(?:\.[0-9]+)?)',
-                                  content, re.IGNORECASE)
-            if tp1_match:
-                trade_data["tp1"] = float(tp1_match.group(1))
-            else:
-                # Fallback to old format "TP1: price" with improved regex
-                tp1_match = re.search(r'TP1[:\s]*\$?([0-9]+(?:\.[0-9]+)?)',
-                                      content, re.IGNORECASE)
-                if tp1_match:
-                    trade_data["tp1"] = float(tp1_match.group(1))
-
-            tp2_match = re.search(r'Take Profit 2:\s*\$?([0-9]+(?:\.[0-9]+)?)',
-                                  content, re.IGNORECASE)
-            if tp2_match:
-                trade_data["tp2"] = float(tp2_match.group(1))
-            else:
-                # Fallback to old format "TP2: price" with improved regex
-                tp2_match = re.search(r'TP2[:\s]*\$?([0-9]+(?:\.[0-9]+)?)',
-                                      content, re.IGNORECASE)
-                if tp2_match:
-                    trade_data["tp2"] = float(tp2_match.group(1))
-
-            tp3_match = re.search(r'Take Profit 3:\s*\$?([0-9]+(?:\.[0-9]+)?)',
-                                  content, re.IGNORECASE)
-            if tp3_match:
-                trade_data["tp3"] = float(tp3_match.group(1))
-            else:
-                # Fallback to old format "TP3: price" with improved regex
-                tp3_match = re.search(r'TP3[:\s]*\$?([0-9]+(?:\.[0-9]+)?)',
-                                      content, re.IGNORECASE)
-                if tp3_match:
-                    trade_data["tp3"] = float(tp3_match.group(1))
-
-            # Extract Stop Loss from "Stop Loss: $3478.50" with enhanced pattern
-            sl_match = re.search(r'Stop Loss:\s*\$?([0-9]+(?:\.[0-9]+)?)',
-                                 content, re.IGNORECASE)
-            if sl_match:
-                trade_data["sl"] = float(sl_match.group(1))
-            else:
-                # Fallback to old format "SL: price" with improved regex
-                sl_match = re.search(r'SL[:\s]*\$?([0-9]+(?:\.[0-9]+)?)',
-                                     content, re.IGNORECASE)
-                if sl_match:
-                    trade_data["sl"] = float(sl_match.group(1))
-
-            # Debug logging to help troubleshoot parsing issues
-            print(f"🔍 Parsing signal content: {content[:100]}...")
-            print(
-                f"   Extracted - Pair: {trade_data['pair']}, Action: {trade_data['action']}"
-            )
-            print(
-                f"   Extracted - Entry: {trade_data['entry']}, TP1: {trade_data['tp1']}, TP2: {trade_data['tp2']}, TP3: {trade_data['tp3']}, SL: {trade_data['sl']}"
-            )
-
-            # Special handling for BTCUSD to improve parsing reliability
-            if trade_data['pair'] == 'BTCUSD':
-                print(f"🔍 BTCUSD Special Debug - Raw content: {content}")
-                print(
-                    f"🔍 BTCUSD Special Debug - Split lines: {content.split(chr(10))}"
-                )
-
-            # Validate required fields
-            if all([
-                    trade_data["pair"], trade_data["action"],
-                    trade_data["entry"], trade_data["tp1"], trade_data["tp2"],
-                    trade_data["tp3"], trade_data["sl"]
-            ]):
-                print(
-                    f"✅ Successfully parsed signal for {trade_data['pair']} ({trade_data['action']})"
-                )
-                return trade_data
-            else:
-                missing_fields = []
-                for field, value in trade_data.items():
-                    if field in [
-                            "pair", "action", "entry", "tp1", "tp2", "tp3",
-                            "sl"
-                    ] and value is None:
-                        missing_fields.append(field)
-                print(
-                    f"❌ Signal parsing failed - missing fields: {missing_fields}"
-                )
-
+            signal = parse_signal(content)
         except Exception as e:
             # Log signal parsing failures (can't use await in non-async function)
-            print(f"❌ Signal parsing error: {str(e)}")
+            tracking_logger.error(f"❌ Signal parsing error: {str(e)}")
+            return None
 
-        return None
+        if not signal.is_valid:
+            tracking_logger.warning(f"❌ Signal parsing failed - {'; '.join(signal.errors)}")
+            return None
+
+        for warning in signal.warnings:
+            tracking_logger.warning(f"⚠️ Signal {signal.pair}: {warning}")
+        tracking_logger.info(
+            f"✅ Successfully parsed signal for {signal.pair} ({signal.action})"
+        )
+        return signal.to_trade_data()
 
     async def check_message_still_exists(self, message_id: str,
                                          trade_data: Dict) -> bool:
@@ -3627,99 +6012,33 @@ class TradingBot(commands.Bot):
                     )
                     return False
 
-            action = trade_data["action"]
-            entry = trade_data["entry"]
-
-            # Apply trading logic validation before processing any hits
-            tp_hits_set = set(trade_data.get("tp_hits", []))
-
             # Rule 1: If TP2 was already hit, SL cannot hit (breakeven protection)
-            if "tp2" in tp_hits_set:
+            if "tp2" in trade_data.get("tp_hits", []):
                 trade_data["breakeven_active"] = True
 
-            # Determine if we should check breakeven (after TP2 hit) but respect manual overrides
-            manual_overrides_set = set(trade_data.get("manual_overrides", []))
-            if trade_data.get(
-                    "breakeven_active",
-                    False) and "breakeven" not in manual_overrides_set:
-                # Check if price returned to entry (breakeven SL)
-                if action == "BUY" and current_price <= entry:
-                    await self.handle_breakeven_hit(message_id, trade_data)
-                    return True
-                elif action == "SELL" and current_price >= entry:
-                    await self.handle_breakeven_hit(message_id, trade_data)
-                    return True
-            else:
-                # Check SL first - but apply trading logic validation and respect manual overrides
-                manual_overrides_set = set(
-                    trade_data.get("manual_overrides", []))
-                sl_hit = False
-
-                # Only check SL if it wasn't manually overridden
-                if "sl" not in manual_overrides_set:
-                    if action == "BUY" and current_price <= trade_data["sl"]:
-                        sl_hit = True
-                    elif action == "SELL" and current_price >= trade_data["sl"]:
-                        sl_hit = True
-
-                if sl_hit:
-                    # Rule 2: SL cannot hit after TP2 (breakeven protection)
-                    if "tp2" in tp_hits_set:
-                        return False  # Ignore this SL hit due to breakeven
-
-                    # Rule 3: SL cannot hit after TP3
-                    if "tp3" in tp_hits_set:
-                        return False  # Ignore this SL hit
-
-                    # SL is valid - process it
-                    await self.handle_sl_hit(message_id, trade_data)
+            # Same rules as the offline replay engine (signal_replay.py)
+            levels_hit = evaluate_price_levels(trade_data, current_price)
+            if levels_hit:
+                trade_data["hit_detected_at"] = asyncio.get_running_loop().time()
+            if levels_hit == ["breakeven"]:
+                await self.handle_breakeven_hit(message_id, trade_data)
+                return True
+            if levels_hit == ["sl"]:
+                await self.handle_sl_hit(message_id, trade_data)
+                return True
+
+            # Process all TP hits in the correct order (TP1, TP2, TP3)
+            for tp_level in levels_hit:
+                trade_data.setdefault("hit_detected_at",
+                                      asyncio.get_running_loop().time())
+                await self.handle_tp_hit(message_id, trade_data, tp_level)
+
+                # If TP3 was hit, trade is completed and will be removed
+                if tp_level == "tp3":
                     return True
 
-                # Check TP levels with comprehensive detection - detect ALL TPs that have been hit
-                # ⚠️ CRITICAL: Respect manual overrides to prevent duplicate notifications
-                manual_overrides_set = set(
-                    trade_data.get("manual_overrides", []))
-                tp_levels_hit = []
-
-                if action == "BUY":
-                    # For BUY orders, check if price has reached each TP level (but NOT if manually overridden)
-                    if "tp1" not in tp_hits_set and "tp1" not in manual_overrides_set and current_price >= trade_data[
-                            "tp1"]:
-                        tp_levels_hit.append("tp1")
-                    if "tp2" not in tp_hits_set and "tp2" not in manual_overrides_set and current_price >= trade_data[
-                            "tp2"]:
-                        tp_levels_hit.append("tp2")
-                    if "tp3" not in tp_hits_set and "tp3" not in manual_overrides_set and current_price >= trade_data[
-                            "tp3"]:
-                        tp_levels_hit.append("tp3")
-                elif action == "SELL":
-                    # For SELL orders, check if price has reached each TP level (but NOT if manually overridden)
-                    if "tp1" not in tp_hits_set and "tp1" not in manual_overrides_set and current_price <= trade_data[
-                            "tp1"]:
-                        tp_levels_hit.append("tp1")
-                    if "tp2" not in tp_hits_set and "tp2" not in manual_overrides_set and current_price <= trade_data[
-                            "tp2"]:
-                        tp_levels_hit.append("tp2")
-                    if "tp3" not in tp_hits_set and "tp3" not in manual_overrides_set and current_price <= trade_data[
-                            "tp3"]:
-                        tp_levels_hit.append("tp3")
-
-                # Process all TP hits found (in order: TP1, TP2, TP3)
-                if tp_levels_hit:
-                    # Rule 4: TP cannot hit after SL (this shouldn't happen in real-time, but safety check)
-                    # In real-time, if SL was hit, the trade would be closed, so this is just extra safety
-
-                    # Process all TP hits in the correct order
-                    for tp_level in ["tp1", "tp2", "tp3"]:
-                        if tp_level in tp_levels_hit:
-                            await self.handle_tp_hit(message_id, trade_data,
-                                                     tp_level)
-
-                            # If TP3 was hit, trade is completed and will be removed
-                            if tp_level == "tp3":
-                                return True
-
-                    return True
+            if levels_hit:
+                return True
 
             return False
 
@@ -3734,10 +6053,10 @@ class TradingBot(commands.Bot):
             )
             import traceback
             full_error = traceback.format_exc()
-            print(
+            tracking_logger.error(
                 f"❌ CRITICAL: Error checking price levels for {message_id}: {e}"
             )
-            print(f"Full traceback: {full_error}")
+            tracking_logger.error(f"Full traceback: {full_error}")
             # Return False but ensure this error is highly visible
             return False
 
@@ -3799,8 +6118,8 @@ class TradingBot(commands.Bot):
             )
             import traceback
             full_error = traceback.format_exc()
-            print(f"❌ CRITICAL: Error handling TP hit: {e}")
-            print(f"Full traceback: {full_error}")
+            tracking_logger.error(f"❌ CRITICAL: Error handling TP hit: {e}")
+            tracking_logger.error(f"Full traceback: {full_error}")
 
     async def handle_sl_hit(self,
                             message_id: str,
@@ -3818,7 +6137,7 @@ class TradingBot(commands.Bot):
                                             offline_hit)
 
         except Exception as e:
-            print(f"Error handling SL hit: {e}")
+            tracking_logger.error(f"Error handling SL hit: {e}")
 
     async def handle_breakeven_hit(self,
                                    message_id: str,
@@ -3836,16 +6155,20 @@ class TradingBot(commands.Bot):
                                                    offline_hit)
 
         except Exception as e:
-            print(f"Error handling breakeven hit: {e}")
+            tracking_logger.error(f"Error handling breakeven hit: {e}")
 
-    async def check_single_trade_immediately(self, message_id: str,
-                                             trade_data: Dict):
+    async def check_single_trade_immediately(
+            self,
+            message_id: str,
+            trade_data: Dict,
+            current_price: Optional[float] = None):
         """Check a single trade immediately for any TP/SL hits - used for immediate tracking after signal creation"""
         try:
             # Get current price to check if any levels were hit using API priority order
-            current_price = await self.get_live_price(
-                trade_data["pair"],
-                specific_api=trade_data.get("assigned_api"))
+            if current_price is None:
+                current_price = await self.get_live_price(
+                    trade_data["pair"],
+                    specific_api=trade_data.get("assigned_api"))
             if current_price is None:
                 # Try fallback if assigned API fails
                 current_price = await self.get_live_price(trade_data["pair"],
@@ -3926,7 +6249,7 @@ class TradingBot(commands.Bot):
             await self.debug_to_channel(
                 "IMMEDIATE CHECK", f"❌ Error during immediate check: {str(e)}",
                 "❌")
-            print(f"Immediate check error: {e}")
+            tracking_logger.error(f"Immediate check error: {e}")
 
     async def verify_trade_data_consistency(self, message_id: str,
                                             memory_trade_data: Dict) -> Dict:
@@ -3977,7 +6300,7 @@ class TradingBot(commands.Bot):
             await self.debug_to_channel(
                 "DATA SYNC ERROR",
                 f"❌ Error verifying trade data consistency: {str(e)}", "❌")
-            print(f"Data consistency check error: {e}")
+            tracking_logger.error(f"Data consistency check error: {e}")
             return memory_trade_data  # Return original data on error
 
     async def check_message_deleted(self, message_id: str,
@@ -3996,7 +6319,7 @@ class TradingBot(commands.Bot):
         except discord.Forbidden:
             return False  # No permission, but message exists
         except Exception as e:
-            print(f"Error checking message deletion: {e}")
+            tracking_logger.error(f"Error checking message deletion: {e}")
             return False  # Assume exists on error to avoid false removal
 
     async def check_limit_entry_hit(self, message_id: str,
@@ -4015,21 +6338,10 @@ class TradingBot(commands.Bot):
                 if current_price is None:
                     return False  # No price available, keep checking
 
-            action = trade_data["action"]
-            entry_price = trade_data["entry"]
-            entry_type = trade_data.get("entry_type", "").lower()
-
             # Check if entry has been hit based on order type
-            entry_hit = False
-            if "buy limit" in entry_type:
-                # Buy limit: price must drop to or below entry price
-                entry_hit = current_price <= entry_price
-            elif "sell limit" in entry_type:
-                # Sell limit: price must rise to or above entry price
-                entry_hit = current_price >= entry_price
-
-            if entry_hit:
+            if limit_entry_hit(trade_data, current_price):
                 # Entry has been hit! Send notification and switch to active tracking
+                trade_data["hit_detected_at"] = asyncio.get_running_loop().time()
                 await self.handle_limit_entry_hit(message_id, trade_data,
                                                   current_price)
                 return False  # Don't remove from tracking, continue with active monitoring
@@ -4037,7 +6349,7 @@ class TradingBot(commands.Bot):
             return False  # Entry not hit yet, keep monitoring
 
         except Exception as e:
-            print(f"Error checking limit entry hit: {e}")
+            tracking_logger.error(f"Error checking limit entry hit: {e}")
             return False
 
     async def handle_limit_entry_hit(self, message_id: str, trade_data: Dict,
@@ -4065,32 +6377,58 @@ class TradingBot(commands.Bot):
             # Update in database with new price levels
             await self.update_limit_trade_in_db(message_id, trade_data)
 
-            print(
+            tracking_logger.info(
                 f"✅ Limit entry hit for {trade_data['pair']} - switched to active tracking"
             )
 
         except Exception as e:
-            print(f"Error handling limit entry hit: {e}")
+            tracking_logger.error(f"Error handling limit entry hit: {e}")
+
+    async def reply_to_signal_group(self, message_id: str, trade_data: Dict,
+                                    notification: str):
+        """Queue replies to the tracked signal message and every message linked to it"""
+        # Set when the hit was detected, so latency covers detection to posted reply
+        detected_at = trade_data.pop("hit_detected_at", None)
+        if detected_at is None:
+            detected_at = asyncio.get_running_loop().time()
+        targets = [(trade_data.get("channel_id"), message_id)] + [
+            (link["channel_id"], link["message_id"])
+            for link in trade_data.get("linked_messages", [])
+        ]
+        for channel_id, target_id in targets:
+            if not channel_id:
+                continue
+            # A partial message is enough to reply to; no fetch_message round trip
+            target = self.get_partial_messageable(
+                int(channel_id)).get_partial_message(int(target_id))
+            future = self.notifications.submit(
+                int(channel_id),
+                lambda target=target: target.reply(notification),
+                NotificationDispatcher.ALERT,
+                f"{trade_data.get('pair', '')} {notification[:40]}",
+                detected_at)
+            future.add_done_callback(
+                lambda done, target_id=target_id: self.report_reply_result(
+                    done, target_id))
+
+    def report_reply_result(self, future, target_id):
+        if not future.cancelled() and future.exception():
+            tracking_logger.error(
+                f"Error replying to signal message {target_id}: {future.exception()}"
+            )
 
     async def send_entry_hit_notification(self, message_id: str,
                                           trade_data: Dict):
         """Send notification when limit entry gets hit"""
         try:
-            channel = self.get_channel(trade_data.get("channel_id"))
-            if not channel:
-                return
-
-            message = await channel.fetch_message(int(message_id))
-            if not message:
-                return
-
             action = trade_data["action"].lower()
             notification = f"@everyone our {action} limit has been hit ✅"
 
-            await message.reply(notification)
+            await self.reply_to_signal_group(message_id, trade_data,
+                                             notification)
 
         except Exception as e:
-            print(f"Error sending entry hit notification: {e}")
+            tracking_logger.error(f"Error sending entry hit notification: {e}")
 
     async def process_night_pause_hits(self):
         """Process all missed hits that occurred during night pause in chronological order with trading logic validation"""
@@ -4163,7 +6501,7 @@ class TradingBot(commands.Bot):
                             await asyncio.sleep(1)
 
                     except Exception as e:
-                        print(
+                        tracking_logger.error(
                             f"Error processing hits for trade {message_id}: {e}"
                         )
                         continue
@@ -4174,7 +6512,7 @@ class TradingBot(commands.Bot):
                     )
 
         except Exception as e:
-            print(f"Error processing night pause hits: {e}")
+            tracking_logger.error(f"Error processing night pause hits: {e}")
 
     def validate_chronological_hits(self, hits: List) -> List:
         """Validate hits chronologically according to trading rules"""
@@ -4261,9 +6599,6 @@ class TradingBot(commands.Bot):
                 "@everyone TP3 secured. That's the result of following the plan 💼💎"
             ]
 
-            message = await self.get_channel(trade_data.get("channel_id")
-                                             ).fetch_message(int(message_id))
-
             # Select random message based on TP level
             if tp_level == "tp1":
                 notification = random.choice(tp1_messages)
@@ -4275,10 +6610,11 @@ class TradingBot(commands.Bot):
                 # Fallback to original message
                 notification = f"@everyone **{tp_level.upper()} HAS BEEN HIT!** 🎯"
 
-            await message.reply(notification)
+            await self.reply_to_signal_group(message_id, trade_data,
+                                             notification)
 
         except Exception as e:
-            print(f"Error sending TP notification: {e}")
+            tracking_logger.error(f"Error sending TP notification: {e}")
 
     async def send_sl_notification(self,
                                    message_id: str,
@@ -4303,14 +6639,13 @@ class TradingBot(commands.Bot):
                 "@everyone SL triggered. Part of proper risk management. Next setup coming soon 💪⚡"
             ]
 
-            message = await self.get_channel(trade_data.get("channel_id")
-                                             ).fetch_message(int(message_id))
             notification = random.choice(sl_messages)
 
-            await message.reply(notification)
+            await self.reply_to_signal_group(message_id, trade_data,
+                                             notification)
 
         except Exception as e:
-            print(f"Error sending SL notification: {e}")
+            tracking_logger.error(f"Error sending SL notification: {e}")
 
     async def send_breakeven_notification(self,
                                           message_id: str,
@@ -4334,14 +6669,13 @@ class TradingBot(commands.Bot):
                 "@everyone Breakeven reached after TP2 hit. This is disciplined trading - we're out safe with profits secured 🧘‍♂️💸"
             ]
 
-            message = await self.get_channel(trade_data.get("channel_id")
-                                             ).fetch_message(int(message_id))
             notification = random.choice(breakeven_messages)
 
-            await message.reply(notification)
+            await self.reply_to_signal_group(message_id, trade_data,
+                                             notification)
 
         except Exception as e:
-            print(f"Error sending breakeven notification: {e}")
+            tracking_logger.error(f"Error sending breakeven notification: {e}")
 
     async def track_member_join_via_invite(self, member, invite_code):
         """Track a member joining via specific invite"""
@@ -4364,7 +6698,7 @@ class TradingBot(commands.Bot):
                     await self.save_invite_tracking()
 
         except Exception as e:
-            print(f"❌ Error tracking member join via invite: {str(e)}")
+            invites_logger.error(f"❌ Error tracking member join via invite: {str(e)}")
 
     async def track_member_leave(self, member):
         """Track a member leaving and update invite statistics"""
@@ -4402,7 +6736,7 @@ class TradingBot(commands.Bot):
                         await self.save_invite_tracking()
 
         except Exception as e:
-            print(f"❌ Error tracking member leave: {str(e)}")
+            invites_logger.error(f"❌ Error tracking member leave: {str(e)}")
 
     def _is_owner_safe(self, inviter_id):
         """Safe owner check that never raises exceptions"""
@@ -4480,7 +6814,7 @@ class TradingBot(commands.Bot):
 
         except Exception as e:
             error_reason = str(e)
-            print(f"❌ Error in security computation: {error_reason}")
+            autorole_logger.error(f"❌ Error in security computation: {error_reason}")
             # Keep defaults: is_owner_invite=False, is_suspicious=True for maximum security
 
         # 🛡️ SINGLE DECISION POINT: Block all suspicious accounts unless owner invited
@@ -4580,10 +6914,10 @@ class TradingBot(commands.Bot):
                 }
 
         except Exception as e:
-            print(f"❌ Error checking timedautorole eligibility: {str(e)}")
+            autorole_logger.error(f"❌ Error checking timedautorole eligibility: {str(e)}")
 
             # 🚨 EXCEPTION-SAFE: Database errors for non-suspicious accounts
-            print(f"❌ Database error in timedautorole check: {str(e)}")
+            autorole_logger.error(f"❌ Database error in timedautorole check: {str(e)}")
             return {
                 "allowed": True,
                 "reason":
@@ -4594,11 +6928,7 @@ class TradingBot(commands.Bot):
 
     def calculate_level(self, message_count):
         """Calculate user level based on message count"""
-        for level in sorted(LEVEL_SYSTEM["level_requirements"].keys(),
-                            reverse=True):
-            if message_count >= LEVEL_SYSTEM["level_requirements"][level]:
-                return level
-        return 0  # No level achieved yet
+        return calculate_level(message_count)
 
     async def handle_level_up(self, user, guild, old_level, new_level):
         """Handle level up - assign roles and send DM"""
@@ -4618,16 +6948,10 @@ class TradingBot(commands.Bot):
                         )
 
                         # Send congratulations DM
-                        try:
-                            dm_message = f"Congratulations! You've leveled up to level {new_level}!"
-                            await user.send(dm_message)
-                            await self.log_to_discord(
-                                f"📬 Sent level-up DM to {member.display_name} for Level {new_level}"
-                            )
-                        except discord.Forbidden:
-                            await self.log_to_discord(
-                                f"⚠️ Could not send level-up DM to {member.display_name} (DMs disabled)"
-                            )
+                        dm_message = f"Congratulations! You've leveled up to level {new_level}!"
+                        await self.enqueue_dm(user.id, dm_message,
+                                              f"level-up:{guild.id}:{user.id}:{new_level}",
+                                              "level-up", guild.id)
 
                     except discord.Forbidden:
                         await self.log_to_discord(
@@ -4655,376 +6979,729 @@ class TradingBot(commands.Bot):
         if message.author.bot or not message.guild:
             return
 
-        user_id = str(message.author.id)
-        guild_id = message.guild.id
-
-        # Initialize user data if not exists
-        if user_id not in LEVEL_SYSTEM["user_data"]:
-            LEVEL_SYSTEM["user_data"][user_id] = {
-                "message_count": 0,
-                "current_level": 0,
-                "guild_id": guild_id
-            }
-
-        # Increment message count
-        LEVEL_SYSTEM["user_data"][user_id]["message_count"] += 1
-        current_count = LEVEL_SYSTEM["user_data"][user_id]["message_count"]
-        old_level = LEVEL_SYSTEM["user_data"][user_id]["current_level"]
+        # Counters are per guild; a member's first message adds them to its store
+        levels = LEVEL_SYSTEM["user_data"].guild(message.guild.id)
+        slot = levels.increment(message.author.id)
+        message_count = levels.counts[slot]
+
+        # Persisted by the next state store flush
+        self.state_store.touch("user_levels",
+                               level_key(message.guild.id, message.author.id))
+        log_sampled(levels_logger, "User %s message count %d",
+                    message.author.id, message_count)
+
+        # Only recalculate once the next level's requirement is reached
+        old_level = levels.levels[slot]
+        next_requirement = LEVEL_SYSTEM["level_requirements"].get(old_level + 1)
+        if next_requirement is None or message_count < next_requirement:
+            return
 
-        # Calculate new level
-        new_level = self.calculate_level(current_count)
+        new_level = self.calculate_level(message_count)
 
         # Check if leveled up
         if new_level > old_level:
-            LEVEL_SYSTEM["user_data"][user_id]["current_level"] = new_level
+            levels.set_level(slot, new_level)
             await self.handle_level_up(message.author, message.guild,
                                        old_level, new_level)
 
-            # Save to database
-            await self.save_level_system()
+            # Persist without waiting for the next flush (still journaled offline)
+            if self.db_pool:
+                await self.state_store.flush(self.db_pool)
+            else:
+                await self.save_level_system()
+
+    # ===== JOB SCHEDULER =====
 
-    @tasks.loop(seconds=30)  # Check every 30 seconds for instant role removal
-    async def role_removal_task(self):
-        """Background task to remove expired roles and send DMs"""
-        if not AUTO_ROLE_CONFIG["enabled"] or not AUTO_ROLE_CONFIG[
-                "active_members"]:
+    def auto_role_jobs(self, member_id: str) -> List[dict]:
+        """The expiry job of an auto-role member, plus the Monday activation DM for weekend joiners"""
+        data = AUTO_ROLE_CONFIG["active_members"][member_id]
+        jobs = [
+            scheduled_job("role_expiry", f"role-expiry:{member_id}",
+                          data.expires_at(), int(member_id), data.guild_id)
+        ]
+        if data.weekend_delayed and not data.monday_notification_sent:
+            jobs.append(
+                scheduled_job(
+                    "monday_activation", f"monday-activation:{member_id}",
+                    self.get_next_monday_activation_time(
+                        data.role_added_time), int(member_id),
+                    data.guild_id))
+        return jobs
+
+    async def schedule_auto_role_jobs(self, member_id: str):
+        for job in self.auto_role_jobs(member_id):
+            await self.schedule_job(job)
+
+    async def schedule_job(self, job: dict, conn=None):
+        """Create a job, or move an existing job with the same key to its new due time.
+        Pass `conn` when the caller already holds a connection."""
+        self.job_metrics["scheduled"] += 1
+        if not self.db_pool:
+            self.local_jobs[job["job_key"]] = job
+            self.job_heap.schedule(job["job_key"], job["due_at"])
             return
 
-        current_time = datetime.now(AMSTERDAM_TZ)
-        expired_members = []
+        try:
+            async with nullcontext(conn) if conn else self.db_pool.acquire() as conn:
+                await conn.execute(
+                    '''
+                    INSERT INTO scheduled_jobs (job_key, kind, member_id, guild_id, payload, due_at)
+                    VALUES ($1, $2, $3, $4, $5::jsonb, $6)
+                    ON CONFLICT (job_key) DO UPDATE SET
+                        kind = EXCLUDED.kind,
+                        member_id = EXCLUDED.member_id,
+                        guild_id = EXCLUDED.guild_id,
+                        payload = EXCLUDED.payload,
+                        due_at = EXCLUDED.due_at,
+                        status = 'pending',
+                        attempts = 0,
+                        last_error = NULL,
+                        completed_at = NULL
+                ''', job["job_key"], job["kind"], job["member_id"],
+                    job["guild_id"], json.dumps(job["payload"]), job["due_at"])
+            if self.next_job_due is None or job["due_at"] < self.next_job_due:
+                # Due before what the scheduler is sleeping towards - wake it
+                self.next_job_due = job["due_at"]
+                self.job_heap.changed.set()
+        except Exception:
+            core_logger.exception(f"❌ Error scheduling {job['kind']} job {job['job_key']}")
 
-        for member_id, data in AUTO_ROLE_CONFIG["active_members"].items():
-            try:
-                # Handle weekend delayed members with custom expiry time
-                if data.get("weekend_delayed",
-                            False) and "expiry_time" in data:
-                    # Weekend joiners have specific expiry time (Monday 23:59)
-                    expiry_time = datetime.fromisoformat(data["expiry_time"])
-                    if expiry_time.tzinfo is None:
-                        if PYTZ_AVAILABLE:
-                            expiry_time = AMSTERDAM_TZ.localize(expiry_time)
-                        else:
-                            expiry_time = expiry_time.replace(
-                                tzinfo=AMSTERDAM_TZ)
-                    else:
-                        expiry_time = expiry_time.astimezone(AMSTERDAM_TZ)
-                else:
-                    # Normal members - 72 hours (3 days) from role_added_time
-                    role_added_time = datetime.fromisoformat(
-                        data["role_added_time"])
-                    if role_added_time.tzinfo is None:
-                        if PYTZ_AVAILABLE:
-                            role_added_time = AMSTERDAM_TZ.localize(
-                                role_added_time)
-                        else:
-                            role_added_time = role_added_time.replace(
-                                tzinfo=AMSTERDAM_TZ)
-                    else:
-                        role_added_time = role_added_time.astimezone(
-                            AMSTERDAM_TZ)
+    async def store_jobs(self, jobs: List[dict]):
+        """Add jobs whose keys are not scheduled yet; existing jobs keep their state"""
+        if not self.db_pool:
+            for job in jobs:
+                if job["job_key"] not in self.local_jobs:
+                    self.local_jobs[job["job_key"]] = job
+                    self.job_heap.schedule(job["job_key"], job["due_at"])
+            return
+
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.executemany(
+                    '''
+                    INSERT INTO scheduled_jobs (job_key, kind, member_id, guild_id, payload, due_at)
+                    VALUES ($1, $2, $3, $4, $5::jsonb, $6)
+                    ON CONFLICT (job_key) DO NOTHING
+                ''', [(job["job_key"], job["kind"], job["member_id"],
+                       job["guild_id"], json.dumps(job["payload"]),
+                       job["due_at"]) for job in jobs])
+            self.job_heap.changed.set()
+        except Exception:
+            core_logger.exception("❌ Error storing scheduled jobs")
 
-                    expiry_time = role_added_time + timedelta(hours=72)
+    async def seed_scheduled_jobs(self):
+        """Derive the jobs the auto-role state needs, for members tracked before the job
+        table existed and for the local heap after a restart without PostgreSQL"""
+        now = datetime.now(AMSTERDAM_TZ)
+        jobs = [
+            scheduled_job("maintenance", "maintenance", now + timedelta(hours=1)),
+            scheduled_job("followup_dms", "followup-dms", now)
+        ]
+        for member_id in AUTO_ROLE_CONFIG["active_members"]:
+            jobs.extend(self.auto_role_jobs(member_id))
+        for member_id, data in AUTO_ROLE_CONFIG["weekend_pending"].items():
+            jobs.append(
+                scheduled_job(
+                    "monday_activation", f"monday-activation:{member_id}",
+                    self.get_next_monday_activation_time(data.join_time),
+                    int(member_id), data.guild_id))
+        await self.store_jobs(jobs)
+
+    async def wait_for_due_job(self):
+        """Sleep until the earliest pending job is due, a sooner job is scheduled,
+        or max_sleep_seconds pass"""
+        self.job_heap.changed.clear()
+        if self.db_pool:
+            async with self.db_pool.acquire() as conn:
+                self.next_job_due = await conn.fetchval(
+                    "SELECT MIN(due_at) FROM scheduled_jobs WHERE status = 'pending'")
+        else:
+            self.next_job_due = self.job_heap.next_expiry()
+
+        timeout = JOB_SCHEDULER_CONFIG["max_sleep_seconds"]
+        if self.next_job_due is not None:
+            timeout = min(
+                (self.next_job_due - datetime.now(timezone.utc)).total_seconds(),
+                timeout)
+        if timeout <= 0:
+            return
+        try:
+            await asyncio.wait_for(self.job_heap.changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
 
-                if current_time >= expiry_time:
-                    expired_members.append(member_id)
+    async def claim_due_jobs(self) -> List[dict]:
+        """Take a batch of due jobs; concurrent schedulers skip each other's rows"""
+        if not self.db_pool:
+            due_keys = self.job_heap.pop_due(datetime.now(timezone.utc))
+            jobs = [self.local_jobs.pop(key) for key in due_keys]
+            for job in jobs:
+                job["attempts"] += 1
+            return jobs
+
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                '''
+                UPDATE scheduled_jobs SET status = 'running', attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM scheduled_jobs
+                    WHERE status = 'pending' AND due_at <= NOW()
+                    ORDER BY due_at
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, job_key, kind, member_id, guild_id,
+                          payload::text AS payload, due_at, attempts
+            ''', JOB_SCHEDULER_CONFIG["batch_size"])
+        return [
+            dict(row, payload=json.loads(row['payload'] or "{}"))
+            for row in sorted(rows, key=lambda row: row['due_at'])
+        ]
 
-            except Exception as e:
-                print(f"❌ Error processing member {member_id}: {str(e)}")
-                expired_members.append(member_id)  # Remove corrupted entries
+    def job_outcome(self,
+                    job: dict,
+                    started: datetime,
+                    next_due: Optional[datetime] = None,
+                    error: Optional[str] = None) -> tuple:
+        """(job, status, error, lateness_ms, next_due) for a finished run; updates the metrics"""
+        lateness_ms = max((started - job["due_at"]).total_seconds() * 1000, 0)
+        status = "done"
+        if error:
+            if job["attempts"] >= JOB_SCHEDULER_CONFIG["max_attempts"]:
+                status = "failed"
+            else:
+                next_due = started + timedelta(seconds=min(
+                    JOB_SCHEDULER_CONFIG["backoff_base_seconds"] *
+                    2**(job["attempts"] - 1),
+                    JOB_SCHEDULER_CONFIG["backoff_max_seconds"]))
+        if status == "done" and next_due is not None:
+            status = "pending"
+
+        self.job_lateness.append((job["kind"], lateness_ms))
+        if error and status == "pending":
+            self.job_metrics["retried"] += 1
+        elif status == "failed":
+            self.job_metrics["failed"] += 1
+        else:
+            self.job_metrics["completed"] += 1
+        return job, status, error, lateness_ms, next_due
+
+    async def record_job_results(self, outcomes: List[tuple], conn=None):
+        """Store finished runs: local jobs go back on the heap, table rows are updated
+        in one statement. Pass `conn` to join the caller's transaction."""
+        rows = []
+        for job, status, error, lateness_ms, next_due in outcomes:
+            if error:
+                await self.log_to_discord(
+                    f"⚠️ {job['kind']} job {job['job_key']} failed "
+                    f"(attempt {job['attempts']}, {status}): {error}")
+            if self.db_pool and "id" in job:
+                rows.append((job["id"], status, error, lateness_ms, next_due))
+            elif status == "pending":
+                job.update(due_at=next_due, attempts=job["attempts"] if error else 0)
+                self.local_jobs[job["job_key"]] = job
+                self.job_heap.schedule(job["job_key"], next_due)
+        if not rows:
+            return
 
-        # Process expired members
-        for member_id in expired_members:
-            await self.remove_expired_role(member_id)
+        async with nullcontext(conn) if conn else self.db_pool.acquire() as conn:
+            # A job rescheduled while it ran is pending again and keeps its new due time
+            await conn.executemany(
+                '''
+                UPDATE scheduled_jobs
+                SET status = $2,
+                    last_error = $3,
+                    lateness_ms = $4,
+                    due_at = COALESCE($5, due_at),
+                    attempts = CASE WHEN $3 IS NULL THEN 0 ELSE attempts END,
+                    completed_at = CASE WHEN $2 = 'pending' THEN NULL ELSE NOW() END
+                WHERE id = $1 AND status = 'running'
+            ''', rows)
+
+    async def run_job(self, job: dict):
+        """Run one claimed job, then record its lateness and outcome"""
+        started = datetime.now(timezone.utc)
+        next_due, error = None, None
+        try:
+            # A handler returns a datetime to run again later, None when finished
+            next_due = await self.job_handlers[job["kind"]](job)
+        except Exception as e:
+            error = str(e)[:500]
+        try:
+            await self.record_job_results(
+                [self.job_outcome(job, started, next_due, error)])
+        except Exception:
+            core_logger.exception(f"❌ Error updating job {job['job_key']}")
 
-        # Save updated config if there were changes
-        if expired_members:
-            await self.save_auto_role_config()
+    @tasks.loop(seconds=0)
+    async def job_scheduler_task(self):
+        """Run due jobs in batches; sleeps until the earliest due job instead of polling"""
+        try:
+            if self.db_pool and self.local_jobs:
+                # PostgreSQL is back - move the jobs held locally into the table
+                jobs = list(self.local_jobs.values())
+                self.local_jobs.clear()
+                self.job_heap.rebuild_from({})
+                await self.store_jobs(jobs)
+
+            await self.wait_for_due_job()
+            batches = {}
+            for job in await self.claim_due_jobs():
+                if job["kind"] in self.job_batch_handlers:
+                    batches.setdefault(job["kind"], []).append(job)
+                else:
+                    await self.run_job(job)
+            for kind, jobs in batches.items():
+                await self.job_batch_handlers[kind](jobs)
+        except Exception:
+            core_logger.exception("❌ Job scheduler error")
+            await asyncio.sleep(5)
+
+    async def get_job_metrics(self):
+        """Job outcomes, lateness per kind and the pending backlog"""
+        lateness = {}
+        for kind, lateness_ms in self.job_lateness:
+            lateness.setdefault(kind, []).append(lateness_ms)
+        metrics = {
+            **self.job_metrics,
+            "next_due":
+            self.next_job_due.isoformat() if self.next_job_due else None,
+            "lateness_ms": {
+                kind: {
+                    "runs": len(values),
+                    "avg": round(sum(values) / len(values), 1),
+                    "p95": round(sorted(values)[int(len(values) * 0.95)], 1),
+                    "max": round(max(values), 1)
+                }
+                for kind, values in lateness.items()
+            },
+            "role_expiry": {
+                **self.role_expiry_metrics, "burst": self.role_expiry_burst
+            }
+        }
+        if not self.db_pool:
+            metrics["local_jobs"] = len(self.local_jobs)
+            return metrics
+        try:
+            async with self.db_pool.acquire() as conn:
+                rows = await conn.fetch('''
+                    SELECT kind, status, COUNT(*) AS count,
+                           COUNT(*) FILTER (WHERE due_at <= NOW()) AS due
+                    FROM scheduled_jobs GROUP BY kind, status
+                ''')
+            backlog = {}
+            for row in rows:
+                backlog.setdefault(row['kind'], {})[row['status']] = row['count']
+            metrics.update(backlog=backlog,
+                           due=sum(row['due'] for row in rows
+                                   if row['status'] == 'pending'))
+        except Exception as e:
+            metrics["error"] = str(e)
+        return metrics
 
-    @tasks.loop(
-        minutes=1)  # Check every minute for Monday activation notifications
-    async def weekend_activation_task(self):
-        """Background task to send Monday activation DMs for weekend joiners"""
-        if not AUTO_ROLE_CONFIG["enabled"] or not AUTO_ROLE_CONFIG[
-                "weekend_pending"]:
+    async def cleanup_scheduled_jobs(self):
+        """Drop finished jobs and old welcome DM rows past the retention window"""
+        if not self.db_pool:
             return
+        try:
+            async with self.db_pool.acquire() as conn:
+                await conn.execute(
+                    '''
+                    DELETE FROM scheduled_jobs
+                    WHERE status IN ('done', 'failed')
+                      AND completed_at < NOW() - make_interval(days => $1)
+                ''', JOB_SCHEDULER_CONFIG["retention_days"])
+                await conn.execute('''
+                    DELETE FROM pending_welcome_dms
+                    WHERE sent = TRUE AND created_at < NOW() - INTERVAL '7 days'
+                ''')
+        except Exception as e:
+            core_logger.warning(f"❌ Error cleaning up scheduled jobs: {str(e)}")
 
-        current_time = datetime.now(AMSTERDAM_TZ)
-        activation_time = self.get_next_monday_activation_time()
+    def auto_role_paused(self) -> Optional[datetime]:
+        """Retry time for auto-role jobs while the system is disabled, else None"""
+        if AUTO_ROLE_CONFIG["enabled"]:
+            return None
+        return datetime.now(timezone.utc) + timedelta(
+            seconds=JOB_SCHEDULER_CONFIG["paused_retry_seconds"])
+
+    async def wait_for_role_edit_slot(self):
+        """Space role edits evenly across all expiry workers"""
+        loop = asyncio.get_running_loop()
+        slot = max(loop.time(), self.role_edit_next_at)
+        self.role_edit_next_at = slot + 1 / ROLE_EXPIRY_CONFIG["edits_per_second"]
+        await asyncio.sleep(slot - loop.time())
+
+    async def run_role_expiry_batch(self, jobs: List[dict]):
+        """Remove a batch of expired auto-roles: role edits run concurrently at the paced
+        rate, then the DMs, member state and job results are committed together"""
+        started = datetime.now(timezone.utc)
+        paused = self.auto_role_paused()
+        outcomes, due = [], deque()
+        for job in jobs:
+            data = AUTO_ROLE_CONFIG["active_members"].get(str(job["member_id"]))
+            if data is None:
+                outcomes.append(self.job_outcome(job, started))
+            elif paused:
+                # Nothing is removed while the system is disabled
+                outcomes.append(self.job_outcome(job, started, paused))
+            elif data.expires_at() > started:
+                outcomes.append(
+                    self.job_outcome(job, started, data.expires_at()))
+            else:
+                due.append(job)
+        if not due:
+            await self.commit_role_expiry_batch([], outcomes)
+            return
 
-        # Check if it's past Monday 00:01 and send activation notifications
-        if current_time >= activation_time:
-            pending_members = list(AUTO_ROLE_CONFIG["weekend_pending"].keys())
+        dms, expired, failed = [], [], 0
 
-            for member_id in pending_members:
+        async def worker():
+            nonlocal failed
+            while due:
+                job = due.popleft()
+                member_id = str(job["member_id"])
+                error = None
                 try:
-                    data = AUTO_ROLE_CONFIG["weekend_pending"][member_id]
-                    guild = self.get_guild(data["guild_id"])
-                    if guild:
-                        member = guild.get_member(int(member_id))
-                        if member:
-                            activation_message = (
-                                "Hey! The weekend is over, so the trading markets have been opened again. "
-                                "That means your 3-day welcome gift has officially started. "
-                                "You now have full access to the premium channel. "
-                                "Let's make the most of it by securing some wins together!"
-                            )
-                            await member.send(activation_message)
-                            print(
-                                f"✅ Sent Monday activation DM to {member.display_name}"
-                            )
-
-                            # Mark as processed and remove from weekend_pending
-                            del AUTO_ROLE_CONFIG["weekend_pending"][member_id]
-                            await self.save_auto_role_config()
+                    dm = await self.remove_expired_role(member_id)
+                    if dm:
+                        dms.append(dm)
+                    expired.append(member_id)
                 except Exception as e:
-                    await self.log_to_discord(
-                        f"❌ Error processing Monday activation for member {member_id}: {str(e)}"
-                    )
-
-    @tasks.loop(minutes=30)  # Check every hour for follow-up DM sending
-    async def followup_dm_task(self):
-        """Background task to send follow-up DMs after 3, 7, and 14 days"""
-        if not AUTO_ROLE_CONFIG["dm_schedule"]:
+                    error = str(e)[:500]
+                    failed += 1
+                for name in ("active_members", "role_history", "dm_schedule"):
+                    self.state_store.touch(name, member_id)
+                outcomes.append(self.job_outcome(job, started, error=error))
+
+        batch_size = len(due)
+        await asyncio.gather(*[
+            worker()
+            for _ in range(min(ROLE_EXPIRY_CONFIG["concurrency"], batch_size))
+        ])
+        elapsed = (datetime.now(timezone.utc) - started).total_seconds()
+
+        commit_started = asyncio.get_running_loop().time()
+        await self.commit_role_expiry_batch(dms, outcomes)
+        self.role_expiry_metrics.update(
+            batches=self.role_expiry_metrics["batches"] + 1,
+            expired=self.role_expiry_metrics["expired"] + len(expired),
+            last_batch_size=batch_size,
+            last_batch_seconds=round(elapsed, 2),
+            last_commit_ms=round(
+                (asyncio.get_running_loop().time() - commit_started) * 1000, 2))
+        await self.report_role_expiry_progress(started, expired, failed)
+
+    async def commit_role_expiry_batch(self, dms: List[tuple],
+                                       outcomes: List[tuple]):
+        """Queue the expiration DMs, finish the jobs and write the member state in one transaction"""
+        if not self.db_pool:
+            await self.save_auto_role_config()
+            for dm in dms:
+                await self.enqueue_dm(*dm)
+            await self.record_job_results(outcomes)
             return
 
-        current_time = datetime.now(AMSTERDAM_TZ)
-        messages_to_send = []
-
-        # Define the follow-up messages
-        dm_messages = {
-            3:
-            "Hey! It's been 3 days since your **3-day free access to the Premium Signals channel** ended. We hope you were able to catch good trades with us during that time.\n\nAs you've probably seen, the **free signals channel only gets about 1 signal a day**, while inside **Gold Pioneers**, members receive **8–10 high-quality signals every single day in <#1350929852299214999>**. That means way more chances to profit and grow consistently.\n\nWe'd love to **invite you back to Premium Signals** so you don't miss out on more solid opportunities.\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer>",
-            7:
-            "It's been a week since your Premium Signals trial ended. Since then, our **Gold Pioneers  have been catching trade setups daily in <#1350929852299214999>**.\n\nIf you found value in just 3 days, imagine the results you could be seeing by now with full access. It's all about **consistency and staying plugged into the right information**.\n\nWe'd like to **personally invite you to rejoin Premium Signals** and get back into the rhythm.\n\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer>",
-            14:
-            "Hey! It's been two weeks since your access to Premium Signals ended. We hope you've stayed active. \n\nIf you've been trading solo or passively following the free channel, you might be feeling the difference. in <#1350929852299214999>, it's not just about more signals. It's about the **structure, support, and smarter decision-making**. That edge can make all the difference over time.\n\nWe'd love to **officially invite you back into Premium Signals** and help you start compounding results again.\n\n**Feel free to join us again through this link:** <https://whop.com/gold-pioneer>"
-        }
-
-        for member_id, schedule_data in AUTO_ROLE_CONFIG["dm_schedule"].items(
-        ):
+        try:
+            async with self.db_pool.acquire() as conn, conn.transaction():
+                await self.enqueue_dms(dms, conn)
+                await self.record_job_results(outcomes, conn)
+                # Last, so a failure above leaves the state changes pending for the next flush
+                await self.state_store.flush(self.db_pool, conn)
+        except Exception:
+            autorole_logger.exception("❌ Error committing role expiry batch")
+            # The roles are already gone - write each part on its own instead
+            for dm in dms:
+                await self.enqueue_dm(*dm)
+            await self.state_store.flush(self.db_pool)
             try:
-                expiry_time = datetime.fromisoformat(
-                    schedule_data["role_expired"])
-                if expiry_time.tzinfo is None:
-                    expiry_time = expiry_time.replace(tzinfo=AMSTERDAM_TZ)
-                else:
-                    expiry_time = expiry_time.astimezone(AMSTERDAM_TZ)
-
-                # Check for each follow-up period
-                for days, message in dm_messages.items():
-                    sent_key = f"dm_{days}_sent"
-
-                    if not schedule_data.get(sent_key, False):
-                        time_diff = current_time - expiry_time
-
-                        if time_diff >= timedelta(days=days):
-                            messages_to_send.append({
-                                'member_id':
-                                member_id,
-                                'guild_id':
-                                schedule_data['guild_id'],
-                                'message':
-                                message,
-                                'days':
-                                days,
-                                'sent_key':
-                                sent_key
-                            })
+                await self.record_job_results(outcomes)
+            except Exception:
+                autorole_logger.exception("❌ Error updating role expiry jobs")
 
-            except Exception as e:
-                await self.log_to_discord(
-                    f"❌ Error processing DM schedule for member {member_id}: {str(e)}"
-                )
+    async def count_due_jobs(self, kind: str) -> int:
+        """Pending jobs of one kind that are already due"""
+        now = datetime.now(timezone.utc)
+        if not self.db_pool:
+            return sum(1 for job in self.local_jobs.values()
+                       if job["kind"] == kind and job["due_at"] <= now)
+        try:
+            async with self.db_pool.acquire() as conn:
+                return await conn.fetchval(
+                    '''
+                    SELECT COUNT(*) FROM scheduled_jobs
+                    WHERE status = 'pending' AND kind = $1 AND due_at <= $2
+                ''', kind, now)
+        except Exception as e:
+            autorole_logger.warning(f"❌ Error counting due {kind} jobs: {str(e)}")
+            return 0
+
+    async def report_role_expiry_progress(self, started: datetime,
+                                          expired: List[str], failed: int):
+        """Log a burst's progress, with the expiries still due and an ETA at the current pace"""
+        now = datetime.now(timezone.utc)
+        remaining = await self.count_due_jobs("role_expiry")
+        burst = self.role_expiry_burst or {
+            "started_at": started.isoformat(),
+            "expired": 0,
+            "failed": 0
+        }
+        burst["expired"] += len(expired)
+        burst["failed"] += failed
+        elapsed = max(
+            (now - datetime.fromisoformat(burst["started_at"])).total_seconds(),
+            0.001)
+        per_second = burst["expired"] / elapsed
+        # Short first batches overstate the rate; the pace is the ceiling
+        pace = min(per_second or math.inf, ROLE_EXPIRY_CONFIG["edits_per_second"])
+        burst.update(remaining=remaining,
+                     per_second=round(per_second, 2),
+                     eta_seconds=round(remaining / pace))
+
+        if remaining:
+            self.role_expiry_burst = burst
+            await self.log_to_discord(
+                f"⏳ Auto-role expiry: {burst['expired']} removed so far ({burst['failed']} failed), "
+                f"{remaining} still due • {burst['per_second']}/s, about {burst['eta_seconds']}s left"
+            )
+            return
 
-        # Send the messages
-        for msg_data in messages_to_send:
-            try:
-                guild = self.get_guild(msg_data['guild_id'])
-                if not guild:
-                    continue
+        self.role_expiry_burst = None
+        if burst["expired"] + burst["failed"] == 1 and expired:
+            await self.log_to_discord(
+                f"✅ Removed expired auto-role from <@{expired[0]}>")
+        elif burst["expired"] + burst["failed"]:
+            await self.log_to_discord(
+                f"✅ Auto-role expiry finished: {burst['expired']} removed ({burst['failed']} failed) "
+                f"in {elapsed:.0f}s • {burst['per_second']}/s")
 
-                member = guild.get_member(int(msg_data['member_id']))
-                if not member:
-                    continue
+    async def run_monday_activation_job(self, job):
+        """Tell a weekend joiner their trial has started now the markets are open"""
+        member_id = str(job["member_id"])
+        data = AUTO_ROLE_CONFIG["active_members"].get(member_id)
+        pending = AUTO_ROLE_CONFIG["weekend_pending"].get(member_id)
+        if (data is None or data.monday_notification_sent) and pending is None:
+            return None
+        paused = self.auto_role_paused()
+        if paused:
+            return paused
+
+        guild = self.get_guild(job["guild_id"])
+        member = guild.get_member(job["member_id"]) if guild else None
+        if member and not (data and data.monday_notification_sent):
+            # Raise before touching state, so the job is retried
+            if not await self.enqueue_dm(member.id, MONDAY_ACTIVATION_MESSAGE,
+                                         f"monday-activation:{member_id}",
+                                         "Monday activation", guild.id):
+                raise RuntimeError("Monday activation DM could not be queued")
+            autorole_logger.info(
+                f"📤 Queued Monday activation DM for {member.display_name}")
+
+        if data:
+            data.monday_notification_sent = True
+        AUTO_ROLE_CONFIG["weekend_pending"].pop(member_id, None)
+        await self.save_auto_role_config()
+        return None
 
-                # Check if member has Gold Pioneer role - if so, skip the DM
-                gold_pioneer_role = guild.get_role(GOLD_PIONEER_ROLE_ID)
-                if gold_pioneer_role and gold_pioneer_role in member.roles:
-                    await self.log_to_discord(
-                        f"⏭️ Skipping {msg_data['days']}-day DM for {member.display_name} - already has Gold Pioneer role"
-                    )
-                    # Mark as sent even though we skipped it
-                    AUTO_ROLE_CONFIG["dm_schedule"][msg_data['member_id']][
-                        msg_data['sent_key']] = True
-                    continue
+    async def run_welcome_dm_job(self, job):
+        """Queue the delayed welcome DM for a new member"""
+        member_id = job["member_id"]
+        guild = self.get_guild(job["guild_id"])
+        if not guild:
+            return None
 
-                # Send the follow-up DM
-                await member.send(msg_data['message'])
+        member = guild.get_member(member_id)
+        if not member:
+            try:
+                member = await guild.fetch_member(member_id)
+            except (discord.NotFound, discord.HTTPException):
                 await self.log_to_discord(
-                    f"📬 Sent {msg_data['days']}-day follow-up DM to {member.display_name}"
+                    f"⚠️ Could not send welcome DM to member ID {member_id} (member left or not found)"
                 )
+                return None
 
-                # Mark as sent
-                AUTO_ROLE_CONFIG["dm_schedule"][msg_data['member_id']][
-                    msg_data['sent_key']] = True
+        # Queue the welcome DM; the outbox paces and retries the send
+        if not await self.enqueue_dm(
+                member_id, WELCOME_DM_MESSAGE,
+                f"welcome-dm:{member_id}:{job['due_at'].isoformat()}",
+                "welcome", guild.id):
+            raise RuntimeError("welcome DM could not be queued")
+        await self.log_to_discord(
+            f"📤 Queued welcome DM for {member.display_name} (ID: {member_id})")
+        return None
 
-            except discord.Forbidden:
+    async def fetch_due_followups(self, now) -> List[str]:
+        """Member IDs whose next follow-up DM is due, oldest first"""
+        limit = JOB_SCHEDULER_CONFIG["followup_batch_size"]
+        if not self.db_pool:
+            due = sorted((data.next_due_at, member_id) for member_id, data in
+                         AUTO_ROLE_CONFIG["dm_schedule"].items()
+                         if data.next_due_at and data.next_due_at <= now)
+            return [member_id for _, member_id in due[:limit]]
+
+        # Schedules created since the last flush must be in the table before querying it
+        await self.state_store.flush(self.db_pool)
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                '''
+                SELECT member_id FROM dm_schedule
+                WHERE next_due_at <= $1
+                ORDER BY next_due_at
+                LIMIT $2
+            ''', now, limit)
+        return [str(row['member_id']) for row in rows]
+
+    async def next_followup_due(self) -> Optional[datetime]:
+        if not self.db_pool:
+            return min((data.next_due_at
+                        for data in AUTO_ROLE_CONFIG["dm_schedule"].values()
+                        if data.next_due_at),
+                       default=None)
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetchval(
+                'SELECT MIN(next_due_at) FROM dm_schedule')
+
+    async def get_followup_stage_counts(self) -> Dict[Optional[int], int]:
+        """Members per next follow-up stage; None counts finished sequences"""
+        if not self.db_pool:
+            counts = {}
+            for data in AUTO_ROLE_CONFIG["dm_schedule"].values():
+                counts[data.next_stage] = counts.get(data.next_stage, 0) + 1
+            return counts
+
+        await self.state_store.flush(self.db_pool)
+        async with self.db_pool.acquire() as conn:
+            rows = await conn.fetch('''
+                SELECT next_stage, COUNT(*) AS count
+                FROM dm_schedule GROUP BY next_stage
+            ''')
+        return {row['next_stage']: row['count'] for row in rows}
+
+    async def run_followup_dms_job(self, job):
+        """Send the 3, 7 and 14 day follow-ups that are due, advancing each member one stage"""
+        now = datetime.now(timezone.utc)
+        due_members = await self.fetch_due_followups(now)
+
+        advanced = 0
+        for member_id in due_members:
+            schedule_data = AUTO_ROLE_CONFIG["dm_schedule"].get(member_id)
+            if (schedule_data is None or schedule_data.next_due_at is None
+                    or schedule_data.next_due_at > now):
+                continue
+            days = schedule_data.next_stage
+
+            guild = self.get_guild(schedule_data.guild_id)
+            member = guild.get_member(int(member_id)) if guild else None
+            gold_pioneer_role = guild.get_role(
+                GOLD_PIONEER_ROLE_ID) if guild else None
+            if member and gold_pioneer_role and gold_pioneer_role in member.roles:
                 await self.log_to_discord(
-                    f"⚠️ Could not send {msg_data['days']}-day follow-up DM to member {msg_data['member_id']} (DMs disabled)"
+                    f"⏭️ Skipping {days}-day DM for {member.display_name} - already has Gold Pioneer role"
                 )
-                # Mark as sent to avoid retrying when DMs are disabled
-                AUTO_ROLE_CONFIG["dm_schedule"][msg_data['member_id']][
-                    msg_data['sent_key']] = True
-            except Exception as e:
-                # For other errors, implement retry logic
-                retry_count = AUTO_ROLE_CONFIG["dm_schedule"][
-                    msg_data['member_id']].get(
-                        f"dm_{msg_data['days']}_retry_count", 0)
-                max_retries = 3
-
-                if retry_count < max_retries:
-                    # Increment retry count and try again later
-                    AUTO_ROLE_CONFIG["dm_schedule"][msg_data['member_id']][
-                        f"dm_{msg_data['days']}_retry_count"] = retry_count + 1
-                    await self.log_to_discord(
-                        f"🔄 DM retry {retry_count + 1}/{max_retries} for {msg_data['days']}-day message to member {msg_data['member_id']}: {str(e)}"
-                    )
-                else:
-                    # Max retries reached, mark as sent to stop trying
-                    AUTO_ROLE_CONFIG["dm_schedule"][msg_data['member_id']][
-                        msg_data['sent_key']] = True
-                    await self.log_to_discord(
-                        f"❌ Failed to send {msg_data['days']}-day DM to member {msg_data['member_id']} after {max_retries} retries: {str(e)}"
-                    )
-
-        # Save config if any changes were made
-        if messages_to_send:
-            await self.save_auto_role_config()
-
-    @tasks.loop(minutes=1)  # Check every minute for real-time DM sending
-    async def monday_activation_task(self):
-        """Background task to send Monday activation DMs for weekend joiners"""
-        if not AUTO_ROLE_CONFIG["enabled"] or not AUTO_ROLE_CONFIG[
-                "active_members"]:
-            return
-
-        current_time = datetime.now(AMSTERDAM_TZ)
-        weekday = current_time.weekday()  # Monday=0
-        hour = current_time.hour
-
-        # Only run on Monday between 00:00 and 01:00 to send activation messages
-        if weekday != 0 or hour > 1:
-            return
-
-        for member_id, data in AUTO_ROLE_CONFIG["active_members"].items():
-            try:
-                # Only process weekend delayed members who haven't been notified yet
-                if (data.get("weekend_delayed", False)
-                        and not data.get("monday_notification_sent", False)):
-
-                    guild = self.get_guild(data["guild_id"])
-                    if guild:
-                        member = guild.get_member(int(member_id))
-                        if member:
-                            try:
-                                activation_message = (
-                                    "Hey! The weekend is over, so the trading markets have been opened again. "
-                                    "That means your 3-day welcome gift has officially started. "
-                                    "You now have full access to the premium channel. "
-                                    "Let's make the most of it by securing some wins together!"
-                                )
-                                await member.send(activation_message)
-                                print(
-                                    f"✅ Sent Monday activation DM to {member.display_name}"
-                                )
-
-                                # Mark as notified to avoid duplicate messages
-                                AUTO_ROLE_CONFIG["active_members"][member_id][
-                                    "monday_notification_sent"] = True
-                                await self.save_auto_role_config()
-
-                            except discord.Forbidden:
-                                print(
-                                    f"⚠️ Could not send Monday activation DM to {member.display_name} (DMs disabled)"
-                                )
-                            except Exception as e:
-                                print(
-                                    f"❌ Error sending Monday activation DM to {member.display_name}: {str(e)}"
-                                )
-
-            except Exception as e:
-                print(
-                    f"❌ Error processing Monday activation for member {member_id}: {str(e)}"
+            elif member:
+                # Queue the follow-up DM; the outbox handles retries and DMs being disabled
+                if not await self.enqueue_dm(
+                        member.id, FOLLOWUP_DM_MESSAGES[days],
+                        f"followup-{days}:{member_id}",
+                        f"{days}-day follow-up", guild.id):
+                    continue  # still due, retried on the next run
+                await self.log_to_discord(
+                    f"📬 Queued {days}-day follow-up DM for {member.display_name}"
                 )
 
-    async def remove_expired_role(self, member_id):
-        """Remove expired role from member and send DM"""
+            # Skipped members (Gold Pioneers, or gone from the server) move on too
+            schedule_data.mark_sent(days)
+            self.state_store.touch("dm_schedule", member_id)
+            advanced += 1
+
+        if advanced:
+            # Every advanced stage goes out in one batched write
+            if self.db_pool:
+                await self.state_store.flush(self.db_pool)
+            else:
+                await self.save_auto_role_config()
+            if len(due_members) >= JOB_SCHEDULER_CONFIG["followup_batch_size"]:
+                return now  # more are due
+
+        recheck = now + timedelta(
+            seconds=JOB_SCHEDULER_CONFIG["followup_recheck_seconds"])
+        next_due = await self.next_followup_due()
+        return min(next_due, recheck) if next_due else recheck
+
+    async def run_maintenance_job(self, job):
+        """Daily cleanup of finished outbox rows and jobs"""
+        await self.cleanup_dm_outbox()
+        await self.cleanup_scheduled_jobs()
+        return datetime.now(timezone.utc) + timedelta(days=1)
+
+    async def remove_expired_role(self, member_id) -> Optional[tuple]:
+        """Remove expired role from member and move them to the follow-up schedule.
+        Returns the expiration DM to queue, or None when the member is gone."""
         try:
             data = AUTO_ROLE_CONFIG["active_members"].get(member_id)
             if not data:
-                return
+                return None
 
             # Get the guild and member
-            guild = self.get_guild(data["guild_id"])
+            guild = self.get_guild(data.guild_id)
             if not guild:
-                print(f"❌ Guild not found for member {member_id}")
+                autorole_logger.error(f"❌ Guild not found for member {member_id}")
                 del AUTO_ROLE_CONFIG["active_members"][member_id]
-                return
+                return None
 
             member = guild.get_member(int(member_id))
             if not member:
-                print(f"❌ Member {member_id} not found in guild")
+                autorole_logger.error(f"❌ Member {member_id} not found in guild")
                 del AUTO_ROLE_CONFIG["active_members"][member_id]
-                return
+                return None
 
             # Get the role
-            role = guild.get_role(data["role_id"])
+            role = guild.get_role(data.role_id)
             if role and role in member.roles:
+                await self.wait_for_role_edit_slot()
                 await member.remove_roles(role, reason="Auto-role expired")
-                await self.log_to_discord(
+                autorole_logger.info(
                     f"✅ Removed expired role '{role.name}' from {member.display_name}"
                 )
 
-            # Send DM to the member with the default message
-            try:
-                default_message = "Hey! Your **3-day free access** to the premium channel has unfortunately **ran out**. We truly hope that you were able to benefit with us & we hope to see you back soon! For now, feel free to continue following our trade signals in <#1350929790148022324>."
-                await member.send(default_message)
-                await self.log_to_discord(
-                    f"✅ Sent expiration DM to {member.display_name}")
-            except discord.Forbidden:
-                await self.log_to_discord(
-                    f"⚠️ Could not send DM to {member.display_name} (DMs disabled)"
-                )
-            except Exception as e:
-                await self.log_to_discord(
-                    f"❌ Error sending DM to {member.display_name}: {str(e)}")
+            # DM the member with the default message
+            default_message = "Hey! Your **3-day free access** to the premium channel has unfortunately **ran out**. We truly hope that you were able to benefit with us & we hope to see you back soon! For now, feel free to continue following our trade signals in <#1350929790148022324>."
+            dm = (member.id, default_message,
+                  f"role-expired:{member_id}:{data.role_added_time.isoformat()}",
+                  "expiration", guild.id)
 
             current_time = datetime.now(AMSTERDAM_TZ)
 
             # Update role history with expiration time
             if member_id in AUTO_ROLE_CONFIG["role_history"]:
-                AUTO_ROLE_CONFIG["role_history"][member_id][
-                    "last_expired"] = current_time.isoformat()
+                AUTO_ROLE_CONFIG["role_history"][
+                    member_id].last_expired = current_time
 
             # Schedule follow-up DMs (3, 7, 14 days after expiration)
-            AUTO_ROLE_CONFIG["dm_schedule"][member_id] = {
-                "role_expired": current_time.isoformat(),
-                "guild_id": data["guild_id"],
-                "dm_3_sent": False,
-                "dm_7_sent": False,
-                "dm_14_sent": False
-            }
+            AUTO_ROLE_CONFIG["dm_schedule"][member_id] = DmSchedule(
+                current_time, data.guild_id)
 
             # Remove from active tracking
             del AUTO_ROLE_CONFIG["active_members"][member_id]
+            return dm
 
         except Exception as e:
-            print(
+            if isinstance(e, discord.HTTPException) and e.status == 429:
+                # Rate limited - slow every worker down and keep the member so the job retries
+                self.role_expiry_metrics["rate_limited"] += 1
+                self.role_edit_next_at = max(
+                    self.role_edit_next_at,
+                    asyncio.get_running_loop().time() +
+                    (getattr(e, "retry_after", None)
+                     or ROLE_EXPIRY_CONFIG["rate_limit_backoff_seconds"]))
+                raise
+            autorole_logger.error(
                 f"❌ Error removing expired role for member {member_id}: {str(e)}"
             )
             # Clean up corrupted entry
             if member_id in AUTO_ROLE_CONFIG["active_members"]:
                 del AUTO_ROLE_CONFIG["active_members"][member_id]
+            return None
 
 
 bot = TradingBot()
@@ -5122,8 +7799,8 @@ PAIR_CONFIG = {
 }
 
 
-def calculate_levels(entry_price: float, pair: str, entry_type: str):
-    """Calculate TP and SL levels based on pair configuration"""
+def calculate_level_prices(entry_price: float, pair: str, entry_type: str):
+    """Calculate TP and SL levels as numbers, rounded to the pair's decimals"""
     if pair in PAIR_CONFIG:
         pip_value = PAIR_CONFIG[pair]['pip_value']
         decimals = PAIR_CONFIG[pair]['decimals']
@@ -5152,6 +7829,20 @@ def calculate_levels(entry_price: float, pair: str, entry_type: str):
         tp3 = entry_price - tp3_pips
         sl = entry_price + sl_pips
 
+    return {
+        'tp1': round(tp1, decimals),
+        'tp2': round(tp2, decimals),
+        'tp3': round(tp3, decimals),
+        'sl': round(sl, decimals),
+        'entry': round(entry_price, decimals)
+    }
+
+
+def calculate_levels(entry_price: float, pair: str, entry_type: str):
+    """Calculate TP and SL levels based on pair configuration"""
+    decimals = PAIR_CONFIG[pair]['decimals'] if pair in PAIR_CONFIG else 4
+    prices = calculate_level_prices(entry_price, pair, entry_type)
+
     # Format prices with correct decimals
     if pair == 'XAUUSD' or pair == 'US500':
         currency_symbol = '$'
@@ -5163,15 +7854,93 @@ def calculate_levels(entry_price: float, pair: str, entry_type: str):
     def format_price(price):
         return f"{currency_symbol}{price:.{decimals}f}"
 
+    return {key: format_price(value) for key, value in prices.items()}
+
+
+def calculate_live_tracking_levels(live_price: float, pair: str, action: str):
+    """Calculate TP and SL levels based on live price for backend tracking"""
+    if pair in PAIR_CONFIG:
+        pip_value = PAIR_CONFIG[pair]['pip_value']
+    else:
+        # Default values for unknown pairs
+        pip_value = 0.0001
+
+    # Calculate pip amounts (20, 40, 70, 50 as specified by user)
+    tp1_pips = 20 * pip_value
+    tp2_pips = 40 * pip_value
+    tp3_pips = 70 * pip_value
+    sl_pips = 50 * pip_value
+
+    # Determine direction based on action
+    is_buy = action.upper() == "BUY"
+
+    if is_buy:
+        tp1 = live_price + tp1_pips
+        tp2 = live_price + tp2_pips
+        tp3 = live_price + tp3_pips
+        sl = live_price - sl_pips
+    else:  # SELL
+        tp1 = live_price - tp1_pips
+        tp2 = live_price - tp2_pips
+        tp3 = live_price - tp3_pips
+        sl = live_price + sl_pips
+
     return {
-        'tp1': format_price(tp1),
-        'tp2': format_price(tp2),
-        'tp3': format_price(tp3),
-        'sl': format_price(sl),
-        'entry': format_price(entry_price)
+        'entry': live_price,
+        'tp1': tp1,
+        'tp2': tp2,
+        'tp3': tp3,
+        'sl': sl
     }
 
 
+def limit_entry_hit(trade_data: Dict, current_price: float) -> bool:
+    """Whether a pending limit order's entry has been reached"""
+    entry_type = (trade_data.get("entry_type") or "").lower()
+    if "buy limit" in entry_type:
+        # Buy limit: price must drop to or below entry price
+        return current_price <= trade_data["entry"]
+    if "sell limit" in entry_type:
+        # Sell limit: price must rise to or above entry price
+        return current_price >= trade_data["entry"]
+    return False
+
+
+def evaluate_price_levels(trade_data: Dict, current_price: float) -> List[str]:
+    """Levels hit by current_price for an active trade: ["breakeven"], ["sl"], TPs in order, or []"""
+    action = trade_data["action"]
+    tp_hits_set = set(trade_data.get("tp_hits", []))
+    manual_overrides_set = set(trade_data.get("manual_overrides", []))
+
+    # After TP2 the stop sits at entry (breakeven), unless manually overridden
+    if (trade_data.get("breakeven_active", False) or "tp2" in tp_hits_set
+        ) and "breakeven" not in manual_overrides_set:
+        if action == "BUY" and current_price <= trade_data["entry"]:
+            return ["breakeven"]
+        if action == "SELL" and current_price >= trade_data["entry"]:
+            return ["breakeven"]
+        return []
+
+    # Check SL first, unless manually overridden
+    if "sl" not in manual_overrides_set and (
+        (action == "BUY" and current_price <= trade_data["sl"]) or
+        (action == "SELL" and current_price >= trade_data["sl"])):
+        # SL cannot hit after TP2 (breakeven protection) or after TP3
+        if "tp2" in tp_hits_set or "tp3" in tp_hits_set:
+            return []
+        return ["sl"]
+
+    # Every TP reached that isn't already hit or manually overridden, in order
+    levels_hit = []
+    for tp_level in ["tp1", "tp2", "tp3"]:
+        if tp_level in tp_hits_set or tp_level in manual_overrides_set:
+            continue
+        if (action == "BUY" and current_price >= trade_data[tp_level]) or (
+                action == "SELL" and current_price <= trade_data[tp_level]):
+            levels_hit.append(tp_level)
+    return levels_hit
+
+
 def get_remaining_time_display(member_id: str) -> str:
     """Get formatted remaining time display for a member"""
     try:
@@ -5179,57 +7948,22 @@ def get_remaining_time_display(member_id: str) -> str:
         if not data:
             return "Unknown"
 
-        current_time = datetime.now(AMSTERDAM_TZ)
-
-        if data.get("weekend_delayed", False) and "expiry_time" in data:
-            # Weekend joiners have specific expiry time (Monday 23:59)
-            expiry_time = datetime.fromisoformat(data["expiry_time"])
-            if expiry_time.tzinfo is None:
-                if PYTZ_AVAILABLE:
-                    expiry_time = AMSTERDAM_TZ.localize(expiry_time)
-                else:
-                    expiry_time = expiry_time.replace(tzinfo=AMSTERDAM_TZ)
-            else:
-                expiry_time = expiry_time.astimezone(AMSTERDAM_TZ)
-
-            time_remaining = expiry_time - current_time
-
-            if time_remaining.total_seconds() <= 0:
-                return None  # Return None for expired members to filter them out
+        time_remaining = data.expires_at() - datetime.now(AMSTERDAM_TZ)
+        if time_remaining.total_seconds() <= 0:
+            return None  # Return None for expired members to filter them out
 
-            hours = int(time_remaining.total_seconds() // 3600)
-            minutes = int((time_remaining.total_seconds() % 3600) // 60)
-            seconds = int(time_remaining.total_seconds() % 60)
+        hours = int(time_remaining.total_seconds() // 3600)
+        minutes = int((time_remaining.total_seconds() % 3600) // 60)
+        seconds = int(time_remaining.total_seconds() % 60)
 
-            # Check if it's a custom duration
-            if data.get("custom_duration", False):
+        if data.weekend_delayed and data.expiry_time:
+            # Weekend joiners have specific expiry time (Monday 23:59)
+            if data.custom_duration:
                 return f"Custom: {hours}h {minutes}m {seconds}s"
-            else:
-                return f"Weekend: {hours}h {minutes}m {seconds}s"
+            return f"Weekend: {hours}h {minutes}m {seconds}s"
 
-        else:
-            # Normal member - 72 hours from role_added_time
-            role_added_time = datetime.fromisoformat(data["role_added_time"])
-            if role_added_time.tzinfo is None:
-                if PYTZ_AVAILABLE:
-                    role_added_time = AMSTERDAM_TZ.localize(role_added_time)
-                else:
-                    role_added_time = role_added_time.replace(
-                        tzinfo=AMSTERDAM_TZ)
-            else:
-                role_added_time = role_added_time.astimezone(AMSTERDAM_TZ)
-
-            expiry_time = role_added_time + timedelta(hours=72)
-            time_remaining = expiry_time - current_time
-
-            if time_remaining.total_seconds() <= 0:
-                return None  # Return None for expired members to filter them out
-
-            hours = int(time_remaining.total_seconds() // 3600)
-            minutes = int((time_remaining.total_seconds() % 3600) // 60)
-            seconds = int(time_remaining.total_seconds() % 60)
-
-            return f"{hours}h {minutes}m {seconds}s"
+        # Normal member - 72 hours from role_added_time
+        return f"{hours}h {minutes}m {seconds}s"
 
     except Exception as e:
         print(f"Error calculating time for member {member_id}: {str(e)}")
@@ -5423,15 +8157,8 @@ async def timed_auto_role_command(interaction: discord.Interaction,
                     # Only add members who aren't expired (time_display will be None for expired)
                     if time_display is not None:
                         # Get the join date from role_added_time
-                        role_added_time = data.get("role_added_time")
-                        if role_added_time:
-                            join_dt = datetime.fromisoformat(role_added_time)
-                            if join_dt.tzinfo is None:
-                                join_dt = join_dt.replace(tzinfo=AMSTERDAM_TZ)
-                            join_date = join_dt.strftime("%d-%m-%Y")
-                        else:
-                            join_date = "Unknown"
-                        
+                        join_date = data.role_added_time.strftime("%d-%m-%Y")
+
                         if join_date not in members_by_date:
                             members_by_date[join_date] = []
                         members_by_date[join_date].append(
@@ -5560,6 +8287,7 @@ async def entry_command(interaction: discord.Interaction, entry_type: str,
 
     try:
         # Calculate TP and SL levels
+        level_prices = calculate_level_prices(price, pair, entry_type)
         levels = calculate_levels(price, pair, entry_type)
 
         # Create the signal message
@@ -5591,6 +8319,7 @@ Stop Loss: {levels['sl']}"""
 
         target_channels = channel_mapping.get(channels, [])
         sent_channels = []
+        sent_messages = []
 
         for channel_id in target_channels:
             target_channel = bot.get_channel(channel_id)
@@ -5598,7 +8327,7 @@ Stop Loss: {levels['sl']}"""
             if target_channel and isinstance(target_channel,
                                              discord.TextChannel):
                 try:
-                    await target_channel.send(signal_message)
+                    sent_messages.append(await target_channel.send(signal_message))
                     sent_channels.append(target_channel.name)
                 except discord.Forbidden:
                     await interaction.followup.send(
@@ -5614,41 +8343,28 @@ Stop Loss: {levels['sl']}"""
                 f"✅ Signal sent to: {', '.join(sent_channels)}",
                 ephemeral=True)
 
-            # 🚀 INSTANT PRICE CHECK: Check new trade immediately instead of waiting 8 minutes
-            # This optimizes API usage while ensuring immediate monitoring at signal creation
-            try:
-                await asyncio.sleep(
-                    3
-                )  # Brief delay to allow message processing and potential tracking setup
-
-                # Get active trades and find this newly created one
-                active_trades = await bot.get_active_trades_from_db()
-                new_trade_found = False
-
-                for message_id, trade_data in active_trades.items():
-                    if (trade_data.get('pair') == pair
-                            and abs(float(trade_data.get('entry', 0)) - price)
-                            < 0.01):  # Match by pair and entry price
-                        await bot.check_single_trade_immediately(
-                            message_id, trade_data)
-                        new_trade_found = True
-                        await bot.debug_to_channel(
-                            "INSTANT CHECK",
-                            f"🚀 Instant price check completed for new {pair} signal",
-                            "🚀")
-                        break
-
-                if not new_trade_found:
-                    await bot.debug_to_channel(
-                        "INSTANT CHECK",
-                        f"⚠️ New {pair} signal not found in active trades yet - normal for limit orders",
-                        "⚠️")
-
-            except Exception as e:
-                await bot.debug_to_channel(
-                    "INSTANT CHECK ERROR",
-                    f"❌ Error during instant check for {pair}: {str(e)}", "❌")
-                print(f"Instant check error: {e}")
+            # Register the sent messages for tracking straight from the computed levels;
+            # the ingestion worker prices them, persists them and runs the first check.
+            # Messages in the excluded (testing) channel are never tracked.
+            tracked_messages = [
+                sent_message for sent_message in sent_messages
+                if sent_message.channel.id not in SIGNAL_EXCLUDED_CHANNEL_IDS
+            ]
+            if (tracked_messages and PRICE_TRACKING_CONFIG["enabled"]
+                    and not UNTRACKED_SIGNAL_PATTERN.search(pair)):
+                signal = Signal(
+                    pair=_PAIR_CLEAN_PATTERN.sub('', pair).upper(),
+                    action="BUY" if entry_type.lower().startswith('buy') else "SELL",
+                    order_type="limit" if "limit" in entry_type.lower() else "execution",
+                    **level_prices)
+                # One tracked position for the whole signal group; the other
+                # channels' messages are linked to it and receive the same replies
+                trade_data = signal.to_trade_data()
+                trade_data["linked_messages"] = [{
+                    "channel_id": sent_message.channel.id,
+                    "message_id": str(sent_message.id)
+                } for sent_message in tracked_messages[1:]]
+                bot.enqueue_signal(tracked_messages[0], trade_data)
         else:
             await interaction.response.send_message(
                 "❌ No valid channels found or no messages sent.",
@@ -5718,6 +8434,51 @@ async def channels_autocomplete(interaction: discord.Interaction,
     ]
 
 
+@bot.tree.command(name="loglevel",
+                  description="Change a subsystem's log level at runtime")
+@app_commands.describe(
+    subsystem="Subsystem to change, or 'all' for the default level",
+    level="DEBUG, INFO, WARNING or ERROR")
+async def log_level_command(interaction: discord.Interaction, subsystem: str,
+                            level: str):
+    """Change log levels without a restart"""
+
+    if not await owner_check(interaction):
+        return
+
+    if not set_log_level(subsystem.lower(), level):
+        await interaction.response.send_message(
+            f"❌ Unknown subsystem or level. Subsystems: all, {', '.join(LOG_SUBSYSTEMS)}",
+            ephemeral=True)
+        return
+
+    levels = "\n".join(f"**{name}:** {value}"
+                       for name, value in get_log_levels().items())
+    await interaction.response.send_message(
+        f"✅ Log level for **{subsystem.lower()}** set to **{level.upper()}**\n\n{levels}",
+        ephemeral=True)
+
+
+@log_level_command.autocomplete('subsystem')
+async def log_subsystem_autocomplete(interaction: discord.Interaction,
+                                     current: str):
+    return [
+        app_commands.Choice(name=subsystem, value=subsystem)
+        for subsystem in ["all"] + LOG_SUBSYSTEMS
+        if current.lower() in subsystem
+    ]
+
+
+@log_level_command.autocomplete('level')
+async def log_level_autocomplete(interaction: discord.Interaction,
+                                 current: str):
+    return [
+        app_commands.Choice(name=level, value=level)
+        for level in ["DEBUG", "INFO", "WARNING", "ERROR"]
+        if current.upper() in level
+    ]
+
+
 @bot.tree.command(name="dbstatus",
                   description="Check database connection and status")
 async def database_status_command(interaction: discord.Interaction):
@@ -5739,6 +8500,11 @@ async def database_status_command(interaction: discord.Interaction):
             value=
             "Add a PostgreSQL service to your Render deployment and set the DATABASE_URL environment variable.",
             inline=False)
+        embed.add_field(
+            name="📼 Local Journal",
+            value=
+            f"`{bot.local_journal.path}`\nPending changes: {bot.local_journal.pending}\nReplayed into PostgreSQL automatically once it is reachable.",
+            inline=False)
         await interaction.followup.send(embed=embed)
         return
 
@@ -5775,6 +8541,28 @@ async def database_status_command(interaction: discord.Interaction):
                 f"Pool Size: {pool_size}\nIdle Connections: {pool_idle}\nActive: {pool_size - pool_idle}",
                 inline=True)
 
+            # Pool saturation metrics since startup
+            metrics = bot.db_pool.get_metrics()
+            histogram_lines = "\n".join(
+                f"{bucket}: {count}"
+                for bucket, count in metrics["acquire_wait_histogram"].items()
+                if count)
+            embed.add_field(
+                name="⏱️ Pool Saturation",
+                value=
+                f"Limits: {metrics['min_size']}-{metrics['max_size']}\nIn Use: {metrics['in_use']} (peak {metrics['peak_in_use']})\nAcquires: {metrics['acquires']}\nAvg Wait: {metrics['avg_wait_ms']}ms (max {metrics['max_wait_ms']}ms)\nAcquire Timeouts: {metrics['acquire_timeouts']}\nStatement Timeouts: {metrics['statement_timeouts']}",
+                inline=True)
+            embed.add_field(name="📈 Acquire Wait Histogram",
+                            value=f"```{histogram_lines or 'No acquires yet'}```",
+                            inline=False)
+
+            store_metrics = bot.state_store.get_metrics()
+            embed.add_field(
+                name="🗃️ State Store",
+                value=
+                f"Loaded From: {store_metrics['loaded_from']}\nFlushes: {store_metrics['flushes']} (last {store_metrics['last_flush_ms']}ms, max {store_metrics['max_flush_ms']}ms)\nRows: {store_metrics['rows_upserted']} upserted, {store_metrics['rows_deleted']} deleted\nPending Keys: {sum(store_metrics['pending_keys'].values())}\nSnapshots: {store_metrics['snapshots']} • Errors: {store_metrics['flush_errors']}",
+                inline=False)
+
             embed.add_field(name="📋 Tables",
                             value=f"Total Tables: {table_count}",
                             inline=True)
@@ -5853,16 +8641,9 @@ async def level_command(interaction: discord.Interaction,
                 ephemeral=True)
             return
 
-        # Get guild members and filter level data to current guild
-        guild_users = []
-        for user_id, data in LEVEL_SYSTEM["user_data"].items():
-            if data.get("guild_id") == interaction.guild.id:
-                guild_users.append((user_id, data))
-
-        # Sort by level (descending), then by message count (descending)
-        guild_users.sort(key=lambda x:
-                         (x[1]["current_level"], x[1]["message_count"]),
-                         reverse=True)
+        # Kept ranked as messages are counted, so no per-command sort
+        leaderboard = LEVEL_SYSTEM["user_data"].guilds.get(
+            interaction.guild.id) or GuildLevels()
 
         # Create leaderboard embed
         embed = discord.Embed(
@@ -5873,20 +8654,18 @@ async def level_command(interaction: discord.Interaction,
 
         # Show top 10 users
         leaderboard_text = ""
-        for i, (user_id, data) in enumerate(guild_users[:10], 1):
+        for i, (user_id, messages, level) in enumerate(leaderboard.top(10), 1):
             try:
-                member = interaction.guild.get_member(int(user_id))
+                member = interaction.guild.get_member(user_id)
                 if member:
                     # Medal emojis for top 3
                     medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"**{i}.**"
-                    level = data["current_level"]
-                    messages = data["message_count"]
 
                     level_display = f"Level {level}" if level > 0 else "No Level"
                     leaderboard_text += f"{medal} **{member.display_name}**\n"
                     leaderboard_text += f"    └ {level_display} • {messages:,} messages\n\n"
             except Exception as e:
-                print(
+                levels_logger.error(
                     f"Error processing leaderboard entry for user {user_id}: {e}"
                 )
                 continue
@@ -5896,12 +8675,18 @@ async def level_command(interaction: discord.Interaction,
                             value=leaderboard_text,
                             inline=False)
 
+            own_rank = leaderboard.rank(interaction.user.id)
+            if own_rank:
+                embed.add_field(
+                    name="📍 Your Rank",
+                    value=f"**#{own_rank:,}** of {len(leaderboard):,} • "
+                    f"{leaderboard.get(interaction.user.id).message_count:,} messages",
+                    inline=False)
+
             # Add server stats
-            total_users = len(guild_users)
-            total_messages = sum(data["message_count"]
-                                 for _, data in guild_users)
-            avg_level = sum(data["current_level"] for _, data in guild_users
-                            ) / total_users if total_users > 0 else 0
+            total_users = len(leaderboard)
+            total_messages = leaderboard.total_messages
+            avg_level = leaderboard.level_total / total_users if total_users > 0 else 0
 
             embed.add_field(
                 name="📊 Server Statistics",
@@ -5923,17 +8708,18 @@ async def level_command(interaction: discord.Interaction,
 
     # Individual level check (original functionality)
     target_user = user or interaction.user
-    user_id = str(target_user.id)
+    leaderboard = LEVEL_SYSTEM["user_data"].guilds.get(
+        interaction.guild.id) or GuildLevels()
+    user_data = leaderboard.get(target_user.id)
 
-    if user_id not in LEVEL_SYSTEM["user_data"]:
+    if user_data is None:
         await interaction.response.send_message(
             f"**{target_user.display_name}** hasn't sent any messages yet. Start chatting to level up!",
             ephemeral=True)
         return
 
-    user_data = LEVEL_SYSTEM["user_data"][user_id]
-    current_level = user_data["current_level"]
-    message_count = user_data["message_count"]
+    current_level = user_data.current_level
+    message_count = user_data.message_count
 
     # Calculate progress to next level
     next_level = current_level + 1
@@ -5958,6 +8744,11 @@ async def level_command(interaction: discord.Interaction,
 
     embed.add_field(name="Your Status", value=status_line, inline=False)
 
+    embed.add_field(
+        name="Your Rank",
+        value=f"📍 **#{leaderboard.rank(target_user.id):,}** of {len(leaderboard):,} members",
+        inline=False)
+
     # Progress to next level
     if next_level <= 8:
         # Create progress bar
@@ -6709,7 +9500,7 @@ async def schedule_giveaway_end(giveaway_id):
             await end_giveaway(giveaway_id)
 
     except Exception as e:
-        print(f"Error scheduling giveaway end: {e}")
+        giveaways_logger.error(f"Error scheduling giveaway end: {e}")
 
 
 async def end_giveaway(giveaway_id, interaction=None):
@@ -6840,7 +9631,7 @@ async def end_giveaway(giveaway_id, interaction=None):
                 f"🏆 Winners: {len(final_winners)}")
 
     except Exception as e:
-        print(f"Error ending giveaway: {e}")
+        giveaways_logger.error(f"Error ending giveaway: {e}")
         if interaction:
             await interaction.followup.send(
                 f"❌ Error ending giveaway: {str(e)}", ephemeral=True)
@@ -6887,13 +9678,13 @@ async def on_reaction_add(reaction, user):
             required_level = level
             break
 
-    # Get user's actual level from LEVEL_SYSTEM
-    user_id_str = str(user.id)
-    user_data = LEVEL_SYSTEM["user_data"].get(user_id_str)
-    
+    # Get user's actual level in this guild from LEVEL_SYSTEM
+    user_data = LEVEL_SYSTEM["user_data"].get(
+        level_key(reaction.message.guild.id, user.id))
+
     if user_data:
-        current_level = user_data.get("current_level", 0)
-        message_count = user_data.get("message_count", 0)
+        current_level = user_data.current_level
+        message_count = user_data.message_count
     else:
         current_level = 0
         message_count = 0
@@ -6970,10 +9761,12 @@ async def on_reaction_add(reaction, user):
                 else:
                     level_progress_text = f"You are currently **{current_level_text}**."
 
-            await user.send(
+            await bot.enqueue_dm(
+                user.id,
                 "Unfortunately, your current activity level is not high enough to enter this giveaway. "
                 "You can level up by participating in conversations in any of our text channels.\n\n"
-                f"{level_progress_text}")
+                f"{level_progress_text}", f"giveaway-rejection:{giveaway_id}:{user.id}",
+                "giveaway rejection", giveaway_data.get('guild_id'))
         except (discord.Forbidden, discord.NotFound):
             pass  # Can't DM user or remove reaction
         return
@@ -7077,7 +9870,7 @@ async def check_giveaway_command(interaction: discord.Interaction,
     except Exception as e:
         await interaction.response.send_message(
             f"❌ Error checking giveaway: {str(e)}", ephemeral=True)
-        print(f"Error checking giveaway: {e}")
+        giveaways_logger.error(f"Error checking giveaway: {e}")
 
 
 # ===== RESTORE GIVEAWAY COMMAND =====
@@ -7202,7 +9995,7 @@ async def restore_giveaway_command(interaction: discord.Interaction,
     except Exception as e:
         await interaction.followup.send(
             f"❌ Error restoring giveaway: {str(e)}", ephemeral=True)
-        print(f"Error restoring giveaway: {e}")
+        giveaways_logger.error(f"Error restoring giveaway: {e}")
 
 
 # ===== DM TRACKING COMMAND =====
@@ -7234,12 +10027,15 @@ async def dm_status_command(interaction: discord.Interaction,
                 ephemeral=True)
             return
 
+        counts = await bot.get_followup_stage_counts()
+
         # Clean up completed users first (those who received 14-day message)
         completed_users = []
-        for member_id, dm_data in list(
-                AUTO_ROLE_CONFIG["dm_schedule"].items()):
-            if dm_data.get("dm_14_sent", False):
-                completed_users.append(member_id)
+        if counts.get(None):
+            completed_users = [
+                member_id for member_id, dm_data in
+                AUTO_ROLE_CONFIG["dm_schedule"].items() if dm_data.dm_14_sent
+            ]
 
         # Remove completed users from tracking
         for member_id in completed_users:
@@ -7248,21 +10044,27 @@ async def dm_status_command(interaction: discord.Interaction,
         # Save updated config if users were removed
         if completed_users:
             await bot.save_auto_role_config()
+            counts.pop(None, None)
             print(
                 f"✅ Removed {len(completed_users)} completed users from DM tracking"
             )
 
+        # Stages run in order, so everyone past a stage has received its DM
+        total_scheduled = sum(counts.values())
+        sent_14day = counts.get(None, 0)
+        sent_7day = sent_14day + counts.get(14, 0)
+        sent_3day = sent_7day + counts.get(7, 0)
+        still_pending = total_scheduled - sent_14day
+
         # Create status report
         status_report = "📬 **DM STATUS REPORT**\n━━━━━━━━━━━━━━━━━━━━━━\n\n"
 
         if completed_users:
             status_report += f"🧹 **Cleanup**: Removed {len(completed_users)} users who completed 14-day sequence\n\n"
 
-        total_scheduled = len(AUTO_ROLE_CONFIG["dm_schedule"])
-        sent_3day = sent_7day = sent_14day = 0
-        pending_users = []
-
         for member_id, dm_data in AUTO_ROLE_CONFIG["dm_schedule"].items():
+            if len(status_report) > 2000:
+                break  # only the summary is sent from here on
             try:
                 # Get member info
                 guild = interaction.guild
@@ -7270,13 +10072,9 @@ async def dm_status_command(interaction: discord.Interaction,
                 member_name = member.display_name if member else f"User-{member_id}"
 
                 # Check DM status
-                dm_3_sent = dm_data.get("dm_3_sent", False)
-                dm_7_sent = dm_data.get("dm_7_sent", False)
-                dm_14_sent = dm_data.get("dm_14_sent", False)
-
-                if dm_3_sent: sent_3day += 1
-                if dm_7_sent: sent_7day += 1
-                if dm_14_sent: sent_14day += 1
+                dm_3_sent = dm_data.dm_3_sent
+                dm_7_sent = dm_data.dm_7_sent
+                dm_14_sent = dm_data.dm_14_sent
 
                 # Filter by message type
                 if message_type.lower() == "3day" and dm_3_sent:
@@ -7294,10 +10092,6 @@ async def dm_status_command(interaction: discord.Interaction,
 
                     status_report += f"• **{member_name}**: {' '.join(dm_status)}\n"
 
-                # Track pending users (haven't received 14-day message yet)
-                if not dm_14_sent:
-                    pending_users.append(member_name)
-
             except Exception as e:
                 status_report += f"❌ Error processing member {member_id}: {str(e)}\n"
 
@@ -7307,7 +10101,7 @@ async def dm_status_command(interaction: discord.Interaction,
         status_report += f"• 3-day messages sent: **{sent_3day}**\n"
         status_report += f"• 7-day messages sent: **{sent_7day}**\n"
         status_report += f"• 14-day messages sent: **{sent_14day}**\n"
-        status_report += f"• Still pending: **{len(pending_users)}**\n"
+        status_report += f"• Still pending: **{still_pending}**\n"
 
         # Split message if too long
         if len(status_report) > 2000:
@@ -7317,7 +10111,7 @@ async def dm_status_command(interaction: discord.Interaction,
             summary += f"• 3-day messages sent: **{sent_3day}**\n"
             summary += f"• 7-day messages sent: **{sent_7day}**\n"
             summary += f"• 14-day messages sent: **{sent_14day}**\n"
-            summary += f"• Still pending: **{len(pending_users)}**\n\n"
+            summary += f"• Still pending: **{still_pending}**\n\n"
             summary += f"*Use `/dmstatus 3day`, `/dmstatus 7day`, or `/dmstatus 14day` for detailed lists.*"
 
             await interaction.followup.send(summary, ephemeral=True)
@@ -7592,11 +10386,14 @@ async def active_trades_view(interaction: discord.Interaction):
                 print(f"Error checking message {message_id}: {e}")
                 trades_to_remove.append(message_id)
 
-        # Remove deleted trades from database immediately
-        for message_id in trades_to_remove:
-            await bot.remove_trade_from_db(message_id)
-            if message_id in active_trades:
-                del active_trades[message_id]
+        # Remove deleted trades from database immediately (single archive statement)
+        if trades_to_remove:
+            await bot.archive_trades_bulk({
+                message_id: "message_deleted"
+                for message_id in trades_to_remove
+            })
+            for message_id in trades_to_remove:
+                active_trades.pop(message_id, None)
 
     # Send debugging to Discord channel
     debug_channel = bot.get_channel(1414220633029611582)
@@ -7906,6 +10703,33 @@ async def test_price_retrieval(interaction: discord.Interaction, pair: str):
                         value="\n".join(api_status),
                         inline=False)
 
+        # Capability matrix used for instant API assignment on new signals
+        assigned_api = bot.provider_matrix.assigned_api(pair_clean)
+        now = datetime.now(timezone.utc)
+        matrix_lines = []
+        for api_name, entry in bot.provider_matrix.pair_rows(pair_clean).items():
+            display_name = api_name.replace('_', ' ').title()
+            if not entry:
+                matrix_lines.append(f"➖ {display_name}: not probed yet")
+                continue
+            icon = "✅" if bot.provider_matrix.supports(pair_clean, api_name) else "❌"
+            last_ok = "never"
+            if entry["last_success_at"]:
+                minutes_ago = int((now - entry["last_success_at"]).total_seconds() // 60)
+                last_ok = f"{minutes_ago // 60}h {minutes_ago % 60}m ago"
+            latency = f"{entry['latency_ms']:.0f}ms" if entry["latency_ms"] is not None else "n/a"
+            marker = " ⭐ **assigned**" if api_name == assigned_api else ""
+            matrix_lines.append(
+                f"{icon} {display_name}{marker}: {latency} • {entry['error_rate'] * 100:.0f}% errors • last ok {last_ok}"
+            )
+        last_refresh = bot.provider_matrix.last_refresh
+        embed.add_field(
+            name="🧭 Provider Matrix",
+            value="\n".join(matrix_lines) +
+            (f"\nBackground refresh: {last_refresh.strftime('%Y-%m-%d %H:%M')}"
+             if last_refresh else ""),
+            inline=False)
+
         await interaction.followup.send(embed=embed)
 
     except Exception as e:
@@ -8063,6 +10887,8 @@ class StatusSelectionDropdown(discord.ui.Select):
             # Track results
             successful_trades = []
             failed_trades = []
+            # Trades closed by this override, archived together after the loop
+            trades_to_archive = {}
 
             # Process each selected trade
             for message_id in selected_trades:
@@ -8089,8 +10915,7 @@ class StatusSelectionDropdown(discord.ui.Select):
                         if "sl" not in manual_overrides:
                             manual_overrides.append("sl")
                         trade_data["manual_overrides"] = manual_overrides
-                        await bot.remove_trade_from_db(message_id,
-                                                       "manual_sl_hit")
+                        trades_to_archive[message_id] = "manual_sl_hit"
                         await bot.send_sl_notification(message_id,
                                                        trade_data,
                                                        offline_hit=False,
@@ -8169,8 +10994,7 @@ class StatusSelectionDropdown(discord.ui.Select):
                                 await asyncio.sleep(2)
                             trade_data[
                                 "status"] = "completed (tp3 hit - manual override)"
-                            await bot.remove_trade_from_db(
-                                message_id, "manual_tp3_hit")
+                            trades_to_archive[message_id] = "manual_tp3_hit"
 
                         await bot.send_tp_notification(message_id,
                                                        trade_data,
@@ -8188,8 +11012,7 @@ class StatusSelectionDropdown(discord.ui.Select):
                         if "breakeven" not in manual_overrides:
                             manual_overrides.append("breakeven")
                         trade_data["manual_overrides"] = manual_overrides
-                        await bot.remove_trade_from_db(message_id,
-                                                       "manual_breakeven_hit")
+                        trades_to_archive[message_id] = "manual_breakeven_hit"
                         await bot.send_breakeven_notification(
                             message_id, trade_data, offline_hit=False)
                         successful_trades.append(
@@ -8198,8 +11021,7 @@ class StatusSelectionDropdown(discord.ui.Select):
                     elif status == "end_tracking":
                         trade_data[
                             "status"] = "closed (ended by manual override)"
-                        await bot.remove_trade_from_db(message_id,
-                                                       "manual_end_tracking")
+                        trades_to_archive[message_id] = "manual_end_tracking"
                         successful_trades.append(
                             f"{pair} {action} - Tracking Ended")
 
@@ -8211,6 +11033,10 @@ class StatusSelectionDropdown(discord.ui.Select):
                         str(trade_exc)[:50]
                     })
 
+            # Archive every closed trade in one statement
+            if trades_to_archive:
+                await bot.archive_trades_bulk(trades_to_archive)
+
             # Refresh cache
             fresh_trades = await bot.get_active_trades_from_db()
             self.view.active_trades = fresh_trades
@@ -8310,6 +11136,74 @@ async def trade_override_command(interaction: discord.Interaction):
         print(f"Trade override loading error: {e}")
 
 
+@bot.tree.command(
+    name="tradestats",
+    description="[OWNER ONLY] Show trade performance from the completed-trade rollups")
+@app_commands.describe(
+    period="Group results by day, week, pair or direction",
+    limit="Number of rows to show (default: 14)")
+async def trade_stats_command(interaction: discord.Interaction,
+                              period: str = "day",
+                              limit: int = 14):
+    """Show trade performance rollups without scanning completed_trades"""
+    if not await owner_check(interaction):
+        return
+
+    await interaction.response.defer(ephemeral=True)
+
+    if not bot.db_pool:
+        await interaction.followup.send(
+            "❌ Trade statistics require the database", ephemeral=True)
+        return
+
+    if period not in ("day", "week", "pair", "direction"):
+        await interaction.followup.send(
+            "❌ Invalid period. Use 'day', 'week', 'pair' or 'direction'.",
+            ephemeral=True)
+        return
+
+    limit = max(1, min(limit, 25))  # Discord embed field limit
+    rows = await bot.get_trade_rollups(period, limit)
+
+    if not rows:
+        embed = discord.Embed(
+            title="📈 Trade Statistics",
+            description="No completed trades recorded yet.",
+            color=discord.Color.orange())
+        await interaction.followup.send(embed=embed, ephemeral=True)
+        return
+
+    total_trades = sum(row["trades"] for row in rows)
+    total_pips = sum(row["pips_total"] for row in rows)
+    total_tp3 = sum(row["tp3_hits"] for row in rows)
+    total_sl = sum(row["sl_hits"] for row in rows)
+
+    embed = discord.Embed(
+        title=f"📈 Trade Statistics - Per {period.title()}",
+        description=
+        f"**{total_trades}** trades • **{total_pips:+.1f}** pips • TP3: {total_tp3} • SL: {total_sl}",
+        color=discord.Color.green() if total_pips >= 0 else discord.Color.red())
+
+    for row in rows:
+        embed.add_field(
+            name=f"{row['bucket_key']} ({row['trades']} trades)",
+            value=
+            f"TP1: {row['tp1_hits']} • TP2: {row['tp2_hits']} • TP3: {row['tp3_hits']}\nSL: {row['sl_hits']} • BE: {row['breakeven_hits']} • Other: {row['other_closes']}\nPips: **{row['pips_total']:+.1f}**",
+            inline=True)
+
+    embed.set_footer(text="Rollups are updated as each trade is archived")
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+
+@trade_stats_command.autocomplete('period')
+async def period_autocomplete(interaction: discord.Interaction, current: str):
+    periods = ['day', 'week', 'pair', 'direction']
+    return [
+        app_commands.Choice(name=period, value=period) for period in periods
+        if current.lower() in period.lower()
+    ]
+
+
 # SL-TP Scraper command removed as requested by user
 # @bot.tree.command(name="sl-tpscraper", description="[OWNER ONLY] Analyze trade signals and performance within a date range")
 # @app_commands.describe(
@@ -8343,7 +11237,8 @@ async def web_server():
                         "postgresql_version":
                         version.split()[1] if version else "Unknown",
                         "pool_size": bot.db_pool.get_size(),
-                        "pool_idle": bot.db_pool.get_idle_size()
+                        "pool_idle": bot.db_pool.get_idle_size(),
+                        "pool_metrics": bot.db_pool.get_metrics()
                     }
             except Exception as e:
                 database_status = f"Error: {str(e)[:50]}"
@@ -8374,6 +11269,8 @@ async def web_server():
             and bot.last_heartbeat else "N/A",
             "bot_latency":
             f"{round(bot.latency * 1000)}ms" if bot.is_ready() else "N/A",
+            "startup_report":
+            bot.startup_report,
             "is_ready":
             bot.is_ready(),
             "is_closed":
@@ -8389,10 +11286,97 @@ async def web_server():
     async def root_handler(request):
         return web.Response(text="Discord Trading Bot is running!", status=200)
 
+    async def trade_stats_handler(request):
+        if not is_authorized_request(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        period = request.query.get("period", "day")
+        if period not in ("day", "week", "pair", "direction"):
+            return web.json_response(
+                {"error": "period must be day, week, pair or direction"},
+                status=400)
+        try:
+            limit = max(1, min(int(request.query.get("limit", "30")), 366))
+        except ValueError:
+            return web.json_response({"error": "limit must be an integer"},
+                                     status=400)
+        if not bot.db_pool:
+            return web.json_response({"database_status": "Not configured"},
+                                     status=503)
+        rows = await bot.get_trade_rollups(period, limit)
+        return web.json_response({"period": period, "rows": rows}, status=200)
+
+    async def db_metrics_handler(request):
+        local_journal = {
+            "path": bot.local_journal.path,
+            "pending_records": bot.local_journal.pending,
+            "last_replay": bot.journal_replay_stats
+        }
+        if not bot.db_pool:
+            return web.json_response(
+                {
+                    "database_status": "Not configured",
+                    "local_journal": local_journal
+                },
+                status=503)
+        return web.json_response(
+            {
+                "pool_config": DB_POOL_CONFIG,
+                "pool_metrics": bot.db_pool.get_metrics(),
+                "state_store": bot.state_store.get_metrics(),
+                "local_journal": local_journal
+            },
+            status=200)
+
+    async def signal_metrics_handler(request):
+        return web.json_response(bot.get_signal_latency_metrics(), status=200)
+
+    async def log_metrics_handler(request):
+        return web.json_response(bot.log_sink.get_metrics(), status=200)
+
+    async def dm_metrics_handler(request):
+        return web.json_response(await bot.get_dm_outbox_metrics(), status=200)
+
+    async def job_metrics_handler(request):
+        return web.json_response(await bot.get_job_metrics(), status=200)
+
+    async def notification_metrics_handler(request):
+        # Recent entries are labelled with notification text
+        if not is_authorized_request(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        return web.json_response(bot.notifications.get_metrics(), status=200)
+
+    async def logs_handler(request):
+        """Recent log records: ?subsystem=pricing&level=WARNING&q=text&limit=100"""
+        if not is_authorized_request(request):
+            return web.json_response({"error": "unauthorized"}, status=401)
+        level = logging.getLevelName(request.query.get("level", "NOTSET").upper())
+        try:
+            limit = min(int(request.query.get("limit", "100")), 1000)
+        except ValueError:
+            limit = 100
+        return web.json_response(
+            {
+                "levels": get_log_levels(),
+                "buffered": len(LOG_RING_BUFFER.records),
+                "records": LOG_RING_BUFFER.query(
+                    request.query.get("subsystem"),
+                    level if isinstance(level, int) else logging.NOTSET,
+                    request.query.get("q"), limit)
+            },
+            status=200)
+
     app = web.Application()
     app.router.add_get('/', root_handler)
     app.router.add_get('/health', health_check)
     app.router.add_get('/status', health_check)
+    app.router.add_get('/metrics/db', db_metrics_handler)
+    app.router.add_get('/metrics/signals', signal_metrics_handler)
+    app.router.add_get('/metrics/logs', log_metrics_handler)
+    app.router.add_get('/metrics/notifications', notification_metrics_handler)
+    app.router.add_get('/metrics/dms', dm_metrics_handler)
+    app.router.add_get('/metrics/jobs', job_metrics_handler)
+    app.router.add_get('/logs', logs_handler)
+    app.router.add_get('/stats/trades', trade_stats_handler)
 
     try:
         runner = web.AppRunner(app)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+on_message Benchmark
+Run this to measure how many messages per second go through TradingBot.on_message
+for ordinary chat traffic, and to compare the int-set prefilter with the old
+string-based checks.
+
+Usage: python on_message_benchmark.py [messages]
+"""
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+from main import (LEVEL_SYSTEM, PRICE_TRACKING_CONFIG, bot,
+                  is_signal_candidate)
+
+GUILD = SimpleNamespace(id=1234567890)
+CHANNELS = [SimpleNamespace(id=1400000000000000000 + i, name=f"chat-{i}") for i in range(10)]
+OWNER = SimpleNamespace(id=int(PRICE_TRACKING_CONFIG["owner_user_id"]), bot=False, name="owner")
+
+SIGNAL = """**Trade Signal For: EURUSD**
+Entry Type: Buy execution
+Entry Price: 1.08500
+
+**Take Profit Levels:**
+Take Profit 1: 1.08700
+Take Profit 2: 1.08900
+Take Profit 3: 1.09200
+
+Stop Loss: 1.08000"""
+
+CHAT = [
+    "Good morning everyone, markets open in 10 minutes",
+    "Nice trade yesterday! Closed at TP2 on gold",
+    "Who is watching the NFP release today?",
+    "Remember: risk management first, always use your SL",
+]
+
+
+def build_messages(count, users=5000, signal_every=1000):
+    """Chat from many members, with an owner signal every `signal_every` messages"""
+    messages = []
+    for i in range(count):
+        if i % signal_every == 0:
+            author, content = OWNER, SIGNAL
+        else:
+            author = SimpleNamespace(id=900000000000000000 + i % users, bot=False, name="member")
+            content = CHAT[i % len(CHAT)]
+        messages.append(SimpleNamespace(id=1500000000000000000 + i, author=author,
+                                        channel=CHANNELS[i % len(CHANNELS)],
+                                        guild=GUILD, content=content))
+    return messages
+
+
+def legacy_is_signal_candidate(message):
+    """The previous checks: str() conversions, substring search and two upper() calls"""
+    if (PRICE_TRACKING_CONFIG["enabled"] and str(message.channel.id)
+            != PRICE_TRACKING_CONFIG["excluded_channel_id"] and
+        (str(message.author.id) == PRICE_TRACKING_CONFIG["owner_user_id"]
+         or message.author.bot) and PRICE_TRACKING_CONFIG["signal_keyword"]
+            in message.content):
+        return not ("US100" in message.content.upper() or "GER40" in message.content.upper())
+    return False
+
+
+async def run_handler(messages):
+    candidates = 0
+    level_ups = 0
+
+    async def handle_signal_message(message, queued_at=None, trade_data=None):
+        nonlocal candidates
+        candidates += 1
+
+    async def handle_level_up(user, guild, old_level, new_level):
+        nonlocal level_ups
+        level_ups += 1
+
+    async def save_level_system():
+        pass
+
+    # Keep the benchmark off Discord, the price APIs and the journal
+    bot.handle_signal_message = handle_signal_message
+    bot.handle_level_up = handle_level_up
+    bot.save_level_system = save_level_system
+
+    # Stand-in for signal_ingestion_task: take queued signals off the bounded queue
+    async def ingest_signals():
+        while True:
+            message, queued_at, trade_data = await bot.signal_queue.get()
+            try:
+                await bot.handle_signal_message(message, queued_at, trade_data)
+            finally:
+                bot.signal_queue.task_done()
+
+    worker = asyncio.create_task(ingest_signals())
+    started = time.perf_counter()
+    for message in messages:
+        await bot.on_message(message)
+        if not bot.signal_queue.empty():
+            # Let the worker drain it, as the event loop would between messages
+            await asyncio.sleep(0)
+    await bot.signal_queue.join()
+    elapsed = time.perf_counter() - started
+    worker.cancel()
+    return elapsed, candidates, level_ups
+
+
+def run_benchmark(count):
+    messages = build_messages(count)
+    print("⚡ on_message Benchmark")
+    print("=" * 50)
+    print(f"Messages: {count:,} ({sum(1 for m in messages if m.author is OWNER):,} signals)")
+
+    for name, prefilter in [("string checks (old)", legacy_is_signal_candidate),
+                            ("int-set prefilter (new)", is_signal_candidate)]:
+        started = time.perf_counter()
+        matched = sum(1 for message in messages if prefilter(message))
+        elapsed = time.perf_counter() - started
+        print(f"   {name:<24} {count / elapsed:>12,.0f} msgs/s  ({matched:,} candidates)")
+
+    LEVEL_SYSTEM["user_data"].clear()
+    elapsed, candidates, level_ups = asyncio.run(run_handler(messages))
+    print(f"   {'full on_message':<24} {count / elapsed:>12,.0f} msgs/s  "
+          f"({candidates:,} signals, {level_ups:,} level-ups, "
+          f"{len(LEVEL_SYSTEM['user_data']):,} members)")
+    LEVEL_SYSTEM["user_data"].clear()
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Role Expiry Benchmark
+Run this to simulate a burst of auto-role expiries (e.g. after a collab) through the
+batched expiry path, against fake members whose role edits take a fixed API latency,
+and to check the burst finishes in the time the configured pace predicts.
+
+Usage: python role_expiry_benchmark.py [expiries] [edits_per_second] [latency_ms]
+"""
+
+import asyncio
+import math
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from main import (AMSTERDAM_TZ, AUTO_ROLE_CONFIG, JOB_SCHEDULER_CONFIG,
+                  ROLE_EXPIRY_CONFIG, ActiveMember, bot, scheduled_job)
+
+GUILD_ID = 1234567890
+ROLE = SimpleNamespace(id=1384489575187091466, name="Trial")
+LEGACY_SAMPLE = 200
+
+
+class FakeMember:
+
+    def __init__(self, member_id, latency):
+        self.id = member_id
+        self.display_name = f"member-{member_id}"
+        self.roles = [ROLE]
+        self.latency = latency
+
+    async def remove_roles(self, role, reason=None):
+        await asyncio.sleep(self.latency)
+        self.roles.remove(role)
+
+
+def build_burst(count, latency):
+    """Members whose trials all ran out within the last hour, with their claimed jobs"""
+    joined = datetime.now(AMSTERDAM_TZ) - timedelta(hours=73)
+    members, jobs = {}, []
+    AUTO_ROLE_CONFIG["active_members"].clear()
+    AUTO_ROLE_CONFIG["dm_schedule"].clear()
+    for i in range(count):
+        member_id = 900000000000000000 + i
+        added = joined + timedelta(seconds=i * 3600 / count)
+        members[member_id] = FakeMember(member_id, latency)
+        AUTO_ROLE_CONFIG["active_members"][str(member_id)] = ActiveMember(
+            added, ROLE.id, GUILD_ID)
+        job = scheduled_job("role_expiry", f"role-expiry:{member_id}",
+                            added + timedelta(hours=72), member_id, GUILD_ID)
+        job["attempts"] = 1  # as claim_due_jobs hands it over
+        jobs.append(job)
+    return members, jobs
+
+
+async def run_burst(members, jobs, batch_size):
+    commits, dms, progress = 0, [], []
+
+    async def save_auto_role_config():
+        nonlocal commits
+        commits += 1
+
+    async def enqueue_dm(user_id, content, dedupe_key, kind, guild_id=None,
+                         send_at=None, conn=None):
+        dms.append(dedupe_key)
+        return True
+
+    async def log_to_discord(message):
+        progress.append(message)
+
+    # Keep the simulation off Discord, PostgreSQL and the offline journal
+    guild = SimpleNamespace(id=GUILD_ID, get_member=members.get,
+                            get_role=lambda role_id: ROLE)
+    bot.get_guild = lambda guild_id: guild
+    bot.save_auto_role_config = save_auto_role_config
+    bot.enqueue_dm = enqueue_dm
+    bot.log_to_discord = log_to_discord
+    bot.role_edit_next_at = 0.0
+    bot.role_expiry_burst = None
+
+    started = time.perf_counter()
+    for i in range(0, len(jobs), batch_size):
+        # Jobs not claimed yet are what the progress report counts as still due
+        bot.local_jobs = {job["job_key"]: job for job in jobs[i + batch_size:]}
+        await bot.run_role_expiry_batch(jobs[i:i + batch_size])
+    elapsed = time.perf_counter() - started
+    bot.local_jobs = {}
+    return elapsed, commits, dms, progress
+
+
+def run_benchmark(count, edits_per_second, latency):
+    concurrency = ROLE_EXPIRY_CONFIG["concurrency"]
+    batch_size = JOB_SCHEDULER_CONFIG["batch_size"]
+    AUTO_ROLE_CONFIG["enabled"] = True
+    print("⏳ Role Expiry Benchmark")
+    print("=" * 50)
+    print(f"Expiries: {count:,} • pace {edits_per_second:g} edits/s • {concurrency} in flight • "
+          f"{latency * 1000:.0f}ms per role edit • batches of {batch_size}")
+
+    # The old path: one expiry at a time, each followed by its own save
+    ROLE_EXPIRY_CONFIG.update(concurrency=1, edits_per_second=math.inf)
+    members, jobs = build_burst(min(count, LEGACY_SAMPLE), latency)
+    legacy, legacy_commits, _, _ = asyncio.run(run_burst(members, jobs, 1))
+    legacy *= count / len(jobs)
+    legacy_commits *= count // len(jobs)
+
+    ROLE_EXPIRY_CONFIG.update(concurrency=concurrency, edits_per_second=edits_per_second)
+    members, jobs = build_burst(count, latency)
+    elapsed, commits, dms, progress = asyncio.run(run_burst(members, jobs, batch_size))
+    predicted = max(count / edits_per_second, count * latency / concurrency)
+
+    removed = sum(1 for member in members.values() if ROLE not in member.roles)
+    complete = (removed == count and len(dms) == count
+                and not AUTO_ROLE_CONFIG["active_members"]
+                and len(AUTO_ROLE_CONFIG["dm_schedule"]) == count)
+    on_time = elapsed <= predicted * 1.1 + 0.5
+    print(f"{'✅' if complete else '❌'} Roles removed: {removed:,}/{count:,} • expiration DMs queued: {len(dms):,} • "
+          f"follow-ups scheduled: {len(AUTO_ROLE_CONFIG['dm_schedule']):,}")
+    print(f"   {'serial (old)':<22} {legacy:>8.2f}s  {count / legacy:>7.1f}/s  "
+          f"{legacy_commits:>5,} commits  (extrapolated from {min(count, LEGACY_SAMPLE)})")
+    print(f"   {'batched (new)':<22} {elapsed:>8.2f}s  {count / elapsed:>7.1f}/s  "
+          f"{commits:>5,} commits")
+    print(f"{'✅' if on_time else '❌'} Predicted {predicted:.2f}s at the configured pace, took {elapsed:.2f}s")
+    for message in progress[-2:]:
+        print(f"   {message}")
+
+    AUTO_ROLE_CONFIG["dm_schedule"].clear()
+    return complete and on_time
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    edits_per_second = float(sys.argv[2]) if len(sys.argv) > 2 else 100
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 25) / 1000
+    sys.exit(0 if run_benchmark(count, edits_per_second, latency) else 1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Signal Parser Benchmark
+Run this to compare the single-pass signal parser against the old field-by-field parser
+over a corpus of /entry signals, legacy signals and ordinary chat messages.
+
+Usage: python signal_parser_benchmark.py [iterations]
+"""
+
+import re
+import sys
+import time
+
+from main import PAIR_CONFIG, calculate_levels, parse_signal
+
+ENTRY_TEMPLATE = """**Trade Signal For: {pair}**
+Entry Type: {entry_type}
+Entry Price: {entry}
+
+**Take Profit Levels:**
+Take Profit 1: {tp1}
+Take Profit 2: {tp2}
+Take Profit 3: {tp3}
+
+Stop Loss: {sl}
+
+@everyone"""
+
+US_INDEX_NOTE = "\n\n**Please note that prices on US100 & GER40 vary a lot from broker to broker, so it is possible that the current price in our signal is different than the current price with your broker.**"
+
+LEGACY_SIGNALS = [
+    "EURUSD BUY\nEntry: 1.0850\nTP1: 1.0870\nTP2: 1.0890\nTP3: 1.0920\nSL: 1.0800\nTrade Signal For: EURUSD",
+    "Trade Signal For: GBP/JPY\nSELL NOW\nEntry 191.250\nTP1 191.050\nTP2 190.850\nTP3 190.550\nSL 191.750",
+    "Trade Signal For: XAUUSD\nGold buy\nEntry: $2650.50\nTP1: $2652.50\nTP2: $2654.50\nTP3: $2657.50\nSL: $2645.50",
+    "Trade Signal For: BTCUSD\nSell\nEntry: 97250.0\nTP1: 97050.0\nTP2: 96850.0\nTP3: 96550.0\nSL: 97750.0",
+]
+
+CHAT_MESSAGES = [
+    "Good morning everyone, markets open in 10 minutes",
+    "Nice trade yesterday! Closed at TP2 on gold",
+    "Who is watching the NFP release today?",
+    "Remember: risk management first, always use your SL",
+]
+
+
+def build_corpus():
+    """Every /entry format for every configured pair, plus legacy signals and chat"""
+    corpus = []
+    for pair, config in PAIR_CONFIG.items():
+        base_price = 100 + config['pip_value'] * 1000
+        for entry_type in ['Buy limit', 'Sell limit', 'Buy execution', 'Sell execution']:
+            levels = calculate_levels(base_price, pair, entry_type)
+            message = ENTRY_TEMPLATE.format(pair=pair, entry_type=entry_type, **levels)
+            if pair in ['US100', 'GER40']:
+                message += US_INDEX_NOTE
+            corpus.append(message)
+    return corpus + LEGACY_SIGNALS + CHAT_MESSAGES
+
+
+def legacy_parse(content):
+    """The previous parser: one re.search per field, with an old-format fallback for each"""
+    result = {"pair": None, "action": None, "entry": None, "tp1": None, "tp2": None, "tp3": None, "sl": None}
+    for line in content.split('\n'):
+        if "Trade Signal For:" in line:
+            result["pair"] = re.sub(r'[^A-Za-z0-9]', '', line.split("Trade Signal For:")[1].strip()).upper()
+            break
+    entry_type_match = re.search(r'Entry Type:\s*(Buy|Sell)\s+(execution|limit)', content, re.IGNORECASE)
+    if entry_type_match:
+        result["action"] = entry_type_match.group(1).upper()
+    else:
+        for line in content.split('\n'):
+            if "BUY" in line.upper() or "SELL" in line.upper():
+                result["action"] = "BUY" if "BUY" in line.upper() else "SELL"
+                break
+    for key, new_label, old_label in [("entry", r'Entry Price:\s*', r'Entry[:\s]*'),
+                                      ("tp1", r'Take Profit 1:\s*', r'TP1[:\s]*'),
+                                      ("tp2", r'Take Profit 2:\s*', r'TP2[:\s]*'),
+                                      ("tp3", r'Take Profit 3:\s*', r'TP3[:\s]*'),
+                                      ("sl", r'Stop Loss:\s*', r'SL[:\s]*')]:
+        match = re.search(new_label + r'\$?([0-9]+(?:\.[0-9]+)?)', content, re.IGNORECASE)
+        if not match:
+            match = re.search(old_label + r'\$?([0-9]+(?:\.[0-9]+)?)', content, re.IGNORECASE)
+        if match:
+            result[key] = float(match.group(1))
+    return result
+
+
+def run_benchmark(iterations):
+    corpus = build_corpus()
+    print("🔍 Signal Parser Benchmark")
+    print("=" * 50)
+    print(f"Corpus: {len(corpus)} messages ({len(PAIR_CONFIG) * 4} /entry, {len(LEGACY_SIGNALS)} legacy, {len(CHAT_MESSAGES)} chat)")
+
+    # Both parsers must agree on every field before timing means anything
+    mismatches = 0
+    for message in corpus:
+        signal = parse_signal(message)
+        expected = legacy_parse(message)
+        actual = {key: getattr(signal, key) for key in expected}
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ Mismatch:\n{message}\n   old: {expected}\n   new: {actual}")
+    valid = sum(1 for message in corpus if parse_signal(message).is_valid)
+    print(f"✅ Field agreement: {len(corpus) - mismatches}/{len(corpus)} • valid signals: {valid}")
+
+    for name, parser in [("field-by-field (old)", legacy_parse), ("single-pass (new)", parse_signal)]:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for message in corpus:
+                parser(message)
+        elapsed = time.perf_counter() - started
+        total = iterations * len(corpus)
+        print(f"   {name:<22} {total / elapsed:>12,.0f} msgs/s  ({elapsed * 1e6 / total:.2f} µs/msg)")
+
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    sys.exit(0 if run_benchmark(iterations) else 1)
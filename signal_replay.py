@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Signal Replay
+Run an exported channel history through the live bot's signal parser and TP/SL rules
+against a recorded price series, and report each signal's outcome with timestamps.
+Use it to check rule changes (pip distances, breakeven handling, ...) before deploying.
+
+Usage: python signal_replay.py history.json prices.csv [--workers N] [--output outcomes.jsonl]
+
+history.json  a list of messages, or {"messages": [...]} as written by DiscordChatExporter;
+              each message needs "id", "timestamp" (ISO 8601) and "content"
+prices.csv    rows of "timestamp,pair,price" (ISO 8601 timestamps, any order)
+
+Every price in the series is evaluated, whereas the live bot samples every few minutes,
+so the replay shows the outcome the rules produce with perfect price coverage.
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+from main import (PRICE_TRACKING_CONFIG, UNTRACKED_SIGNAL_PATTERN,
+                  calculate_live_tracking_levels, evaluate_price_levels,
+                  limit_entry_hit, parse_signal)
+
+# pair: (timestamps, prices) sorted by time; loaded once per process
+PRICE_SERIES = {}
+
+
+def parse_timestamp(value):
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def format_timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat()
+
+
+def load_price_series(path):
+    rows = {}
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            rows.setdefault(row["pair"].upper(), []).append(
+                (parse_timestamp(row["timestamp"]), float(row["price"])))
+    series = {}
+    for pair, points in rows.items():
+        points.sort()
+        series[pair] = ([point[0] for point in points], [point[1] for point in points])
+    return series
+
+
+def load_history(path):
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    messages = data["messages"] if isinstance(data, dict) else data
+    return [{
+        "id": str(message["id"]),
+        "timestamp": message["timestamp"],
+        "content": message.get("content") or ""
+    } for message in messages
+            if PRICE_TRACKING_CONFIG["signal_keyword"] in (message.get("content") or "")]
+
+
+def init_worker(prices_path):
+    # Forked workers inherit the parent's series; spawned ones load their own copy
+    if not PRICE_SERIES:
+        PRICE_SERIES.update(load_price_series(prices_path))
+
+
+def replay_signal(message):
+    """Replay one signal message; mirrors handle_signal_message and check_price_levels"""
+    outcome = {"message_id": message["id"], "signal_time": message["timestamp"]}
+
+    if UNTRACKED_SIGNAL_PATTERN.search(message["content"]):
+        return dict(outcome, outcome="untracked")
+
+    signal = parse_signal(message["content"])
+    if not signal.is_valid:
+        return dict(outcome, outcome="unparsed", errors=signal.errors)
+
+    trade_data = signal.to_trade_data()
+    outcome.update(pair=signal.pair, action=signal.action, entry_type=signal.entry_type)
+
+    times, prices = PRICE_SERIES.get(signal.pair, ([], []))
+    start = bisect.bisect_left(times, parse_timestamp(message["timestamp"]))
+    if start == len(times):
+        return dict(outcome, outcome="no_prices")
+
+    # Tracking levels are anchored on the live price when the signal arrives
+    live_levels = calculate_live_tracking_levels(prices[start], signal.pair, signal.action)
+    trade_data.update(live_entry=prices[start], **live_levels)
+    outcome["levels"] = live_levels
+
+    events = []
+    result = "open"
+    for index in range(start, len(times)):
+        price = prices[index]
+
+        if trade_data["status"] == "pending_entry":
+            if limit_entry_hit(trade_data, price):
+                # Levels are recalculated from the price that filled the limit
+                trade_data.update(status="active", live_entry=price,
+                                  **calculate_live_tracking_levels(price, signal.pair, signal.action))
+                outcome["levels"] = {key: trade_data[key] for key in live_levels}
+                events.append({"level": "entry", "time": format_timestamp(times[index]), "price": price})
+            continue
+
+        levels_hit = evaluate_price_levels(trade_data, price)
+        for level in levels_hit:
+            events.append({"level": level, "time": format_timestamp(times[index]), "price": price})
+            if level in ("tp1", "tp2", "tp3"):
+                trade_data["tp_hits"].append(level)
+                result = level
+            if level == "tp2":
+                trade_data["breakeven_active"] = True
+        if levels_hit and levels_hit[-1] in ("tp3", "sl", "breakeven"):
+            result = levels_hit[-1]
+            break
+
+    if trade_data["status"] == "pending_entry":
+        result = "entry_not_hit"
+    return dict(outcome, outcome=result, events=events)
+
+
+def run_replay(history_path, prices_path, workers, output_path):
+    started = time.perf_counter()
+    PRICE_SERIES.update(load_price_series(prices_path))
+    messages = load_history(history_path)
+    loaded = time.perf_counter()
+
+    print("🔁 Signal Replay")
+    print("=" * 50)
+    print(f"Signals: {len(messages):,} • pairs with prices: {len(PRICE_SERIES)} • "
+          f"price points: {sum(len(series[0]) for series in PRICE_SERIES.values()):,}")
+
+    if workers > 1 and len(messages) > 1:
+        chunksize = max(1, len(messages) // (workers * 8))
+        with multiprocessing.Pool(workers, initializer=init_worker,
+                                  initargs=(prices_path, )) as pool:
+            outcomes = list(pool.imap(replay_signal, messages, chunksize=chunksize))
+    else:
+        outcomes = [replay_signal(message) for message in messages]
+    finished = time.perf_counter()
+
+    with open(output_path, "w", encoding="utf-8") as handle:
+        for outcome in outcomes:
+            handle.write(json.dumps(outcome) + "\n")
+
+    totals = {}
+    for outcome in outcomes:
+        totals[outcome["outcome"]] = totals.get(outcome["outcome"], 0) + 1
+    replay_seconds = finished - loaded
+    print(f"✅ Outcomes written to {output_path}")
+    for name in ["tp3", "tp2", "tp1", "breakeven", "sl", "open", "entry_not_hit",
+                 "no_prices", "unparsed", "untracked"]:
+        if totals.get(name):
+            print(f"   {name:<14} {totals[name]:>8,}")
+    print(f"⏱️ Load {loaded - started:.2f}s • replay {replay_seconds:.2f}s with {workers} worker(s) • "
+          f"{len(messages) / replay_seconds if replay_seconds else 0:,.0f} signals/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay exported signals against recorded prices")
+    parser.add_argument("history", help="exported channel history (JSON)")
+    parser.add_argument("prices", help="recorded prices (CSV: timestamp,pair,price)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--output", default="replay_outcomes.jsonl")
+    args = parser.parse_args()
+    run_replay(args.history, args.prices, args.workers, args.output)
+    sys.exit(0)